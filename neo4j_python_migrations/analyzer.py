@@ -45,9 +45,30 @@ class AnalyzingResult:
     invalid_versions: list[InvalidVersion] = field(default_factory=list)
 
 
+@dataclass
+class ChainStatus:
+    """The analysis result of a project in a migration target."""
+
+    project: Optional[str]
+    migration_target: Optional[str]
+    # `None` if there are no local migrations of the project.
+    analyzing_result: Optional[AnalyzingResult] = None
+
+
+@dataclass
+class RepairPlan:
+    """Changes of the history that resolve invalid versions."""
+
+    # Pairs of applied and local migrations that are different.
+    updates: list[tuple[Migration, Migration]] = field(default_factory=list)
+    # Applied migrations that are missed locally.
+    deletions: list[Migration] = field(default_factory=list)
+
+
 def analyze(  # noqa: WPS210
     local_migrations: list[Migration],
     remote_migrations: list[Migration],
+    squashed_to: Optional[str] = None,
 ) -> AnalyzingResult:
     """
     Analyze local and remote migrations.
@@ -55,9 +76,17 @@ def analyze(  # noqa: WPS210
     Finds pending migrations and missed migrations.
     :param local_migrations: sorted local migrations.
     :param remote_migrations: sorted remote migrations.
+    :param squashed_to: the version the history has been squashed to,
+                        local migrations up to it are considered applied.
     :return: analysis result.
     """
-    analyzing_result = AnalyzingResult()
+    analyzing_result = AnalyzingResult(latest_applied_version=squashed_to)
+    if squashed_to:
+        local_migrations = [
+            migration
+            for migration in local_migrations
+            if migration.parsed_version > Version(squashed_to)
+        ]
 
     if not remote_migrations:
         analyzing_result.pending_migrations = local_migrations
@@ -91,6 +120,81 @@ def analyze(  # noqa: WPS210
     return analyzing_result
 
 
+def dependencies(
+    pending_migrations: list[Migration],
+    local_migrations: list[Migration],
+) -> dict[str, set[str]]:
+    """
+    Build the graph of dependencies between pending migrations.
+
+    A migration that doesn't declare its dependencies depends
+    on all previous pending migrations. Dependencies on applied
+    migrations are already satisfied, so they are dropped.
+
+    :param pending_migrations: sorted pending migrations.
+    :param local_migrations: all local migrations.
+    :raises ValueError: if a migration depends on an unknown or a later version.
+    :return: versions of pending migrations that each pending migration depends on.
+    """
+    known_versions = {migration.parsed_version for migration in local_migrations}
+    pending_versions = {
+        migration.parsed_version: migration.version for migration in pending_migrations
+    }
+    graph: dict[str, set[str]] = {}
+    for migration in pending_migrations:
+        if migration.depends_on is None:
+            graph[migration.version] = set(graph)
+            continue
+
+        graph[migration.version] = {
+            pending_versions[dependency]
+            for dependency in _declared_dependencies(migration, known_versions)
+            if dependency in pending_versions
+        }
+    return graph
+
+
+def plan_repair(  # noqa: WPS210
+    local_migrations: list[Migration],
+    remote_migrations: list[Migration],
+    squashed_to: Optional[str] = None,
+    delete_missed_locally: bool = False,
+) -> RepairPlan:
+    """
+    Plan the repair of the history.
+
+    Records of `DIFFERENT` versions are updated with the local
+    description, type, source and checksum. Records of `MISSED_LOCALLY`
+    versions are deleted if requested. `MISSED_REMOTELY` versions can't be
+    repaired this way.
+
+    :param local_migrations: sorted local migrations.
+    :param remote_migrations: sorted remote migrations.
+    :param squashed_to: the version the history has been squashed to.
+    :param delete_missed_locally: delete records of migrations missed locally.
+    :return: the plan.
+    """
+    local_migrations_dct = {elem.version: elem for elem in local_migrations}
+    remote_migrations_dct = {elem.version: elem for elem in remote_migrations}
+    repair_plan = RepairPlan()
+    analyzing_result = analyze(local_migrations, remote_migrations, squashed_to)
+    for invalid_version in analyzing_result.invalid_versions:
+        version = invalid_version.version
+        if invalid_version.status == InvalidVersionStatus.DIFFERENT:
+            repair_plan.updates.append(
+                (
+                    remote_migrations_dct[version],
+                    Migration.from_other(local_migrations_dct[version]),
+                ),
+            )
+        elif (
+            invalid_version.status == InvalidVersionStatus.MISSED_LOCALLY
+            and delete_missed_locally
+        ):
+            repair_plan.deletions.append(remote_migrations_dct[version])
+    return repair_plan
+
+
 def _check_invalid_version_status(
     local_migration: Optional[Migration],
     remote_migration: Optional[Migration],
@@ -107,3 +211,22 @@ def _check_invalid_version_status(
         if local_migration.parsed_version < Version(latest_applied_version):
             return InvalidVersionStatus.MISSED_REMOTELY
     return None
+
+
+def _declared_dependencies(
+    migration: Migration,
+    known_versions: set[Version],
+) -> list[Version]:
+    declared = migration.depends_on or ()
+    for dependency in declared:
+        if Version(dependency) not in known_versions:
+            raise ValueError(
+                f"Migration V{migration.version} depends "
+                f"on unknown version {dependency}",
+            )
+        if Version(dependency) >= migration.parsed_version:
+            raise ValueError(
+                f"Migration V{migration.version} can only depend "
+                f"on previous versions, not on {dependency}",
+            )
+    return [Version(version) for version in declared]
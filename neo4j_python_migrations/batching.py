@@ -0,0 +1,201 @@
+import re
+from dataclasses import dataclass, field
+from itertools import groupby
+from types import MappingProxyType
+from typing import Any, Iterator, Optional, Union, cast
+
+DEFAULT_BATCH_SIZE = 1000
+
+_ROW = "row"
+_HEX = 16
+
+_Token = tuple[Optional[str], str]
+# A query and its parameters.
+Query = tuple[str, Optional[dict[str, Any]]]
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+    |(?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    |(?P<name>`(?:[^`]|``)*`|[^\W\d]\w*)
+    |(?P<unsupported>0[xXoO]\w*|\$|\*)
+    |(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    |(?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_ESCAPE_PATTERN = re.compile(r"\\(u[0-9a-fA-F]{4}|.)", re.DOTALL)
+_ESCAPES = MappingProxyType(
+    {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"},
+)
+_KEYWORD_LITERALS = MappingProxyType({"true": True, "false": False, "null": None})
+# Keywords after which `NULL`, `TRUE` and `FALSE` are kept, they are a part
+# of a predicate (`IS NULL`, `IS NOT NULL`) and can't be parameters.
+_PREDICATE_KEYWORDS = frozenset(("IS", "NOT"))
+_LEADING_CLAUSES = frozenset(("CREATE", "MERGE", "MATCH"))
+# Clauses that change the cardinality or the scope of a statement,
+# or can't take parameters.
+_UNSUPPORTED_CLAUSES = frozenset(
+    (
+        "ALIAS",
+        "CALL",
+        "COMPOSITE",
+        "CONSTRAINT",
+        "DATABASE",
+        "FOREACH",
+        "INDEX",
+        "LIMIT",
+        "LOAD",
+        "ORDER",
+        "RETURN",
+        "ROLE",
+        "SHOW",
+        "SKIP",
+        "UNION",
+        "UNWIND",
+        "USE",
+        "USER",
+        "USING",
+        "WITH",
+    ),
+)
+
+
+@dataclass
+class Shape:
+    """A statement with literals replaced by properties of the `row` variable."""
+
+    query: str
+    # Values of the literals, the keys are the property names.
+    row: dict[str, Any] = field(default_factory=dict)
+
+    def parameter(self, literal: Any) -> str:
+        """
+        Add the value of a literal to the row.
+
+        :param literal: the value.
+        :return: the expression that replaces the literal in the query.
+        """
+        key = f"p{len(self.row)}"
+        self.row[key] = literal
+        return f"{_ROW}.{key}"
+
+
+# A statement shape and the index of the statement.
+_IndexedShape = tuple[int, Optional[Shape]]
+
+
+def shape(statement: str) -> Optional[Shape]:
+    """
+    Extract literals of a statement.
+
+    Only statements that start with `CREATE`, `MERGE` or `MATCH`
+    and consist of pattern clauses (e.g. `SET`, `WHERE`, `DELETE`)
+    can be parameterized. `NULL`, `TRUE` and `FALSE` of `IS [NOT]`
+    predicates are kept, since they can't be replaced by parameters.
+
+    Applying the query of the shape to all rows at once has the same
+    effect as applying the statements one by one only if the statements
+    are independent: a `MATCH` of a row is not guaranteed to see what
+    the previous rows of the same query have created or changed.
+
+    :param statement: the statement.
+    :return: the shape or `None` if the statement can't be parameterized.
+    """
+    tokens = [
+        (token.lastgroup, token.group()) for token in _TOKEN_PATTERN.finditer(statement)
+    ]
+    if not _is_supported(tokens):
+        return None
+
+    statement_shape = Shape(query="")
+    statement_shape.query = "".join(_parameterize_tokens(statement_shape, tokens))
+    return statement_shape
+
+
+def batch(
+    statements: list[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[Query]:
+    """
+    Merge consecutive statements of the same shape into `UNWIND` queries.
+
+    The order of statements is kept, statements that can't be
+    parameterized or have no neighbours of the same shape
+    are returned as is. Consecutive statements of the same shape
+    must not depend on each other (see `shape`).
+
+    :param statements: the statements.
+    :param batch_size: the maximum number of rows of a query.
+    :yields: queries and their parameters (`None` for the original statements).
+    """
+    shapes = [shape(statement) for statement in statements]
+    for _, group in groupby(enumerate(shapes), key=_group_key):
+        yield from _merge(statements, list(group), batch_size)
+
+
+def _merge(
+    statements: list[str],
+    indexed_shapes: list[_IndexedShape],
+    batch_size: int,
+) -> Iterator[Query]:
+    statement_shape = indexed_shapes[0][1]
+    if statement_shape is None or len(indexed_shapes) == 1:
+        yield statements[indexed_shapes[0][0]], None
+        return
+
+    unwind_query = f"UNWIND ${_ROW}s AS {_ROW}\n{statement_shape.query}"
+    rows = [cast(Shape, other).row for _, other in indexed_shapes]
+    for offset in range(0, len(rows), batch_size):
+        yield unwind_query, {f"{_ROW}s": rows[offset : offset + batch_size]}
+
+
+def _group_key(indexed_shape: _IndexedShape) -> Union[int, str]:
+    # Statements that can't be parameterized are never grouped.
+    index, statement_shape = indexed_shape
+    return index if statement_shape is None else statement_shape.query
+
+
+def _is_supported(tokens: list[_Token]) -> bool:
+    if any(kind == "unsupported" for kind, _ in tokens):
+        return False
+    names = [text.upper() for kind, text in tokens if kind == "name"]
+    return (
+        bool(names)
+        and names[0] in _LEADING_CLAUSES
+        and _UNSUPPORTED_CLAUSES.isdisjoint(names)
+        and _ROW.upper() not in names
+    )
+
+
+def _parameterize_tokens(
+    statement_shape: Shape,
+    tokens: list[_Token],
+) -> Iterator[str]:
+    # The last significant token (not a comment or whitespace).
+    preceding = ""
+    for kind, text in tokens:
+        if kind == "name" and preceding in _PREDICATE_KEYWORDS:
+            yield text
+        else:
+            yield _parameterize(statement_shape, kind, text)
+        if kind != "comment" and not text.isspace():
+            preceding = text.upper()
+
+
+def _parameterize(statement_shape: Shape, kind: Optional[str], text: str) -> str:
+    if kind == "string":
+        return statement_shape.parameter(_ESCAPE_PATTERN.sub(_unescape, text[1:-1]))
+    if kind == "number":
+        is_float = any(char in text for char in ".eE")
+        return statement_shape.parameter(float(text) if is_float else int(text))
+    if kind == "name" and text.lower() in _KEYWORD_LITERALS:
+        return statement_shape.parameter(_KEYWORD_LITERALS[text.lower()])
+    return text
+
+
+def _unescape(escape: re.Match[str]) -> str:
+    sequence = escape.group(1)
+    if len(sequence) > 1:
+        return chr(int(sequence[1:], _HEX))
+    return _ESCAPES.get(sequence, sequence)
@@ -0,0 +1,202 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from neo4j_python_migrations.migration import CypherMigration, Migration
+
+_CREATE_PATTERN = re.compile(
+    r"CREATE\s+(?:(?:RANGE|TEXT|POINT|LOOKUP|FULLTEXT|VECTOR)\s+)?"
+    + r"(?P<kind>INDEX|CONSTRAINT)\b\s*(?P<name>`[^`]+`|\w+)?"
+    + r"(?P<if_not_exists>\s+IF\s+NOT\s+EXISTS)?\s+(?:FOR|ON)\b",
+    re.IGNORECASE,
+)
+_DROP_PATTERN = re.compile(
+    r"DROP\s+(?P<kind>INDEX|CONSTRAINT)\s+(?P<name>`[^`]+`|\w+)"
+    + r"(?P<if_exists>\s+IF\s+EXISTS)?",
+    re.IGNORECASE,
+)
+
+# The kind (`INDEX` or `CONSTRAINT`) and the name of a schema object.
+_SchemaKey = tuple[str, str]
+
+
+@dataclass(frozen=True)
+class SchemaStatement:
+    """A statement that creates or drops an index or a constraint."""
+
+    statement: str
+    # `INDEX` or `CONSTRAINT`.
+    kind: str
+    # The name, unnamed objects are identified by their statement.
+    name: str
+    drop: bool = False
+    # `IF NOT EXISTS` of creations or `IF EXISTS` of drops.
+    conditional: bool = False
+
+    @property
+    def key(self) -> _SchemaKey:
+        """
+        The identity of the schema object.
+
+        :returns: the kind and the name.
+        """
+        return self.kind, self.name
+
+
+@dataclass
+class BootstrapPlan:
+    """The bootstrap of an empty database."""
+
+    # Statements of the net schema in the order the objects were created.
+    schema: list[str] = field(default_factory=list)
+    # The number of schema statements that have no effect on the net schema
+    # (objects dropped later, repeated conditional creations and drops).
+    elided: int = 0
+    # Migrations that consist of schema statements only.
+    collapsed: list[Migration] = field(default_factory=list)
+    # Migrations applied after the net schema, they opted out of the bootstrap.
+    applied: list[Migration] = field(default_factory=list)
+    # Migrations that are only recorded, their data statements
+    # are not applied (e.g. backfills of existing data).
+    skipped: list[Migration] = field(default_factory=list)
+
+
+def parse_schema_statement(statement: str) -> Optional[SchemaStatement]:
+    """
+    Recognize a statement that creates or drops an index or a constraint.
+
+    :param statement: the statement, leading comments are ignored.
+    :return: the parsed statement or `None` if it's not a schema statement.
+    """
+    statement = _strip_comments(statement)
+    create_match = _CREATE_PATTERN.match(statement)
+    if create_match:
+        name = create_match.group("name")
+        return SchemaStatement(
+            statement=statement,
+            kind=create_match.group("kind").upper(),
+            name=_name(name) if name else " ".join(statement.split()),
+            conditional=bool(create_match.group("if_not_exists")),
+        )
+    drop_match = _DROP_PATTERN.fullmatch(statement)
+    if drop_match:
+        return SchemaStatement(
+            statement=statement,
+            kind=drop_match.group("kind").upper(),
+            name=_name(drop_match.group("name")),
+            drop=True,
+            conditional=bool(drop_match.group("if_exists")),
+        )
+    return None
+
+
+def plan(migrations: list[Migration]) -> BootstrapPlan:
+    """
+    Collapse the schema statements of migrations into the net schema.
+
+    Indexes and constraints that are dropped by later migrations
+    are not created at all, renames become a single creation.
+    Migrations that declare `run_on_bootstrap` are applied as they are
+    after the net schema, so the schema objects they create or drop
+    can't be changed by the collapsed migrations.
+    Data statements of the other migrations are not applied:
+    there is no data to change in an empty database.
+    The net schema creates objects `IF NOT EXISTS`, so a bootstrap
+    that failed after the schema had been committed can be rerun.
+
+    :param migrations: sorted pending migrations of an empty database.
+    :raises ValueError: if a schema object is created twice, a dropped one
+                        has not been created by the migrations or an object
+                        of a migration that runs on bootstrap is changed
+                        by the collapsed ones.
+    :return: the plan.
+    """
+    bootstrap_plan = BootstrapPlan()
+    schema: dict[_SchemaKey, SchemaStatement] = {}
+    run_schema = {
+        schema_statement.key: migration
+        for migration in migrations
+        if migration.run_on_bootstrap
+        for schema_statement in _schema_statements(migration)
+    }
+    for migration in migrations:
+        if migration.run_on_bootstrap:
+            bootstrap_plan.applied.append(migration)
+        elif _collapse_migration(bootstrap_plan, schema, run_schema, migration):
+            bootstrap_plan.collapsed.append(migration)
+        else:
+            bootstrap_plan.skipped.append(migration)
+
+    bootstrap_plan.schema = [
+        _if_not_exists(schema_statement) for schema_statement in schema.values()
+    ]
+    return bootstrap_plan
+
+
+def _collapse_migration(
+    bootstrap_plan: BootstrapPlan,
+    schema: dict[_SchemaKey, SchemaStatement],
+    run_schema: dict[_SchemaKey, Migration],
+    migration: Migration,
+) -> bool:
+    """Collapse the schema statements, return whether there are no others."""
+    statements = migration.statements if isinstance(migration, CypherMigration) else []
+    schema_statements = _schema_statements(migration)
+    for schema_statement in schema_statements:
+        owner = run_schema.get(schema_statement.key)
+        if owner is not None:
+            kind = schema_statement.kind.lower()
+            raise ValueError(
+                f"Migration V{migration.version} changes {kind} "
+                f"{schema_statement.name} of V{owner.version} "
+                "that runs on bootstrap",
+            )
+        bootstrap_plan.elided += _collapse(migration, schema, schema_statement)
+    return bool(statements) and len(schema_statements) == len(statements)
+
+
+def _schema_statements(migration: Migration) -> list[SchemaStatement]:
+    statements = migration.statements if isinstance(migration, CypherMigration) else []
+    return list(filter(None, map(parse_schema_statement, statements)))
+
+
+def _collapse(
+    migration: Migration,
+    schema: dict[_SchemaKey, SchemaStatement],
+    schema_statement: SchemaStatement,
+) -> int:
+    """Apply the statement to the schema, return the number of elided statements."""
+    created = schema_statement.key in schema
+    if schema_statement.drop and created:
+        schema.pop(schema_statement.key)
+        return 2
+    if schema_statement.conditional and (created == (not schema_statement.drop)):
+        return 1
+    if created or schema_statement.drop:
+        action = "drops an absent" if schema_statement.drop else "creates an existing"
+        kind = schema_statement.kind.lower()
+        raise ValueError(
+            f"Migration V{migration.version} {action} {kind} {schema_statement.name}",
+        )
+    schema[schema_statement.key] = schema_statement
+    return 0
+
+
+def _if_not_exists(schema_statement: SchemaStatement) -> str:
+    statement = schema_statement.statement
+    create_match = _CREATE_PATTERN.match(statement)
+    if schema_statement.conditional or create_match is None:
+        return statement
+    group = "name" if create_match.group("name") else "kind"
+    position = create_match.end(group)
+    return "".join((statement[:position], " IF NOT EXISTS", statement[position:]))
+
+
+def _strip_comments(statement: str) -> str:
+    return "\n".join(
+        line for line in statement.splitlines() if not line.strip().startswith("//")
+    ).strip()
+
+
+def _name(name: str) -> str:
+    return name.strip("`")
@@ -0,0 +1,129 @@
+import time
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional
+
+from neo4j_python_migrations.history import HistoryEntry
+from neo4j_python_migrations.migration import Migration
+from neo4j_python_migrations.rehearsal import Rehearsal
+
+# A version and a checksum of a migration.
+_RunKey = tuple[str, Optional[str]]
+
+
+@dataclass(frozen=True)
+class Estimate:
+    """The expected duration of a migration."""
+
+    # Seconds, `None` if there is no data.
+    duration: Optional[float] = None
+    # Where the duration comes from: `rehearsal`, `history` or `declared`.
+    source: Optional[str] = None
+
+
+class Deadline:
+    """The end of the time budget of a run."""
+
+    def __init__(self, time_budget: float, estimates: Mapping[str, Estimate]):
+        """
+        Initialize the class instance, the budget starts now.
+
+        :param time_budget: the time budget (seconds).
+        :param estimates: the estimates by version.
+        """
+        self.at = time.monotonic() + time_budget
+        self.estimates = estimates
+
+    def allows(self, migration: Migration) -> bool:
+        """
+        Check if the migration is expected to complete before the deadline.
+
+        :param migration: the migration.
+        :return: the check result, `False` if there is no estimate.
+        """
+        duration = _duration(migration, self.estimates)
+        return duration is not None and time.monotonic() + duration <= self.at
+
+
+def estimate(
+    migrations: list[Migration],
+    rehearsals: Iterable[Rehearsal] = (),
+    history: Iterable[HistoryEntry] = (),
+) -> dict[str, Estimate]:
+    """
+    Estimate the durations of migrations.
+
+    Measured durations are preferred to declared ones: the rehearsal
+    of the migration, then the longest recorded run of the same
+    version and checksum (e.g. in other environments), then the
+    estimate declared by the migration. Failed rehearsals are ignored.
+
+    :param migrations: the migrations.
+    :param rehearsals: the results of a rehearsal.
+    :param history: records of applied migrations.
+    :return: the estimates by version.
+    """
+    rehearsed = {
+        migration_rehearsal.version: migration_rehearsal.duration
+        for migration_rehearsal in rehearsals
+        if not migration_rehearsal.error
+    }
+    recorded: dict[_RunKey, float] = {}
+    for entry in history:
+        if entry.duration is not None:
+            run_key = (entry.migration.version, entry.migration.checksum)
+            recorded[run_key] = max(entry.duration, recorded.get(run_key, 0))
+
+    return {
+        migration.version: _estimate(migration, rehearsed, recorded)
+        for migration in migrations
+    }
+
+
+def plan(
+    migrations: list[Migration],
+    estimates: Mapping[str, Estimate],
+    time_budget: float,
+) -> tuple[list[Migration], list[Migration]]:
+    """
+    Select the longest prefix of migrations that fits the time budget.
+
+    A migration without an estimate ends the prefix,
+    since it can't be known to fit. Migrations missing from the estimates
+    are estimated by their declared estimates.
+
+    :param migrations: sorted migrations.
+    :param estimates: the estimates by version.
+    :param time_budget: the time budget (seconds).
+    :return: the migrations to apply and the deferred ones.
+    """
+    total: float = 0
+    for index, migration in enumerate(migrations):
+        duration = _duration(migration, estimates)
+        if duration is None or total + duration > time_budget:
+            return migrations[:index], migrations[index:]
+        total += duration
+    return migrations, []
+
+
+def _duration(
+    migration: Migration,
+    estimates: Mapping[str, Estimate],
+) -> Optional[float]:
+    found = estimates.get(migration.version)
+    return migration.estimate if found is None else found.duration
+
+
+def _estimate(
+    migration: Migration,
+    rehearsed: dict[str, float],
+    recorded: dict[_RunKey, float],
+) -> Estimate:
+    rehearsal_duration = rehearsed.get(migration.version)
+    if rehearsal_duration is not None:
+        return Estimate(rehearsal_duration, "rehearsal")
+    recorded_duration = recorded.get((migration.version, migration.checksum))
+    if recorded_duration is not None:
+        return Estimate(recorded_duration, "history")
+    if migration.estimate is not None:
+        return Estimate(migration.estimate, "declared")
+    return Estimate()
@@ -0,0 +1,274 @@
+import io
+import json
+import marshal
+import mmap
+import struct
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import CodeType, ModuleType
+from typing import IO, TYPE_CHECKING, Any, Callable, Iterator, Optional, Union
+
+from neo4j_python_migrations.migration import (
+    CypherMigration,
+    DataMigration,
+    Migration,
+    MigrationType,
+    PythonMigration,
+)
+
+if sys.version_info >= (3, 11):
+    from importlib.resources.abc import Traversable
+else:
+    from importlib.abc import Traversable
+
+if TYPE_CHECKING:
+    from neo4j import Transaction
+
+MAGIC = b"NEO4JMIG"
+FORMAT_VERSION = 1
+
+_Buffer = Union[bytes, mmap.mmap]
+
+# Magic, format version and the length of the manifest.
+_HEADER = struct.Struct("<8sHQ")
+
+
+def write(
+    migrations: list[Migration],
+    migrations_path: Traversable,
+    output: Path,
+) -> None:
+    """
+    Compile migrations into a bundle.
+
+    The bundle is a single file: a header, a JSON manifest with the
+    metadata, statements and checksums of the migrations, and blobs:
+    bytecode of Python migrations and data files of data migrations
+    (their templates are kept in the manifest). Bytecode depends on the Python version,
+    so the bundle should be built by the same interpreter that loads it.
+
+    :param migrations: migrations loaded from the directory.
+    :param migrations_path: the directory, it contains sources of Python migrations.
+    :param output: the path to the bundle.
+    :raises ValueError: if a migration can't be bundled.
+    """
+    entries = []
+    blobs: list[bytes] = []
+    for migration in migrations:
+        entry, blob = _entry(migration, migrations_path)
+        if blob is not None:
+            entry["offset"] = sum(map(len, blobs))
+            entry["length"] = len(blob)
+            blobs.append(blob)
+        entries.append(entry)
+
+    _write_file(
+        output,
+        {"cacheTag": sys.implementation.cache_tag, "migrations": entries},
+        blobs,
+    )
+
+
+def load(path: Traversable) -> list[Migration]:
+    """
+    Load migrations from a bundle created by `write`.
+
+    Nothing is split, hashed or imported: Cypher migrations get
+    the precomputed statements and checksums, and the bytecode
+    of Python migrations is executed when they are applied.
+    Only the manifest is read, the bytecode and the data files
+    are read from the mapping when they are used, so the mapping
+    is kept open as long as the migrations exist.
+
+    :param path: the path to the bundle, files are mapped into memory,
+                 other resources (e.g. in zip archives) are read.
+    :raises ValueError: if the file is not a valid bundle.
+    :return: sorted list of migrations.
+    """
+    if not isinstance(path, Path):
+        return _load(path, path.read_bytes())
+
+    with open(path, "rb") as bundle_file:
+        data = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return _load(path, data)
+    except BaseException:
+        data.close()
+        raise
+
+
+@dataclass(frozen=True)
+class _Blob:
+    """A part of the bundle, it is read on access."""
+
+    data: _Buffer = field(repr=False)
+    start: int
+    length: int
+
+    def read(self) -> bytes:
+        return self.data[self.start : self.start + self.length]
+
+
+class _BundledFile(Traversable):
+    """The data file of a bundled data migration."""
+
+    def __init__(self, name: str, blob: _Blob):
+        self._name = name
+        self._blob = blob
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def open(self, mode: str = "r", **kwargs: Any) -> IO[Any]:
+        stream = io.BytesIO(self.read_bytes())
+        if "b" in mode:
+            return stream
+        return io.TextIOWrapper(stream, **kwargs)
+
+    def read_bytes(self) -> bytes:
+        return self._blob.read()
+
+    def read_text(self, encoding: Optional[str] = None) -> str:
+        return self.read_bytes().decode(encoding or "utf-8")
+
+    def iterdir(self) -> Iterator[Traversable]:
+        return iter(())
+
+    def is_dir(self) -> bool:
+        return False
+
+    def is_file(self) -> bool:
+        return True
+
+    def joinpath(self, *descendants: Any) -> Traversable:
+        raise FileNotFoundError(f"{self.name} is a file")
+
+    def __truediv__(self, child: Any) -> Traversable:
+        return self.joinpath(child)
+
+
+class _LazyCode:
+    """The `up` function of a bundled Python migration, imported on first call."""
+
+    def __init__(self, name: str, blob: _Blob):
+        self.name = name
+        self._blob = blob
+        self._up: Optional[Callable[["Transaction"], None]] = None
+
+    def __call__(self, tx: "Transaction") -> None:
+        if self._up is None:
+            module = ModuleType(self.name)
+            module.__file__ = self.name
+            exec(marshal.loads(self.bytecode), module.__dict__)  # noqa: S102, WPS421
+            self._up = module.up
+        self._up(tx)
+
+    @property
+    def bytecode(self) -> bytes:
+        return self._blob.read()
+
+
+def _entry(
+    migration: Migration,
+    migrations_path: Traversable,
+) -> tuple[dict[str, Any], Optional[bytes]]:
+    entry: dict[str, Any] = {
+        "version": migration.version,
+        "description": migration.description,
+        "type": migration.type,
+        "source": migration.source,
+        "checksum": migration.checksum,
+        "timeout": migration.timeout,
+        "dependsOn": migration.depends_on,
+        "estimate": migration.estimate,
+        "runOnBootstrap": migration.run_on_bootstrap,
+    }
+    if isinstance(migration, CypherMigration):
+        entry.update(query=migration.query, statements=migration.statements)
+        return entry, None
+    if isinstance(migration, PythonMigration) and migration.source:
+        return entry, marshal.dumps(_compile(migrations_path / migration.source))
+    if isinstance(migration, DataMigration):
+        entry.update(
+            template=migration.template,
+            batchSize=migration.batch_size,
+            commitPerBatch=migration.commit_per_batch,
+        )
+        return entry, migration.path.read_bytes()
+    raise ValueError(f"Migration V{migration.version} can't be bundled")
+
+
+def _compile(path: Traversable) -> CodeType:
+    return compile(path.read_bytes(), path.name, "exec")  # noqa: WPS421
+
+
+def _write_file(output: Path, manifest: dict[str, Any], blobs: list[bytes]) -> None:
+    # The bundle is replaced rather than overwritten,
+    # so processes that have mapped the previous one keep reading it.
+    encoded_manifest = json.dumps(manifest).encode()
+    temporary = output.with_name(f"{output.name}.tmp")
+    with open(temporary, "wb") as bundle_file:
+        bundle_file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(encoded_manifest)))
+        bundle_file.write(encoded_manifest)
+        bundle_file.writelines(blobs)
+    temporary.replace(output)
+
+
+def _load(path: Traversable, data: _Buffer) -> list[Migration]:
+    manifest, blobs_start = _read_manifest(path, data)
+    return sorted(
+        _materialize(entry, data, blobs_start) for entry in manifest["migrations"]
+    )
+
+
+def _read_manifest(path: Traversable, data: _Buffer) -> tuple[dict[str, Any], int]:
+    if len(data) < _HEADER.size:
+        raise ValueError(f"{path} is not a migration bundle")
+    magic, format_version, manifest_length = _HEADER.unpack_from(data)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a migration bundle")
+
+    blobs_start = _HEADER.size + manifest_length
+    manifest = json.loads(data[_HEADER.size : blobs_start])
+    if manifest["cacheTag"] != sys.implementation.cache_tag:
+        raise ValueError(f"{path} was built by another Python version, rebuild it")
+    return manifest, blobs_start
+
+
+def _materialize(entry: dict[str, Any], data: _Buffer, blobs_start: int) -> Migration:
+    options = {
+        "version": entry["version"],
+        "description": entry["description"],
+        "source": entry["source"],
+        "checksum": entry["checksum"],
+        "timeout": entry["timeout"],
+        "depends_on": _depends_on(entry.get("dependsOn")),
+        "estimate": entry.get("estimate"),
+        "run_on_bootstrap": entry.get("runOnBootstrap", False),
+    }
+    if entry["type"] == MigrationType.CYPHER:
+        return CypherMigration(
+            query=entry["query"],
+            statements=entry["statements"],
+            **options,
+        )
+
+    blob = _Blob(data, blobs_start + entry["offset"], entry["length"])
+    if entry["type"] == MigrationType.DATA:
+        return DataMigration(
+            path=_BundledFile(entry["source"], blob),
+            template=entry["template"],
+            batch_size=entry["batchSize"],
+            commit_per_batch=entry["commitPerBatch"],
+            **options,
+        )
+    return PythonMigration(
+        code=_LazyCode(Path(entry["source"]).stem, blob),
+        **options,
+    )
+
+
+def _depends_on(dependencies: Optional[list[str]]) -> Optional[tuple[str, ...]]:
+    return None if dependencies is None else tuple(dependencies)
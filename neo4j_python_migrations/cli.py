@@ -1,16 +1,40 @@
-from dataclasses import dataclass
-from datetime import datetime
+# Commands import the driver and the executor when they run,
+# so `--help`, shell completion and offline commands start fast.
+from __future__ import annotations
+
+import signal
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from threading import Thread
+from types import FrameType
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+from typer import BadParameter, Exit, Option, Typer
 
-from neo4j import GraphDatabase
-from typer import Exit, Option, Typer
-from yarl import URL
+from neo4j_python_migrations.connection import ConnectionProfile
+from neo4j_python_migrations.profiling import ProfileMode
 
-from neo4j_python_migrations.executor import Executor
+if TYPE_CHECKING:
+    from neo4j_python_migrations import analyzer, linter, rehearsal
+    from neo4j_python_migrations.bootstrap import BootstrapPlan
+    from neo4j_python_migrations.budget import Estimate
+    from neo4j_python_migrations.executor import Executor
+    from neo4j_python_migrations.history import HistoryEntry, SQLiteHistoryStore
+    from neo4j_python_migrations.metrics import Metrics
+    from neo4j_python_migrations.migration import Migration
+    from neo4j_python_migrations.profiling import ProfileReport
+    from neo4j_python_migrations.progress import ProgressEvent
+    from neo4j_python_migrations.report import Aggregate, HistoryReport
+    from neo4j_python_migrations.worker import WorkerConfig
 
 cli = Typer()
 
+# Widths of the columns of the `analyze --all-projects` table.
+_COLUMN_WIDTHS = (20, 20, 12, 8, 8, 0)
+
 
 @dataclass
 class State:
@@ -25,19 +49,50 @@ class State:
     project: Optional[str] = None
     database: Optional[str] = None
     schema_database: Optional[str] = None
+    connection_profile: ConnectionProfile = field(default_factory=ConnectionProfile)
+    warm_up: bool = False
 
 
 state: Optional[State] = None
 
 
-@cli.command(help="Retrieves all pending migrations, verify and applies them.")
-def migrate() -> None:  # noqa: D103
+class _ProgressLine:
+    """A live progress line of the migration being applied."""
+
+    def __init__(self) -> None:
+        self.shown = False
+
+    def show(self, event: ProgressEvent) -> None:
+        total = "" if event.total is None else f"/{event.total}"
+        eta = ""
+        if event.eta is not None:
+            eta = f", ETA {timedelta(seconds=int(event.eta))}"
+        sys.stderr.write(
+            f"\rV{event.version} {event.processed}{total} rows, "
+            f"{event.rate:.0f} rows/s{eta}  ",
+        )
+        sys.stderr.flush()
+        self.shown = True
+
+    def clear(self) -> None:
+        if self.shown:
+            sys.stderr.write("\n")
+            self.shown = False
+
+
+@contextmanager
+def _executor(**options: Any) -> Iterator[Executor]:
+    from neo4j import GraphDatabase
+
+    from neo4j_python_migrations.executor import Executor
+
     if not state:
         raise Exit(2)
 
     with GraphDatabase.driver(
-        str(URL.build(scheme=state.scheme, host=state.host, port=state.port)),
+        _uri(state),
         auth=(state.username, state.password),
+        **state.connection_profile.driver_options(),
     ) as driver:
         executor = Executor(
             driver=driver,
@@ -45,35 +100,876 @@ def migrate() -> None:  # noqa: D103
             project=state.project,
             database=state.database,
             schema_database=state.schema_database,
+            **options,
         )
-        executor.migrate(
-            on_apply=lambda migration: print(
-                f"{datetime.now()} "
-                f"Migration V{migration.version} ({migration.description}) APPLIED",
-            ),
+        if state.warm_up:
+            executor.warm_up()
+        yield executor
+
+
+def _uri(current_state: State) -> str:
+    from yarl import URL
+
+    return str(
+        URL.build(
+            scheme=current_state.scheme,
+            host=current_state.host,
+            port=current_state.port,
+        ),
+    )
+
+
+def _worker_config(memory_limit: Optional[str]) -> WorkerConfig:
+    from neo4j_python_migrations.worker import WorkerConfig, parse_size
+
+    if not state:
+        raise Exit(2)
+
+    try:
+        parsed_memory_limit = parse_size(memory_limit) if memory_limit else None
+    except ValueError as exc:
+        raise BadParameter(str(exc))
+    return WorkerConfig(
+        uri=_uri(state),
+        auth=(state.username, state.password),
+        memory_limit=parsed_memory_limit,
+        driver_options=state.connection_profile.driver_options(),
+    )
+
+
+@contextmanager
+def _cancel_on_signals(executor: Executor) -> Iterator[None]:
+    """
+    Cancel the migration run on SIGINT or SIGTERM.
+
+    The first signal terminates the running transaction in the background,
+    the next ones are handled as usual.
+
+    :param executor: the executor.
+    :yields: nothing.
+    """
+    signals = (signal.SIGINT, signal.SIGTERM)
+    handlers = {signum: signal.getsignal(signum) for signum in signals}
+
+    def handler(signum: int, frame: Optional[FrameType]) -> None:
+        for restored_signum, restored_handler in handlers.items():
+            signal.signal(restored_signum, restored_handler)
+        print("Cancelling the migration...", file=sys.stderr)
+        Thread(target=executor.cancel, daemon=True).start()
+
+    for signum in signals:
+        signal.signal(signum, handler)
+    try:
+        yield
+    finally:
+        for restored_signum, restored_handler in handlers.items():
+            signal.signal(restored_signum, restored_handler)
+
+
+@cli.command(help="Retrieves all pending migrations, verify and applies them.")
+def migrate(  # noqa: WPS211
+    retry_attempts: int = Option(
+        5,
+        help="The maximum number of attempts for transactions "
+        "that failed with transient errors.",
+    ),
+    retry_delay: float = Option(
+        1,
+        help="The pause before the first retry (seconds). "
+        "It doubles with each next retry.",
+    ),
+    retry_max_delay: float = Option(
+        30,
+        help="The maximum pause between retries (seconds).",
+    ),
+    retry_jitter: float = Option(
+        0.2,
+        help="The random deviation of pauses between retries (fraction).",
+    ),
+    progress_interval: float = Option(
+        1,
+        help="The minimum pause between updates of the progress line (seconds).",
+    ),
+    timeout: Optional[str] = Option(
+        None,
+        help="The default timeout of migration transactions, e.g. 90s, 5m or 1h. "
+        "Migrations can override it with a `// timeout: ...` header "
+        "or the TIMEOUT variable.",
+    ),
+    metrics_file: Optional[Path] = Option(
+        None,
+        help="A file to write Prometheus metrics of the run to "
+        "(for the node_exporter textfile collector).",
+    ),
+    metrics_push_url: Optional[str] = Option(
+        None,
+        help="A Pushgateway URL to push Prometheus metrics of the run to, "
+        "e.g. http://localhost:9091/metrics/job/migrations.",
+    ),
+    profile_python: Optional[list[ProfileMode]] = Option(
+        None,
+        help="Profile Python migrations (can be repeated): "
+        "cpu writes V<version>.prof, memory writes V<version>.memory.txt.",
+    ),
+    profile_dir: Path = Option(
+        Path("profiles"),
+        help="The directory for profiles of Python migrations.",
+    ),
+    rehearse: bool = Option(
+        False,
+        "--rehearse",
+        help="Apply pending migrations in transactions that are rolled back "
+        "and print how long each of them took.",
+    ),
+    rehearsal_file: Optional[Path] = Option(
+        None,
+        help="A JSON file to save the results of --rehearse to. "
+        "Without --rehearse, the saved results estimate the durations "
+        "of migrations for --time-budget.",
+    ),
+    isolate_python: bool = Option(
+        False,
+        "--isolate-python",
+        help="Apply each Python migration in a new process with its own "
+        "connection, so its memory is released when it completes.",
+    ),
+    worker_memory_limit: Optional[str] = Option(
+        None,
+        help="The memory limit of the processes of --isolate-python, "
+        "e.g. 512M or 4G (POSIX only).",
+    ),
+    batch_literals: bool = Option(
+        False,
+        "--batch-literals",
+        help="Apply consecutive Cypher statements that differ only in literals "
+        "as one UNWIND query with parameters.",
+    ),
+    workers: int = Option(
+        1,
+        min=1,
+        help="The maximum number of migrations applied concurrently. "
+        "Only migrations that declare their dependencies run concurrently.",
+    ),
+    time_budget: Optional[str] = Option(
+        None,
+        help="Apply only the pending migrations that are expected to complete "
+        "within this time, e.g. 20m. Durations are estimated by "
+        "--rehearsal-file, the history and the `// estimate: ...` headers.",
+    ),
+    bootstrap: bool = Option(
+        False,
+        "--bootstrap",
+        help="Bootstrap a database without history: apply the net schema of "
+        "Cypher migrations at once and record all versions as applied. "
+        "Migrations with a `// bootstrap: run` header are applied as usual.",
+    ),
+) -> None:  # noqa: D103
+    from neo4j_python_migrations.batching import DEFAULT_BATCH_SIZE
+    from neo4j_python_migrations.profiling import Profiler
+    from neo4j_python_migrations.retry import RetryPolicy
+
+    retry_policy = RetryPolicy(
+        max_attempts=retry_attempts,
+        initial_delay=retry_delay,
+        max_delay=retry_max_delay,
+        jitter=retry_jitter,
+    )
+    _check_migrate_options(rehearse, bootstrap, workers, time_budget)
+    _check_profile_options(profile_python, isolate_python, workers)
+    progress_line = _ProgressLine()
+    time_budget_seconds = _parse_duration(time_budget)
+
+    def on_apply(migration: Migration) -> None:
+        progress_line.clear()
+        print(
+            f"{datetime.now()} "
+            f"Migration V{migration.version} ({migration.description}) APPLIED",
         )
 
+    with _executor(
+        retry_policy=retry_policy,
+        progress_interval=progress_interval,
+        timeout=_parse_duration(timeout),
+        profiler=Profiler(profile_python, profile_dir) if profile_python else None,
+        worker_config=(_worker_config(worker_memory_limit) if isolate_python else None),
+        batch_size=DEFAULT_BATCH_SIZE if batch_literals else None,
+        workers=workers,
+    ) as executor:
+        try:
+            if rehearse:
+                _rehearse(executor, progress_line, rehearsal_file)
+            elif bootstrap:
+                _bootstrap(executor, on_apply, progress_line)
+            else:
+                _migrate(
+                    executor,
+                    on_apply,
+                    progress_line,
+                    time_budget_seconds,
+                    rehearsal_file,
+                )
+        finally:
+            _export_metrics(executor.metrics, metrics_file, metrics_push_url)
+
 
 @cli.command(
     help="Analyze migrations, find pending and missed.",
 )
-def analyze() -> None:  # noqa: D103
+def analyze(  # noqa: WPS211
+    lint: bool = Option(
+        False,
+        "--lint",
+        help="Check the query plans of pending Cypher migrations "
+        "for performance problems.",
+    ),
+    lint_plans: Optional[Path] = Option(
+        None,
+        help="A JSON file with captured plans to use instead of "
+        "explaining statements in the database.",
+    ),
+    capture_plans: Optional[Path] = Option(
+        None,
+        help="A JSON file to save the plans explained by the database.",
+    ),
+    history: Optional[Path] = Option(
+        None,
+        help="An SQLite file created by the `export-history` command. "
+        "If specified, migrations are analyzed offline against this history.",
+    ),
+    all_projects: bool = Option(
+        False,
+        "--all-projects",
+        help="Analyze the chains of all projects and migration targets "
+        "in one query and print a status table.",
+    ),
+    project_path: Optional[list[str]] = Option(
+        None,
+        help="The migrations of another project for --all-projects "
+        "as NAME=PATH (can be repeated). --path is used for --project.",
+    ),
+) -> None:  # noqa: D103
+    if all_projects:
+        _analyze_all(_project_paths(project_path or []))
+        return
+    if history:
+        analyzing_result, lint_issues = _analyze_offline(history, lint_plans, lint=lint)
+    else:
+        analyzing_result, lint_issues = _analyze_online(
+            lint_plans if lint else None,
+            capture_plans,
+            lint=lint,
+        )
+
+    _print_analyzing_result(analyzing_result, lint_issues)
+
+
+@cli.command(
+    "export-history",
+    help="Export the applied migrations to an SQLite file for offline analysis.",
+)
+def export_history(output: Path) -> None:  # noqa: D103
+    with _executor() as executor:
+        entries = list(executor.dao.read_history())
+        squashed_to = executor.dao.get_squash_point()
+
+    history_store = _history_store(output)
+    history_store.import_migrations(entries, squashed_to)
+    print(f"Exported {len(entries)} migrations to {output}")
+
+
+@cli.command("history")
+def show_history(
+    all_projects: bool = Option(
+        False,
+        "--all-projects",
+        help="Show the migrations of all projects and migration targets.",
+    ),
+    page_size: int = Option(
+        1000,
+        min=1,
+        help="The number of records read from the database at once.",
+    ),
+    slowest: Optional[int] = Option(
+        None,
+        min=1,
+        help="Show only the N slowest migrations.",
+    ),
+    summary: bool = Option(
+        False,
+        "--summary",
+        help="Show the total time per project and migration target "
+        "and the duration trend by month instead of the records.",
+    ),
+) -> None:
+    """Show the applied migrations with the time and the duration of their runs."""
+    from neo4j_python_migrations.report import HistoryReport
+
+    with _executor() as executor:
+        entries = executor.history(all_projects=all_projects, page_size=page_size)
+        if not slowest and not summary:
+            for entry in entries:
+                _print_history_entry(entry)
+            return
+        history_report = HistoryReport.build(entries, top=slowest or 0)
+
+    for slow_entry in history_report.slowest:
+        _print_history_entry(slow_entry)
+    if summary:
+        _print_history_summary(history_report)
+
+
+@cli.command()
+def squash(
+    up_to: str = Option(..., help="The last version to squash."),
+    dry_run: bool = Option(
+        False,
+        "--dry-run",
+        help="Only show the migrations that would be squashed.",
+    ),
+) -> None:
+    """Replace applied migrations up to the version with the baseline."""
+    with _executor() as executor:
+        try:
+            squashed = executor.squash(up_to, dry_run=dry_run)
+        except ValueError as exc:
+            print(exc)
+            raise Exit(1)
+
+    for migration in squashed:
+        print(f"V{migration.version} Source: {migration.source}")
+    if dry_run:
+        print(f"{len(squashed)} migrations would be squashed up to V{up_to}.")
+    else:
+        print(f"Squashed {len(squashed)} migrations up to V{up_to}.")
+
+
+@cli.command()
+def repair(
+    delete_missed: bool = Option(
+        False,
+        "--delete-missed",
+        help="Also delete records of migrations that are missed locally.",
+    ),
+    dry_run: bool = Option(
+        False,
+        "--dry-run",
+        help="Only show the changes.",
+    ),
+) -> None:
+    """Update records of changed migrations with local checksums in one transaction."""
+    with _executor() as executor:
+        repair_plan = executor.repair(delete_missed, dry_run=dry_run)
+
+    _print_repair_plan(repair_plan)
+    changes = len(repair_plan.updates) + len(repair_plan.deletions)
+    if changes == 0:
+        print("Nothing to repair.")
+    elif dry_run:
+        print(f"{changes} records would be repaired.")
+    else:
+        print(f"Repaired {changes} records.")
+
+
+@cli.command()
+def status(
+    offline: bool = Option(
+        False,
+        "--offline",
+        help="Use local files only, without connecting to the database "
+        "(and without importing the driver).",
+    ),
+    history: Optional[Path] = Option(
+        None,
+        help="An SQLite file created by the `export-history` command "
+        "to compare local migrations with in the --offline mode. "
+        "All migrations are pending without it.",
+    ),
+) -> None:
+    """Show the status of each migration: applied, pending or invalid."""
+    from neo4j_python_migrations import analyzer
+
+    if history and not offline:
+        raise BadParameter("--history requires --offline.")
+
+    if offline:
+        local_migrations, applied_migrations, squashed_to = _offline_history(history)
+    else:
+        with _executor() as executor:
+            local_migrations = executor.local_migrations
+            applied_migrations = executor.dao.get_applied_migrations()
+            squashed_to = executor.dao.get_squash_point()
+
+    analyzing_result = analyzer.analyze(
+        local_migrations,
+        applied_migrations,
+        squashed_to,
+    )
+    _print_statuses(local_migrations, applied_migrations, analyzing_result)
+    if analyzing_result.invalid_versions:
+        raise Exit(1)
+
+
+@cli.command("bundle")
+def bundle_migrations(output: Path) -> None:
+    """Compile migrations into a single file that can be used as --path."""
+    from neo4j_python_migrations import bundle, loader
+
     if not state:
         raise Exit(2)
 
-    with GraphDatabase.driver(
-        str(URL.build(scheme=state.scheme, host=state.host, port=state.port)),
-        auth=(state.username, state.password),
-    ) as driver:
-        executor = Executor(
-            driver=driver,
-            migrations_path=Path(state.path),
-            project=state.project,
-            database=state.database,
-            schema_database=state.schema_database,
+    migrations = loader.load(Path(state.path))
+    bundle.write(migrations, Path(state.path), output)
+    print(f"Bundled {len(migrations)} migrations to {output}")
+
+
+def _offline_history(
+    history: Optional[Path],
+) -> tuple[list[Migration], list[Migration], Optional[str]]:
+    """Get local migrations, applied migrations and the squash point."""
+    from neo4j_python_migrations import loader
+
+    if not state:
+        raise Exit(2)
+
+    local_migrations = loader.load(Path(state.path))
+    if not history:
+        return local_migrations, [], None
+    history_store = _history_store(history)
+    return (
+        local_migrations,
+        history_store.get_applied_migrations(),
+        history_store.get_squash_point(),
+    )
+
+
+def _print_statuses(
+    local_migrations: list[Migration],
+    applied_migrations: list[Migration],
+    analyzing_result: analyzer.AnalyzingResult,
+) -> None:
+    statuses = {migration.version: "APPLIED" for migration in applied_migrations}
+    statuses.update(
+        (migration.version, "PENDING")
+        for migration in analyzing_result.pending_migrations
+    )
+    statuses.update(
+        (invalid_version.version, invalid_version.status.name)
+        for invalid_version in analyzing_result.invalid_versions
+    )
+    # Local migrations up to the squash point are neither applied nor pending.
+    migrations = {
+        migration.version: migration
+        for migration in (*applied_migrations, *local_migrations)
+    }
+    for migration in sorted(migrations.values()):
+        migration_status = statuses.get(migration.version, "SQUASHED")
+        print(
+            f"V{migration.version:<12} {migration_status:<16} {migration.description}"
+        )
+    print(f"Latest applied version: {analyzing_result.latest_applied_version}")
+
+
+def _analyze_all(project_paths: dict[Optional[str], Path]) -> None:
+    with _executor() as executor:
+        statuses = executor.analyze_all(project_paths)
+
+    _print_row("PROJECT", "TARGET", "LATEST", "PENDING", "INVALID", "STATUS")
+    for row_status in statuses:
+        _print_row(*_chain_columns(row_status))
+    if any(
+        chain_status.analyzing_result.invalid_versions
+        for chain_status in statuses
+        if chain_status.analyzing_result
+    ):
+        raise Exit(1)
+
+
+def _chain_columns(chain_status: analyzer.ChainStatus) -> list[str]:
+    names = [
+        chain_status.project or "<default>",
+        chain_status.migration_target or "<default>",
+    ]
+    analyzing_result = chain_status.analyzing_result
+    if analyzing_result is None:
+        return [*names, "-", "-", "-", "NO LOCAL PATH"]
+
+    pending = len(analyzing_result.pending_migrations)
+    invalid = len(analyzing_result.invalid_versions)
+    status = "UP-TO-DATE"
+    if invalid:
+        status = "INVALID"
+    elif pending:
+        status = "PENDING"
+    return [
+        *names,
+        analyzing_result.latest_applied_version or "-",
+        str(pending),
+        str(invalid),
+        status,
+    ]
+
+
+def _print_row(*columns: str) -> None:
+    print(
+        " ".join(
+            column.ljust(width) for column, width in zip(columns, _COLUMN_WIDTHS)
+        ).rstrip(),
+    )
+
+
+def _project_paths(project_path: list[str]) -> dict[Optional[str], Path]:
+    if not state:
+        raise Exit(2)
+
+    project_paths: dict[Optional[str], Path] = {state.project: Path(state.path)}
+    for option in project_path:
+        project, separator, path = option.partition("=")
+        if not separator or not project or not path:
+            raise BadParameter(f"Expected NAME=PATH, got {option!r}.")
+        project_paths[project] = Path(path)
+    return project_paths
+
+
+def _print_history_entry(entry: HistoryEntry) -> None:
+    installed_on = entry.installed_on.isoformat() if entry.installed_on else "-"
+    duration = "-" if entry.duration is None else timedelta(seconds=entry.duration)
+    installed_by = entry.installed_by or "-"
+    migration = entry.migration
+    print(
+        f"{installed_on} {_chain_name(entry.project, entry.migration_target)} "
+        f"V{migration.version} {duration} by {installed_by} ({migration.description})",
+    )
+
+
+def _print_history_summary(history_report: HistoryReport) -> None:
+    print("Total time per project and migration target:")
+    for chain_key, chain_aggregate in sorted(
+        history_report.chains.items(),
+        key=lambda chain: chain[1].total,
+        reverse=True,
+    ):
+        print(f"    {_chain_name(*chain_key)}: {_aggregate_summary(chain_aggregate)}")
+    print("Duration by month:")
+    for month, month_aggregate in sorted(history_report.months.items()):
+        print(f"    {month}: {_aggregate_summary(month_aggregate)}")
+
+
+def _chain_name(project: Optional[str], target: Optional[str]) -> str:
+    return "/".join((project or "<default>", target or "<default>"))
+
+
+def _aggregate_summary(aggregate: Aggregate) -> str:
+    total = timedelta(seconds=aggregate.total)
+    mean = timedelta(seconds=aggregate.mean)
+    return f"{total} for {aggregate.count} migrations, {mean} on average"
+
+
+def _rehearse(
+    executor: Executor,
+    progress_line: _ProgressLine,
+    rehearsal_file: Optional[Path],
+) -> None:
+    from neo4j_python_migrations import rehearsal
+    from neo4j_python_migrations.progress import MigrationCancelledError
+
+    try:
+        with _cancel_on_signals(executor):
+            rehearsals = executor.rehearse(on_progress=progress_line.show)
+    except MigrationCancelledError as exc:
+        progress_line.clear()
+        print(f"{datetime.now()} {exc}")
+        raise Exit(130)
+    progress_line.clear()
+
+    _print_rehearsals(rehearsals)
+    if rehearsal_file:
+        rehearsal.save(rehearsals, rehearsal_file)
+    if any(result.error for result in rehearsals):
+        raise Exit(1)
+
+
+def _check_migrate_options(
+    rehearse: bool,
+    bootstrap: bool,
+    workers: int,
+    time_budget: Optional[str],
+) -> None:
+    if time_budget is not None and (rehearse or bootstrap):
+        raise BadParameter(
+            "--time-budget can't be used with --rehearse or --bootstrap."
+        )
+    if workers > 1 and bootstrap:
+        raise BadParameter("--workers can't be used with --bootstrap.")
+    if workers > 1 and time_budget is not None:
+        raise BadParameter("--time-budget can't be used with --workers.")
+
+
+def _check_profile_options(
+    profile_python: Optional[list[ProfileMode]],
+    isolate_python: bool,
+    workers: int,
+) -> None:
+    if profile_python and isolate_python:
+        raise BadParameter("--profile-python can't be used with --isolate-python.")
+    if profile_python and workers > 1:
+        raise BadParameter("--profile-python can't be used with --workers.")
+
+
+def _bootstrap(
+    executor: Executor,
+    on_apply: Callable[[Migration], None],
+    progress_line: _ProgressLine,
+) -> None:
+    from neo4j_python_migrations.progress import MigrationCancelledError
+
+    try:
+        with _cancel_on_signals(executor):
+            bootstrap_plan = executor.bootstrap(
+                on_apply=on_apply,
+                on_progress=progress_line.show,
+            )
+    except MigrationCancelledError as exc:
+        progress_line.clear()
+        print(f"{datetime.now()} {exc}")
+        raise Exit(130)
+    except ValueError as exc:
+        progress_line.clear()
+        print(exc)
+        raise Exit(1)
+    progress_line.clear()
+    _print_bootstrap_plan(bootstrap_plan)
+
+
+def _print_bootstrap_plan(bootstrap_plan: BootstrapPlan) -> None:
+    for migration in bootstrap_plan.collapsed:
+        print(f"Migration V{migration.version} ({migration.description}) COLLAPSED")
+    for skipped in bootstrap_plan.skipped:
+        print(f"Migration V{skipped.version} ({skipped.description}) SKIPPED")
+    print(
+        f"Net schema: {len(bootstrap_plan.schema)} statements applied, "
+        f"{bootstrap_plan.elided} elided.",
+    )
+
+
+def _migrate(
+    executor: Executor,
+    on_apply: Callable[[Migration], None],
+    progress_line: _ProgressLine,
+    time_budget: Optional[float],
+    rehearsal_file: Optional[Path],
+) -> None:
+    from neo4j_python_migrations.progress import MigrationCancelledError
+    from neo4j_python_migrations.scheduler import UnrecordedMigrationsError
+
+    try:
+        with _cancel_on_signals(executor):
+            deferred = _migrate_within_budget(
+                executor,
+                on_apply,
+                progress_line,
+                time_budget,
+                rehearsal_file,
+            )
+    except MigrationCancelledError as exc:
+        progress_line.clear()
+        print(f"{datetime.now()} {exc}")
+        raise Exit(130)
+    except UnrecordedMigrationsError as exc:
+        progress_line.clear()
+        print(f"{datetime.now()} {exc}: {exc.__cause__}")
+        cancelled = isinstance(exc.__cause__, MigrationCancelledError)
+        raise Exit(130 if cancelled else 1)
+    _print_run_summary(executor)
+    _print_deferred(deferred)
+
+
+def _migrate_within_budget(
+    executor: Executor,
+    on_apply: Callable[[Migration], None],
+    progress_line: _ProgressLine,
+    time_budget: Optional[float],
+    rehearsal_file: Optional[Path],
+) -> list[tuple[Migration, Estimate]]:
+    from neo4j_python_migrations import rehearsal
+
+    if time_budget is None:
+        executor.migrate(on_apply=on_apply, on_progress=progress_line.show)
+        return []
+
+    rehearsals = []
+    if rehearsal_file and rehearsal_file.exists():
+        rehearsals = rehearsal.load(rehearsal_file)
+    deferred = executor.migrate(
+        on_apply=on_apply,
+        on_progress=progress_line.show,
+        time_budget=time_budget,
+        rehearsals=rehearsals,
+    )
+    return [
+        (migration, executor.estimates[migration.version]) for migration in deferred
+    ]
+
+
+def _print_deferred(deferred: list[tuple[Migration, Estimate]]) -> None:
+    for migration, migration_estimate in deferred:
+        expected = "no estimate"
+        if migration_estimate.duration is not None:
+            duration = timedelta(seconds=migration_estimate.duration)
+            expected = f"{duration} by {migration_estimate.source}"
+        print(
+            f"Migration V{migration.version} ({migration.description}) "
+            f"DEFERRED: {expected}",
+        )
+
+
+def _print_rehearsals(rehearsals: list[rehearsal.Rehearsal]) -> None:
+    for migration_rehearsal in rehearsals:
+        status = migration_rehearsal.error or ", ".join(
+            f"{counter}={count}"
+            for counter, count in migration_rehearsal.counters.items()
+        )
+        print(
+            f"V{migration_rehearsal.version:<12} "
+            f"{timedelta(seconds=migration_rehearsal.duration)}  {status}",
         )
+    total = sum(result.duration for result in rehearsals)
+    print(f"Total: {timedelta(seconds=total)} for {len(rehearsals)} migrations.")
+
+
+def _print_repair_plan(repair_plan: analyzer.RepairPlan) -> None:
+    for applied_migration, local_migration in repair_plan.updates:
+        for field_name in ("description", "type", "source", "checksum"):
+            _print_change(
+                local_migration.version,
+                field_name,
+                getattr(applied_migration, field_name),
+                getattr(local_migration, field_name),
+            )
+    for migration in repair_plan.deletions:
+        print(f"V{migration.version} DELETE (missed locally)")
+
+
+def _print_change(
+    version: str, field_name: str, old_value: Any, new_value: Any
+) -> None:
+    if old_value != new_value:
+        print(f"V{version} {field_name}: {old_value!r} -> {new_value!r}")
+
+
+def _print_run_summary(executor: Executor) -> None:
+    for version, retries in executor.retries.items():
+        print(f"V{version} Retried transactions: {retries}")
+    if executor.profiler:
+        _print_profile_reports(executor.profiler.reports)
+
+
+def _print_profile_reports(reports: list[ProfileReport]) -> None:
+    for report in reports:
+        memory = ""
+        if report.peak_memory is not None:
+            peak_memory = report.peak_memory / 2**20
+            memory = f", peak memory {peak_memory:.1f} MiB"
+        print(
+            f"V{report.version} Wall time {report.wall_time:.3f}s: "
+            f"server {report.server_time:.3f}s, client {report.client_time:.3f}s "
+            f"(CPU {report.cpu_time:.3f}s){memory}",
+        )
+        for path in report.paths:
+            print(f"    {path}")
+
+
+def _export_metrics(
+    metrics: Metrics,
+    metrics_file: Optional[Path],
+    metrics_push_url: Optional[str],
+) -> None:
+    if metrics_file:
+        metrics.write(metrics_file)
+    if metrics_push_url:
+        try:
+            metrics.push(metrics_push_url)
+        except OSError as exc:
+            print(f"Metrics could not be pushed: {exc}", file=sys.stderr)
+
+
+def _parse_duration(duration: Optional[str]) -> Optional[float]:
+    from neo4j_python_migrations import loader
+
+    if duration is None:
+        return None
+    try:
+        return loader.parse_duration(duration)
+    except ValueError as exc:
+        raise BadParameter(str(exc))
+
+
+def _history_store(path: Path) -> SQLiteHistoryStore:
+    from neo4j_python_migrations.history import SQLiteHistoryStore
+
+    if not state:
+        raise Exit(2)
+
+    return SQLiteHistoryStore(
+        str(path),
+        project=state.project,
+        database=state.database,
+    )
+
+
+def _analyze_online(
+    lint_plans: Optional[Path],
+    capture_plans: Optional[Path],
+    lint: bool,
+) -> tuple[analyzer.AnalyzingResult, list[linter.LintIssue]]:
+    with _executor() as executor:
         analyzing_result = executor.analyze()
+        if not lint:
+            return analyzing_result, []
+        return analyzing_result, _lint(
+            executor,
+            analyzing_result.pending_migrations,
+            lint_plans,
+            capture_plans,
+        )
+
+
+def _analyze_offline(
+    history: Path,
+    lint_plans: Optional[Path],
+    lint: bool,
+) -> tuple[analyzer.AnalyzingResult, list[linter.LintIssue]]:
+    from neo4j_python_migrations import analyzer, linter, loader
+    from neo4j_python_migrations.migration import CypherMigration
+
+    if not state:
+        raise Exit(2)
+    if lint and not lint_plans:
+        raise BadParameter("--lint requires --lint-plans with --history.")
+
+    history_store = _history_store(history)
+    analyzing_result = analyzer.analyze(
+        loader.load(Path(state.path)),
+        history_store.get_applied_migrations(),
+        history_store.get_squash_point(),
+    )
+    if not lint or not lint_plans:
+        return analyzing_result, []
 
+    cypher_migrations = [
+        migration
+        for migration in analyzing_result.pending_migrations
+        if isinstance(migration, CypherMigration)
+    ]
+    return analyzing_result, linter.lint(
+        cypher_migrations,
+        linter.CapturedPlans.from_file(lint_plans),
+    )
+
+
+def _print_analyzing_result(
+    analyzing_result: analyzer.AnalyzingResult,
+    lint_issues: list[linter.LintIssue],
+) -> None:
     if analyzing_result.invalid_versions:
         print("The database must be repaired. Invalid versions:")
         for invalid_version in analyzing_result.invalid_versions:
@@ -92,6 +988,41 @@ def analyze() -> None:  # noqa: D103
     for migration in analyzing_result.pending_migrations:
         print(f"V{migration.version} Source: {migration.source}")
 
+    if lint_issues:
+        _print_lint_issues(lint_issues)
+        raise Exit(1)
+
+
+def _print_lint_issues(lint_issues: list[linter.LintIssue]) -> None:
+    print("Performance issues:")
+    for issue in lint_issues:
+        print(f"V{issue.version} [{issue.rule}] {issue.message}")
+        print(f"    {issue.statement}")
+
+
+def _lint(
+    executor: Executor,
+    migrations: list[Migration],
+    lint_plans: Optional[Path],
+    capture_plans: Optional[Path],
+) -> list[linter.LintIssue]:
+    from neo4j_python_migrations import linter
+
+    if lint_plans:
+        return executor.lint(
+            linter.CapturedPlans.from_file(lint_plans),
+            migrations=migrations,
+        )
+
+    captured_plans = linter.CapturedPlans()
+    lint_issues = executor.lint(
+        captured_plans.capture(executor.explain),
+        migrations=migrations,
+    )
+    if capture_plans:
+        captured_plans.save(capture_plans)
+    return lint_issues
+
 
 @cli.callback()
 def main(  # noqa: WPS211, D103
@@ -140,6 +1071,48 @@ def main(  # noqa: WPS211, D103
         help="The database that should be migrated (Neo4j EE)",
         envvar="NEO4J_MIGRATIONS_DATABASE",
     ),
+    connection_config: Optional[Path] = Option(
+        None,
+        help="A JSON file with settings of the driver, e.g. "
+        '{"max_connection_pool_size": 50, "fetch_size": 5000}. '
+        "The options below override it.",
+        envvar="NEO4J_MIGRATIONS_CONNECTION_CONFIG",
+    ),
+    max_connection_pool_size: Optional[int] = Option(
+        None,
+        help="The maximum number of connections per host.",
+    ),
+    connection_acquisition_timeout: Optional[float] = Option(
+        None,
+        help="The maximum time to wait for a connection from the pool (seconds).",
+    ),
+    connection_timeout: Optional[float] = Option(
+        None,
+        help="The maximum time to establish a connection (seconds).",
+    ),
+    max_connection_lifetime: Optional[float] = Option(
+        None,
+        help="The maximum age of a connection (seconds).",
+    ),
+    liveness_check_timeout: Optional[float] = Option(
+        None,
+        help="Connections idle for longer are checked before use (seconds).",
+    ),
+    keep_alive: Optional[bool] = Option(
+        None,
+        "--keep-alive/--no-keep-alive",
+        help="Enable TCP keep-alive.",
+    ),
+    fetch_size: Optional[int] = Option(
+        None,
+        help="The number of records fetched at once.",
+    ),
+    warm_up: bool = Option(
+        False,
+        "--warm-up",
+        help="Verify connectivity and fetch routing tables of the database "
+        "and the schema database concurrently before the command.",
+    ),
 ) -> None:
     global state  # noqa: WPS420
     state = State(  # noqa: WPS442
@@ -152,4 +1125,23 @@ def main(  # noqa: WPS211, D103
         project=project,
         database=database,
         schema_database=schema_database,
+        connection_profile=_connection_profile(connection_config).merge(
+            max_connection_pool_size=max_connection_pool_size,
+            connection_acquisition_timeout=connection_acquisition_timeout,
+            connection_timeout=connection_timeout,
+            max_connection_lifetime=max_connection_lifetime,
+            liveness_check_timeout=liveness_check_timeout,
+            keep_alive=keep_alive,
+            fetch_size=fetch_size,
+        ),
+        warm_up=warm_up,
     )
+
+
+def _connection_profile(connection_config: Optional[Path]) -> ConnectionProfile:
+    if not connection_config:
+        return ConnectionProfile()
+    try:
+        return ConnectionProfile.from_file(connection_config)
+    except (OSError, ValueError, TypeError) as exc:
+        raise BadParameter(f"Invalid connection config: {exc}")
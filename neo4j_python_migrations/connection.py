@@ -0,0 +1,65 @@
+import json
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+from typing import Any, Optional
+
+
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """
+    Settings of the driver.
+
+    Settings that are not specified keep the defaults of the driver.
+    """
+
+    # The maximum number of connections per host.
+    max_connection_pool_size: Optional[int] = None
+    # The maximum time to wait for a connection from the pool (seconds).
+    connection_acquisition_timeout: Optional[float] = None
+    # The maximum time to establish a connection (seconds).
+    connection_timeout: Optional[float] = None
+    # The maximum age of a connection (seconds).
+    max_connection_lifetime: Optional[float] = None
+    # Connections idle for longer are checked before use (seconds).
+    liveness_check_timeout: Optional[float] = None
+    keep_alive: Optional[bool] = None
+    # The number of records fetched at once.
+    fetch_size: Optional[int] = None
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ConnectionProfile":
+        """
+        Load the settings from a JSON file.
+
+        :param path: the path to the file with an object of settings.
+        :raises ValueError: if the file contains unknown settings.
+        :return: class instance.
+        """
+        settings = json.loads(path.read_text())
+        known = {profile_field.name for profile_field in fields(cls)}
+        unknown = ", ".join(sorted(set(settings) - known))
+        if unknown:
+            raise ValueError(f"Unknown connection settings: {unknown}")
+        return cls(**settings)
+
+    def merge(self, **overrides: Any) -> "ConnectionProfile":
+        """
+        Override the settings, `None` values are ignored.
+
+        :param overrides: the settings.
+        :return: new class instance.
+        """
+        return replace(
+            self,
+            **{name: value for name, value in overrides.items() if value is not None},
+        )
+
+    def driver_options(self) -> dict[str, Any]:
+        """
+        Get the keyword arguments of `GraphDatabase.driver`.
+
+        :return: the specified settings.
+        """
+        return {
+            name: value for name, value in asdict(self).items() if value is not None
+        }
@@ -1,27 +1,61 @@
 from functools import cached_property
 from getpass import getuser
-from typing import Optional
+from typing import Any, Callable, Iterator, Optional
 
-from neo4j import Driver
+from neo4j import (
+    READ_ACCESS,
+    WRITE_ACCESS,
+    Driver,
+    Query,
+    Record,
+    Result,
+    Session,
+    Transaction,
+)
+from neo4j.api import BookmarkManager
 
-from neo4j_python_migrations.migration import Migration
+from neo4j_python_migrations.bootstrap import parse_schema_statement
+from neo4j_python_migrations.history import (
+    Chain,
+    HistoryEntry,
+    select_squashed,
+    squash_digest,
+)
+from neo4j_python_migrations.migration import (
+    CypherMigration,
+    DataMigration,
+    Migration,
+)
+from neo4j_python_migrations.retry import RetryPolicy
 
+APP_NAME = "neo4j-python-migrations"
 
-class MigrationDAO:
+_SECONDS_PER_DAY = 86400
+_NANOSECONDS_PER_SECOND = 1e9
+
+
+class MigrationDAO:  # noqa: WPS230
     """DAO for working with the migration schema."""
 
-    def __init__(
+    def __init__(  # noqa: WPS211
         self,
         driver: Driver,
         project: Optional[str] = None,
         database: Optional[str] = None,
         schema_database: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        bookmark_manager: Optional[BookmarkManager] = None,
+        metadata: Optional[dict[str, Any]] = None,
     ):
         self.driver = driver
         self.project = project
         self.schema_database = schema_database
         self.database = None if database == schema_database else database
         self.baseline = "BASELINE"
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.bookmark_manager = bookmark_manager
+        # Metadata of transactions, it is visible in `SHOW TRANSACTIONS`.
+        self.metadata = metadata or {"app": APP_NAME, "project": project}
 
     @cached_property
     def user(self) -> Optional[str]:
@@ -30,21 +64,116 @@ class MigrationDAO:
 
         :returns: the name.
         """
-        with self.driver.session(database=self.schema_database) as session:
-            query_result = session.run("SHOW CURRENT USER").single()
+        with self._session(READ_ACCESS) as session:
+            query_result = self._run(session, "SHOW CURRENT USER").single()
             if query_result:
                 return query_result.value("user")
             return None
 
     def create_baseline(self) -> None:
         """Create a base node if it doesn't already exist."""
-        with self.driver.session(database=self.schema_database) as session:
-            query_params = {
-                "version": self.baseline,
-                "project": self.project,
-                "migration_target": self.database,
-            }
-            query_result = session.run(
+        self.retry_policy.run(lambda attempt: self._create_baseline())
+
+    def create_constraints(self) -> None:
+        """
+        Create constraints in the database.
+
+        This is useful for maintaining the integrity of the migration schema.
+        """
+        self.retry_policy.run(lambda attempt: self._create_constraints())
+
+    def add_migration(
+        self,
+        migration: Migration,
+        duration: float,
+        dry_run: bool = False,
+        on_retry: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """
+        Add a migration record.
+
+        If the transaction is retried, the record is not created again
+        when the previous attempt has managed to commit it.
+
+        :param migration: applied migration.
+        :param duration: duration of migration execution (seconds).
+        :param dry_run: do not make actual changes.
+        :param on_retry: callback that is called before each retry.
+        """
+        self.retry_policy.run(
+            lambda attempt: self._add_migration(
+                migration,
+                duration,
+                dry_run=dry_run,
+                retried=attempt > 1,
+            ),
+            on_retry=on_retry,
+        )
+
+    def can_record_in(self, migration: Migration) -> bool:
+        """
+        Check if the record can be added in the transaction of the migration.
+
+        Schema and data can't be written by one transaction, so only
+        migrations that are known not to change the schema qualify:
+        Cypher migrations without schema statements and data migrations.
+
+        :param migration: the migration.
+        :return: the check result.
+        """
+        if isinstance(migration, DataMigration):
+            return True
+        return isinstance(migration, CypherMigration) and not any(
+            map(parse_schema_statement, migration.statements),
+        )
+
+    def add_migration_in(
+        self,
+        tx: Transaction,
+        migration: Migration,
+        duration: float,
+    ) -> None:
+        """
+        Add a migration record in the transaction that applies the migration.
+
+        The record is committed with the changes of the migration,
+        so a migration whose commit has failed ambiguously (e.g. the connection
+        was lost) is found applied by the retry instead of being applied twice.
+        The transaction must belong to the schema database,
+        see also `can_record_in`.
+
+        :param tx: the transaction of the migration.
+        :param migration: applied migration.
+        :param duration: duration of migration execution (seconds).
+        """
+        self._create_record(tx, migration, duration)
+
+    def add_migrations(self, records: list[tuple[Migration, float]]) -> None:
+        """
+        Add records of migrations at the end of the chain in one write.
+
+        The records and the links between them are created by one
+        UNWIND-batched query. If the transaction is retried, nothing is
+        created again when the previous attempt has managed to commit it.
+
+        :param records: applied migrations in version order
+                        and their durations (seconds).
+        """
+        if records:
+            self.retry_policy.run(
+                lambda attempt: self._add_migrations(records, retried=attempt > 1),
+            )
+
+    def is_applied(self, version: str) -> bool:
+        """
+        Check if there is a record of the migration version.
+
+        :param version: the version.
+        :return: the check result.
+        """
+        with self._session(READ_ACCESS) as session:
+            query_result = self._run(
+                session,
                 """
                 MATCH (m:__Neo4jMigration {version: $version})
                 WHERE
@@ -52,130 +181,638 @@ class MigrationDAO:
                         = coalesce($project,'<default>')
                     AND coalesce(m.migrationTarget,'<default>')
                         = coalesce($migration_target,'<default>')
-                RETURN m
+                RETURN count(m) > 0 AS applied
                 """,
-                query_params,
-            )
-            if query_result.single():
-                return
+                version=version,
+                project=self.project,
+                migration_target=self.database,
+            ).single()
+            return bool(query_result and query_result.value("applied"))
 
-            session.run(
+    def get_applied_migrations(self) -> list[Migration]:
+        """
+        Get an ordered list of applied migrations to the database.
+
+        The Baseline is ignored.
+        :return: sorted list of migrations.
+        """
+        with self._session(READ_ACCESS) as session:
+            query_result = self._run(
+                session,
                 """
-                CREATE (:__Neo4jMigration {
-                    version: $version,
-                    project: $project,
-                    migrationTarget: $migration_target
-                })
+                MATCH (:__Neo4jMigration{
+                        version: $baseline
+                })-[:MIGRATED_TO*]->(m:__Neo4jMigration)
+                WHERE
+                    coalesce(m.project,'<default>')
+                        = coalesce($project,'<default>')
+                    AND coalesce(m.migrationTarget,'<default>')
+                        = coalesce($migration_target,'<default>')
+                WITH m,
+                    [x IN split(m.version, '.') | toInteger(x)] AS version
+                RETURN m
+                ORDER BY version
                 """,
-                query_params,
+                baseline=self.baseline,
+                project=self.project,
+                migration_target=self.database,
             )
+            return [Migration.from_dict(row.data()["m"]) for row in query_result]
 
-    def create_constraints(self) -> None:
+    def get_squash_point(self) -> Optional[str]:
         """
-        Create constraints in the database.
+        Get the version the history has been squashed to.
 
-        This is useful for maintaining the integrity of the migration schema.
+        :return: the version or `None` if the history has not been squashed.
+        """
+        baseline = self._get_baseline()
+        return baseline.get("squashedTo") if baseline else None
+
+    def get_chains(self) -> list[Chain]:
+        """
+        Get the chains of all projects and migration targets.
+
+        All chains are read by one query, so the whole schema database
+        can be verified in one round trip.
+
+        :return: the chains.
         """
-        with self.driver.session(database=self.schema_database) as session:
-            session.run(
+        with self._session(READ_ACCESS) as session:
+            query_result = self._run(
+                session,
                 """
-                CREATE CONSTRAINT unique_version___Neo4jMigration
-                IF NOT EXISTS FOR (m:__Neo4jMigration)
-                REQUIRE (m.version, m.project, m.migrationTarget) IS UNIQUE
+                MATCH (b:__Neo4jMigration {version: $baseline})
+                OPTIONAL MATCH (b)-[:MIGRATED_TO*]->(m:__Neo4jMigration)
+                RETURN
+                    b.project AS project,
+                    b.migrationTarget AS migrationTarget,
+                    b.squashedTo AS squashedTo,
+                    collect(m) AS migrations
                 """,
+                baseline=self.baseline,
             )
+            return [
+                Chain(
+                    project=row["project"],
+                    migration_target=row["migrationTarget"],
+                    migrations=sorted(
+                        Migration.from_dict(dict(node)) for node in row["migrations"]
+                    ),
+                    squashed_to=row["squashedTo"],
+                )
+                for row in query_result
+            ]
 
-    def add_migration(
+    def read_history(
         self,
-        migration: Migration,
-        duration: float,
-        dry_run: bool = False,
-    ) -> None:
+        all_projects: bool = False,
+        page_size: int = 1000,
+        all_targets: bool = False,
+    ) -> Iterator[HistoryEntry]:
         """
-        Add a migration record.
+        Get the records of applied migrations in the order they were applied.
 
-        :param migration: applied migration.
-        :param duration: duration of migration execution (seconds).
+        The details of runs are read from the `MIGRATED_TO` relationships.
+        The records are read page by page as the iterator is consumed,
+        each page is a query that continues after the last record
+        of the previous one, so the pages don't slow down with the offset.
+        The records written at once (they have the same time) are ordered
+        by their position in the chain.
+
+        :param all_projects: get the records of all projects and migration targets.
+        :param page_size: the number of records read at once.
+        :param all_targets: get the records of the project in all migration targets.
+        :yields: the records.
+        """
+        after: dict[str, Any] = {
+            "after_at": None,
+            "after_position": None,
+            "after_id": None,
+        }
+        while True:
+            with self._session(READ_ACCESS) as session:
+                rows = list(
+                    self._run(
+                        session,
+                        """
+                        MATCH
+                            (:__Neo4jMigration)-[link:MIGRATED_TO]->(m:__Neo4jMigration)
+                        WHERE
+                            (
+                                $all_projects
+                                OR coalesce(m.project,'<default>')
+                                    = coalesce($project,'<default>')
+                                AND (
+                                    $all_targets
+                                    OR coalesce(m.migrationTarget,'<default>')
+                                        = coalesce($migration_target,'<default>')
+                                )
+                            )
+                            AND (
+                                $after_at IS NULL
+                                OR link.at > $after_at
+                                OR link.at = $after_at AND (
+                                    coalesce(link.position, 0) > $after_position
+                                    OR coalesce(link.position, 0) = $after_position
+                                        AND elementId(m) > $after_id
+                                )
+                            )
+                        RETURN
+                            m,
+                            link,
+                            coalesce(link.position, 0) AS position,
+                            elementId(m) AS id
+                        ORDER BY link.at, position, id
+                        LIMIT $page_size
+                        """,
+                        all_projects=all_projects,
+                        all_targets=all_targets,
+                        project=self.project,
+                        migration_target=self.database,
+                        page_size=page_size,
+                        **after,
+                    ),
+                )
+            yield from (_history_entry(row) for row in rows)
+            if len(rows) < page_size:
+                return
+            last_row = rows[-1]
+            after = {
+                "after_at": last_row["link"]["at"],
+                "after_position": last_row["position"],
+                "after_id": last_row["id"],
+            }
+
+    def squash(self, up_to: str, dry_run: bool = False) -> list[Migration]:
+        """
+        Replace applied migrations up to the version with the Baseline.
+
+        The squashed nodes are deleted in one transaction, the Baseline
+        is linked to the next migration and records the version
+        (`squashedTo`) and the combined digest (`squashedDigest`)
+        of the squashed migrations.
+
+        :param up_to: the last squashed version, it must be applied.
         :param dry_run: do not make actual changes.
-        :raises ValueError: if the migration record has not been created.
+        :return: the squashed migrations.
+        """
+        squashed = select_squashed(self.get_applied_migrations(), up_to)
+        if not dry_run:
+            baseline = self._get_baseline() or {}
+            digest = squash_digest(squashed, baseline.get("squashedDigest"))
+            self.retry_policy.run(
+                lambda attempt: self._squash(
+                    up_to,
+                    squashed,
+                    digest,
+                    retried=attempt > 1,
+                ),
+            )
+        return squashed
+
+    def repair(self, updates: list[Migration], deletions: list[str]) -> None:
+        """
+        Update and delete migration records in one transaction.
+
+        Records are updated and deleted by UNWIND-batched queries,
+        the chain is relinked around the deleted records.
+
+        :param updates: migrations whose records should get their description,
+                        type, source and checksum.
+        :param deletions: versions whose records should be deleted.
         """
-        with self.driver.session(database=self.schema_database) as session:
-            with session.begin_transaction() as tx:
-                run_result = tx.run(
+        self.retry_policy.run(lambda attempt: self._repair(updates, deletions))
+
+    def _get_baseline(self) -> Optional[dict[str, Any]]:
+        with self._session(READ_ACCESS) as session:
+            query_result = self._run(
+                session,
+                """
+                MATCH (m:__Neo4jMigration {version: $baseline})
+                WHERE
+                    coalesce(m.project,'<default>')
+                        = coalesce($project,'<default>')
+                    AND coalesce(m.migrationTarget,'<default>')
+                        = coalesce($migration_target,'<default>')
+                RETURN m
+                """,
+                baseline=self.baseline,
+                project=self.project,
+                migration_target=self.database,
+            ).single()
+            return dict(query_result["m"]) if query_result else None
+
+    def _squash(
+        self,
+        up_to: str,
+        squashed: list[Migration],
+        digest: str,
+        retried: bool,
+    ) -> None:
+        if retried and self.get_squash_point() == up_to:
+            return
+
+        with self._session(WRITE_ACCESS) as session:
+            with session.begin_transaction(metadata=self._metadata()) as tx:
+                summary = tx.run(
                     """
-                    MATCH (m1:__Neo4jMigration)
+                    MATCH (b:__Neo4jMigration {version: $baseline})
                     WHERE
-                        coalesce(m1.project,'<default>')
+                        coalesce(b.project,'<default>')
                             = coalesce($project,'<default>')
-                        AND coalesce(m1.migrationTarget,'<default>')
+                        AND coalesce(b.migrationTarget,'<default>')
                             = coalesce($migration_target,'<default>')
-                        AND NOT (m1)-[:MIGRATED_TO]->(:__Neo4jMigration)
-                    WITH m1
-                    CREATE (m2:__Neo4jMigration {
-                            version: $version_to,
-                            description: $description,
-                            type: $type,
-                            source: $source,
-                            project: $project,
-                            migrationTarget: $migration_target,
-                            checksum: $checksum
+                    MATCH (b)-[:MIGRATED_TO*]->(last:__Neo4jMigration {version: $up_to})
+                    OPTIONAL MATCH (last)-[link:MIGRATED_TO]->(next:__Neo4jMigration)
+                    FOREACH (n IN CASE WHEN next IS NULL THEN [] ELSE [next] END |
+                        CREATE (b)-[new_link:MIGRATED_TO]->(n)
+                        SET new_link = properties(link)
+                    )
+                    WITH DISTINCT b
+                    MATCH (b)-[:MIGRATED_TO*]->(m:__Neo4jMigration)
+                    WHERE m.version IN $versions
+                    WITH b, collect(m) AS squashed
+                    FOREACH (m IN squashed | DETACH DELETE m)
+                    SET
+                        b.squashedTo = $up_to,
+                        b.squashedDigest = $digest,
+                        b.squashedAt = datetime()
+                    """,
+                    baseline=self.baseline,
+                    project=self.project,
+                    migration_target=self.database,
+                    up_to=up_to,
+                    versions=[migration.version for migration in squashed],
+                    digest=digest,
+                ).consume()
+                if summary.counters.nodes_deleted != len(squashed):
+                    raise ValueError(
+                        "The history could not be squashed. "
+                        "Check the migration graph.",
+                    )
+
+    def _repair(self, updates: list[Migration], deletions: list[str]) -> None:
+        # The chain is read on each attempt, so records deleted
+        # by an attempt that has managed to commit are skipped.
+        versions = [migration.version for migration in self.get_applied_migrations()]
+        deletions = [version for version in deletions if version in versions]
+        with self._session(WRITE_ACCESS) as session:
+            with session.begin_transaction(metadata=self._metadata()) as tx:
+                tx.run(
+                    """
+                    UNWIND $updates AS row
+                    MATCH (m:__Neo4jMigration {version: row.version})
+                    WHERE
+                        coalesce(m.project,'<default>')
+                            = coalesce($project,'<default>')
+                        AND coalesce(m.migrationTarget,'<default>')
+                            = coalesce($migration_target,'<default>')
+                    SET
+                        m.description = row.description,
+                        m.type = row.type,
+                        m.source = row.source,
+                        m.checksum = row.checksum
+                    """,
+                    updates=[
+                        {
+                            "version": migration.version,
+                            "description": migration.description,
+                            "type": migration.type,
+                            "source": migration.source,
+                            "checksum": migration.checksum,
                         }
+                        for migration in updates
+                    ],
+                    project=self.project,
+                    migration_target=self.database,
+                ).consume()
+                tx.run(
+                    """
+                    UNWIND $links AS link
+                    MATCH
+                        (prev:__Neo4jMigration {version: link.previous}),
+                        (last:__Neo4jMigration {version: link.lastDeleted})
+                            -[out:MIGRATED_TO]->
+                            (next:__Neo4jMigration {version: link.next})
+                    WHERE
+                        coalesce(prev.project,'<default>')
+                            = coalesce($project,'<default>')
+                        AND coalesce(prev.migrationTarget,'<default>')
+                            = coalesce($migration_target,'<default>')
+                        AND coalesce(last.project,'<default>')
+                            = coalesce($project,'<default>')
+                        AND coalesce(last.migrationTarget,'<default>')
+                            = coalesce($migration_target,'<default>')
+                    CREATE (prev)-[new_link:MIGRATED_TO]->(next)
+                    SET new_link = properties(out)
+                    """,
+                    links=_relink(self.baseline, versions, deletions),
+                    project=self.project,
+                    migration_target=self.database,
+                ).consume()
+                summary = tx.run(
+                    """
+                    UNWIND $versions AS version
+                    MATCH (m:__Neo4jMigration {version: version})
+                    WHERE
+                        coalesce(m.project,'<default>')
+                            = coalesce($project,'<default>')
+                        AND coalesce(m.migrationTarget,'<default>')
+                            = coalesce($migration_target,'<default>')
+                    DETACH DELETE m
+                    """,
+                    versions=deletions,
+                    project=self.project,
+                    migration_target=self.database,
+                ).consume()
+                if summary.counters.nodes_deleted != len(deletions):
+                    raise ValueError(
+                        "The migration records could not be deleted. "
+                        "Check the migration graph.",
                     )
-                    MERGE (m1)-[link:MIGRATED_TO]->(m2)
+
+    def _add_migrations(
+        self,
+        records: list[tuple[Migration, float]],
+        retried: bool,
+    ) -> None:
+        if retried and self.is_applied(records[0][0].version):
+            return
+
+        with self._session(WRITE_ACCESS) as session:
+            with session.begin_transaction(metadata=self._metadata()) as tx:
+                summary = tx.run(
+                    """
+                    MATCH (last:__Neo4jMigration)
+                    WHERE
+                        coalesce(last.project,'<default>')
+                            = coalesce($project,'<default>')
+                        AND coalesce(last.migrationTarget,'<default>')
+                            = coalesce($migration_target,'<default>')
+                        AND NOT (last)-[:MIGRATED_TO]->(:__Neo4jMigration)
+                    UNWIND range(0, size($records) - 1) AS index
+                    WITH last, index, $records[index] AS row
+                    CREATE (m:__Neo4jMigration {
+                        version: row.version,
+                        description: row.description,
+                        type: row.type,
+                        source: row.source,
+                        project: $project,
+                        migrationTarget: $migration_target,
+                        checksum: row.checksum
+                    })
+                    WITH last, index, row, m
+                    ORDER BY index
+                    WITH last, collect({node: m, duration: row.duration}) AS created
+                    WITH [{node: last}] + created AS chain
+                    UNWIND range(1, size(chain) - 1) AS index
+                    WITH index, chain[index - 1].node AS previous, chain[index] AS row
+                    WITH index, previous, row.node AS m, row.duration AS seconds
+                    CREATE (previous)-[link:MIGRATED_TO]->(m)
                     SET
                         link.at = datetime(),
-                        link.in = duration({seconds: $duration}),
+                        link.position = index,
+                        link.in = duration({seconds: seconds}),
                         link.by = $migrated_by,
                         link.connectedAs = $connected_as
                     """,
-                    version_to=migration.version,
-                    description=migration.description,
-                    source=migration.source,
-                    type=migration.type,
-                    checksum=migration.checksum,
-                    duration=duration,
+                    records=[
+                        {
+                            "version": migration.version,
+                            "description": migration.description,
+                            "type": migration.type,
+                            "source": migration.source,
+                            "checksum": migration.checksum,
+                            "duration": duration,
+                        }
+                        for migration, duration in records
+                    ],
                     project=self.project,
                     migration_target=self.database,
                     migrated_by=getuser(),
                     connected_as=self.user,
-                )
-                result_summary = run_result.consume()
-                if dry_run:
+                ).consume()
+                if summary.counters.relationships_created != len(records):
                     tx.rollback()
-                if (
-                    result_summary.counters.nodes_created != 1
-                    and result_summary.counters.relationships_created != 1
-                ):
                     raise ValueError(
-                        "The migration record could not be created. "
+                        "The migration records could not be created. "
                         "Check the migration graph.",
                     )
 
-    def get_applied_migrations(self) -> list[Migration]:
-        """
-        Get an ordered list of applied migrations to the database.
-
-        The Baseline is ignored.
-        :return: sorted list of migrations.
-        """
-        with self.driver.session(database=self.schema_database) as session:
-            query_result = session.run(
+    def _create_baseline(self) -> None:
+        query_params = {
+            "version": self.baseline,
+            "project": self.project,
+            "migration_target": self.database,
+        }
+        with self._session(READ_ACCESS) as session:
+            query_result = self._run(
+                session,
                 """
-                MATCH (:__Neo4jMigration{
-                        version: $baseline
-                })-[:MIGRATED_TO*]->(m:__Neo4jMigration)
+                MATCH (m:__Neo4jMigration {version: $version})
                 WHERE
                     coalesce(m.project,'<default>')
                         = coalesce($project,'<default>')
                     AND coalesce(m.migrationTarget,'<default>')
                         = coalesce($migration_target,'<default>')
-                WITH m,
-                    [x IN split(m.version, '.') | toInteger(x)] AS version
                 RETURN m
-                ORDER BY version
                 """,
-                baseline=self.baseline,
-                project=self.project,
-                migration_target=self.database,
+                query_params,
             )
-            return [Migration.from_dict(row.data()["m"]) for row in query_result]
+            if query_result.single():
+                return
+
+        with self._session(WRITE_ACCESS) as session:
+            self._run(
+                session,
+                """
+                CREATE (:__Neo4jMigration {
+                    version: $version,
+                    project: $project,
+                    migrationTarget: $migration_target
+                })
+                """,
+                query_params,
+            )
+
+    def _create_constraints(self) -> None:
+        with self._session(WRITE_ACCESS) as session:
+            self._run(
+                session,
+                """
+                CREATE CONSTRAINT unique_version___Neo4jMigration
+                IF NOT EXISTS FOR (m:__Neo4jMigration)
+                REQUIRE (m.version, m.project, m.migrationTarget) IS UNIQUE
+                """,
+            )
+
+    def _add_migration(
+        self,
+        migration: Migration,
+        duration: float,
+        dry_run: bool,
+        retried: bool,
+    ) -> None:
+        """
+        Add a migration record.
+
+        :param migration: applied migration.
+        :param duration: duration of migration execution (seconds).
+        :param dry_run: do not make actual changes.
+        :param retried: whether the previous attempt has failed.
+        :raises ValueError: if the migration record has not been created.
+        """
+        if retried and not dry_run and self.is_applied(migration.version):
+            return
+
+        with self._session(WRITE_ACCESS) as session:
+            with session.begin_transaction(
+                metadata=self._metadata(migration),
+            ) as tx:
+                self._create_record(tx, migration, duration)
+                if dry_run:
+                    tx.rollback()
+
+    def _create_record(
+        self,
+        tx: Transaction,
+        migration: Migration,
+        duration: float,
+    ) -> None:
+        run_result = tx.run(
+            """
+            MATCH (m1:__Neo4jMigration)
+            WHERE
+                coalesce(m1.project,'<default>')
+                    = coalesce($project,'<default>')
+                AND coalesce(m1.migrationTarget,'<default>')
+                    = coalesce($migration_target,'<default>')
+                AND NOT (m1)-[:MIGRATED_TO]->(:__Neo4jMigration)
+            WITH m1
+            CREATE (m2:__Neo4jMigration {
+                    version: $version_to,
+                    description: $description,
+                    type: $type,
+                    source: $source,
+                    project: $project,
+                    migrationTarget: $migration_target,
+                    checksum: $checksum
+                }
+            )
+            MERGE (m1)-[link:MIGRATED_TO]->(m2)
+            SET
+                link.at = datetime(),
+                link.in = duration({seconds: $duration}),
+                link.by = $migrated_by,
+                link.connectedAs = $connected_as
+            """,
+            version_to=migration.version,
+            description=migration.description,
+            source=migration.source,
+            type=migration.type,
+            checksum=migration.checksum,
+            duration=duration,
+            project=self.project,
+            migration_target=self.database,
+            migrated_by=getuser(),
+            connected_as=self.user,
+        )
+        result_summary = run_result.consume()
+        if (
+            result_summary.counters.nodes_created != 1
+            and result_summary.counters.relationships_created != 1
+        ):
+            raise ValueError(
+                "The migration record could not be created. "
+                "Check the migration graph.",
+            )
+
+    def _session(self, access_mode: str) -> Session:
+        """
+        Open a session to the schema database.
+
+        Read sessions can be routed to followers, the bookmark manager
+        keeps them consistent with the writes made earlier.
+
+        :param access_mode: `READ_ACCESS` or `WRITE_ACCESS`.
+        :return: the session.
+        """
+        return self.driver.session(
+            database=self.schema_database,
+            default_access_mode=access_mode,
+            bookmark_manager=self.bookmark_manager,
+        )
+
+    def _metadata(self, migration: Optional[Migration] = None) -> dict[str, Any]:
+        if not migration:
+            return self.metadata
+        return {
+            **self.metadata,
+            "version": migration.version,
+            "source": migration.source,
+        }
+
+    def _run(
+        self,
+        session: Session,
+        query: str,
+        parameters: Optional[dict[str, Any]] = None,
+        **kwparameters: Any,
+    ) -> Result:
+        return session.run(
+            Query(query, metadata=self._metadata()),
+            parameters,
+            **kwparameters,
+        )
+
+
+def _history_entry(row: Record) -> HistoryEntry:
+    node = dict(row["m"])
+    link = row["link"]
+    installed_on = link.get("at")
+    duration = link.get("in")
+    return HistoryEntry(
+        project=node.get("project"),
+        migration_target=node.get("migrationTarget"),
+        migration=Migration.from_dict(node),
+        installed_on=installed_on.to_native() if installed_on else None,
+        duration=(
+            duration.days * _SECONDS_PER_DAY
+            + duration.seconds
+            + duration.nanoseconds / _NANOSECONDS_PER_SECOND
+            if duration
+            else None
+        ),
+        installed_by=link.get("by"),
+        connected_as=link.get("connectedAs"),
+    )
+
+
+def _relink(
+    baseline: str,
+    versions: list[str],
+    deletions: list[str],
+) -> list[dict[str, str]]:
+    """
+    Get links that bypass deleted records.
+
+    :param baseline: the version of the Baseline.
+    :param versions: sorted versions of the chain.
+    :param deletions: versions to delete.
+    :return: links from the previous kept record to the next one
+             with the last deleted record before the next one.
+    """
+    links = []
+    previous = baseline
+    last_deleted = None
+    for version in versions:
+        if version in deletions:
+            last_deleted = version
+            continue
+        if last_deleted:
+            links.append(
+                {"previous": previous, "lastDeleted": last_deleted, "next": version},
+            )
+            last_deleted = None
+        previous = version
+    return links
@@ -1,30 +1,71 @@
 import time
-from pathlib import Path
-from typing import Callable, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager, nullcontext, suppress
+from functools import partial
+from threading import Event
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, cast
+from uuid import uuid4
 
-from neo4j import Driver
+from neo4j import READ_ACCESS, Driver, GraphDatabase, Session, Transaction
+from neo4j.api import BookmarkManager
+from neo4j.exceptions import DriverError, Neo4jError
+from packaging.version import Version
 
-from neo4j_python_migrations import analyzer, loader
-from neo4j_python_migrations.dao import MigrationDAO
-from neo4j_python_migrations.migration import Migration
+from neo4j_python_migrations import (
+    analyzer,
+    budget,
+    linter,
+    loader,
+    progress,
+    rehearsal,
+    scheduler,
+    worker,
+)
+from neo4j_python_migrations.bootstrap import BootstrapPlan
+from neo4j_python_migrations.bootstrap import plan as plan_bootstrap
+from neo4j_python_migrations.dao import APP_NAME, MigrationDAO
+from neo4j_python_migrations.history import HistoryEntry, HistoryStore
+from neo4j_python_migrations.metrics import MeteredTransaction, Metrics
+from neo4j_python_migrations.migration import (
+    CypherMigration,
+    DataMigration,
+    Migration,
+    PythonMigration,
+    count_updates,
+)
+from neo4j_python_migrations.partition import bind as bind_batch_runner
+from neo4j_python_migrations.profiling import Profiler
+from neo4j_python_migrations.retry import RetryPolicy
 
 
-class Executor:
+class Executor:  # noqa: WPS230
     """A class for working with migrations."""
 
     def __init__(  # noqa: WPS211
         self,
         driver: Driver,
-        migrations_path: Path,
+        migrations_path: loader.Traversable,
         project: Optional[str] = None,
         database: Optional[str] = None,
         schema_database: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        bookmark_manager: Optional[BookmarkManager] = None,
+        history_store: Optional[HistoryStore] = None,
+        progress_interval: float = 1,
+        timeout: Optional[float] = None,
+        metrics: Optional[Metrics] = None,
+        profiler: Optional[Profiler] = None,
+        worker_config: Optional[worker.WorkerConfig] = None,
+        batch_size: Optional[int] = None,
+        workers: int = 1,
     ):
         """
         Initialize the class instance by loading local migrations from the file system.
 
         :param driver: Neo4j driver.
-        :param migrations_path: the path to the directory containing migrations.
+        :param migrations_path: the path to the directory containing migrations,
+                                a package resource or a bundle.
         :param project: the name of the project for differentiation migration
                         chains within the same database.
         :param database: the database that should be migrated (Neo4j EE).
@@ -32,30 +73,120 @@ class Executor:
                                 information about migrations (Neo4j EE).
                                 If not specified, then the database
                                 that should be migrated is used.
+        :param retry_policy: settings for retrying transactions
+                             that failed with transient errors.
+        :param bookmark_manager: the bookmark manager shared by all sessions
+                                 of the executor, so reads of the migration
+                                 schema see the writes made earlier.
+                                 A new one is created if not specified.
+        :param history_store: the storage of applied migrations,
+                              the schema database is used by default.
+        :param progress_interval: the minimum pause between progress events
+                                  of a migration (seconds).
+        :param timeout: the default timeout of migration transactions (seconds),
+                        it can be overridden by migrations.
+                        The server default is used if not specified.
+        :param metrics: the metrics of runs, new ones labeled with the project
+                        and the database are created if not specified.
+        :param profiler: the profiler of Python migrations, they are not
+                         profiled if not specified.
+        :param worker_config: settings of worker processes. If specified,
+                              each Python migration is applied in a new
+                              process with its own driver.
+        :param batch_size: if specified, consecutive statements of Cypher
+                           migrations that differ only in literals are applied
+                           as `UNWIND` queries with up to this number of rows.
+        :param workers: the maximum number of migrations applied concurrently.
+                        Migrations that declare their dependencies can be
+                        applied concurrently with the others.
+        :raises ValueError: if Python migrations are profiled with several workers
+                            or in worker processes.
         """
+        if profiler and (workers > 1 or worker_config):
+            raise ValueError(
+                "Python migrations can't be profiled with several workers "
+                "or in worker processes",
+            )
         if database and not schema_database:
             schema_database = database
 
         self.driver = driver
-        self.dao = MigrationDAO(
+        self.metrics = metrics or Metrics(
+            labels={"project": project or "", "database": database or ""},
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.bookmark_manager = bookmark_manager or GraphDatabase.bookmark_manager()
+        # Metadata of all transactions of the run, it is visible in
+        # `SHOW TRANSACTIONS`, so the transactions can be found and terminated.
+        self.metadata: dict[str, Any] = {
+            "app": APP_NAME,
+            "project": project,
+            "runId": uuid4().hex,
+        }
+        self.dao: HistoryStore = history_store or MigrationDAO(
             driver,
             project=project,
             database=database,
             schema_database=schema_database,
+            retry_policy=self.retry_policy,
+            bookmark_manager=self.bookmark_manager,
+            metadata=self.metadata,
         )
-        self.local_migrations = loader.load(migrations_path)
+        self.local_migrations = self._load(migrations_path, batch_size)
+        self.migrations_path = migrations_path
+        self.project = project
         self.database = database
+        self.schema_database = schema_database
+        self.progress_interval = progress_interval
+        self.timeout = timeout
+        self.profiler = profiler
+        self.worker_config = worker_config
+        self.workers = workers
+        self.cancelled = Event()
+        # The number of retried transactions per migration version.
+        self.retries: Counter[str] = Counter()
+        # The estimates of pending migrations of the last run with a time budget.
+        self.estimates: dict[str, budget.Estimate] = {}
 
     def migrate(  # noqa: WPS210
         self,
         on_apply: Optional[Callable[[Migration], None]] = None,
-    ) -> None:
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]] = None,
+        time_budget: Optional[float] = None,
+        estimates: Optional[Mapping[str, budget.Estimate]] = None,
+        rehearsals: Iterable[rehearsal.Rehearsal] = (),
+    ) -> list[Migration]:
         """
         Retrieves all pending migrations, verify and applies them.
 
+        Transactions that failed with transient errors are retried
+        according to the retry policy.
+
+        With a time budget, only the longest prefix of pending migrations
+        whose estimates fit the budget is applied. Migrations are also
+        checked against the remaining time before each of them starts,
+        so the run stops between migrations if the previous ones took
+        longer than expected. That's why a time budget requires
+        migrations to be applied one by one (a single worker).
+
         :param on_apply: callback that is called when each migration is applied.
-        :raises ValueError: if errors were found during migration verification.
+        :param on_progress: callback that gets progress events of migrations.
+        :param time_budget: the time budget of the run (seconds).
+        :param estimates: the estimates of pending migrations by version,
+                          see `estimate`. Estimated by the rehearsals,
+                          the history and the declared estimates
+                          if not specified, they are kept in `estimates`.
+        :param rehearsals: the results of a rehearsal for the estimates.
+        :raises ValueError: if errors were found during migration verification
+                            or a time budget is used with several workers.
+        :raises MigrationCancelledError: if the run has been cancelled.
+        :raises UnrecordedMigrationsError: if several workers have applied
+                                           migrations that follow a failed one.
+        :return: the pending migrations deferred by the time budget.
         """
+        if time_budget is not None and self.workers > 1:
+            raise ValueError("A time budget can't be used with several workers")
+        self.metrics.success = False
         analyzing_result = self.analyze()
         if analyzing_result.invalid_versions:
             raise ValueError(
@@ -67,19 +198,160 @@ class Executor:
             self.dao.create_baseline()
             self.dao.create_constraints()
 
-        for migration in analyzing_result.pending_migrations:
-            self.dao.add_migration(migration, 0, dry_run=True)
+        pending_migrations = analyzing_result.pending_migrations
+        deferred: list[Migration] = []
+        deadline = None
+        if time_budget is not None:
+            self.estimates = dict(
+                estimates or self._estimate(pending_migrations, rehearsals),
+            )
+            deadline = budget.Deadline(time_budget, self.estimates)
+            pending_migrations, deferred = budget.plan(
+                pending_migrations,
+                self.estimates,
+                time_budget,
+            )
+
+        with self.metrics.timer("migrate"):
+            if self.workers > 1:
+                scheduler.Scheduler(
+                    pending_migrations,
+                    analyzer.dependencies(pending_migrations, self.local_migrations),
+                    self.workers,
+                ).run(
+                    partial(self._execute, on_apply=on_apply, on_progress=on_progress),
+                    self._record,
+                )
+            else:
+                deferred = [
+                    *self._apply_in_order(
+                        pending_migrations,
+                        on_apply,
+                        on_progress,
+                        deadline,
+                    ),
+                    *deferred,
+                ]
+        self.metrics.success = True
+        return deferred
+
+    def bootstrap(  # noqa: WPS210
+        self,
+        on_apply: Optional[Callable[[Migration], None]] = None,
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]] = None,
+    ) -> BootstrapPlan:
+        """
+        Bootstrap a database without history with the net schema of the migrations.
 
-            with self.driver.session(database=self.database) as session:
-                with session.begin_transaction() as tx:
-                    start_time = time.monotonic()
-                    migration.apply(tx)
-                    duration = time.monotonic() - start_time
+        Schema statements of Cypher migrations are collapsed into the net
+        schema (see `bootstrap.plan`), which is applied in one transaction.
+        Then the migrations that declare `run_on_bootstrap` are applied,
+        and all versions are recorded as applied by one write.
 
-                    if on_apply:
-                        on_apply(migration)  # noqa: WPS220
+        Schema and data can't be written by one transaction, so the history
+        is empty until the end: if a step fails, the bootstrap can be rerun.
+        The net schema is created `IF NOT EXISTS`, but the migrations that
+        run on bootstrap and were applied before the failure are applied again.
+
+        :param on_apply: callback that is called when each migration
+                         that runs on bootstrap is applied.
+        :param on_progress: callback that gets progress events of migrations.
+        :raises ValueError: if the history is not empty or the schema
+                            can't be collapsed.
+        :raises MigrationCancelledError: if the run has been cancelled.
+        :return: the plan.
+        """
+        analyzing_result = self.analyze()
+        if analyzing_result.latest_applied_version:
+            raise ValueError("Only a database without history can be bootstrapped")
+        pending_migrations = analyzing_result.pending_migrations
+        bootstrap_plan = plan_bootstrap(pending_migrations)
+        if not pending_migrations:
+            return bootstrap_plan
+
+        self.metrics.success = False
+        self.dao.create_baseline()
+        self.dao.create_constraints()
+        with self.metrics.timer("migrate"):
+            self.retry_policy.run(partial(self._apply_schema, bootstrap_plan.schema))
+            durations = {
+                migration.version: self._execute(migration, on_apply, on_progress)
+                for migration in bootstrap_plan.applied
+            }
+            self.dao.add_migrations(
+                [
+                    (migration, durations.get(migration.version) or 0)
+                    for migration in pending_migrations
+                ],
+            )
+        for version, duration in durations.items():
+            self.metrics.observe_migration(version, duration or 0)
+        self.metrics.success = True
+        return bootstrap_plan
+
+    def estimate(
+        self,
+        rehearsals: Iterable[rehearsal.Rehearsal] = (),
+    ) -> dict[str, budget.Estimate]:
+        """
+        Estimate the durations of pending migrations.
 
-                self.dao.add_migration(migration, duration)
+        The rehearsals are preferred, then the longest recorded runs
+        of the project in all migration targets of the history store
+        (e.g. other environments), then the estimates declared
+        by the migrations.
+
+        :param rehearsals: the results of a rehearsal, see `rehearse`.
+        :return: the estimates by version.
+        """
+        return self._estimate(self.analyze().pending_migrations, rehearsals)
+
+    def warm_up(self) -> None:
+        """
+        Verify connectivity and fetch routing tables in advance.
+
+        The database that should be migrated and the schema database
+        get a trivial query each, concurrently, so the handshakes and
+        the routing discovery don't delay the first queries of the run
+        one after another.
+        """
+        databases = list(dict.fromkeys((self.database, self.schema_database)))
+        with self.metrics.timer("warm_up"):
+            with ThreadPoolExecutor(len(databases), "warm-up") as pool:
+                # Errors (e.g. `ServiceUnavailable`) are raised when
+                # the results are read.
+                list(pool.map(self._ping, databases))
+
+    def rehearse(
+        self,
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]] = None,
+    ) -> list[rehearsal.Rehearsal]:
+        """
+        Apply pending migrations in transactions that are always rolled back.
+
+        Each migration is timed and its update counters are collected.
+        Since the changes are not committed, every migration runs
+        against the current state of the database, not against
+        the changes made by previous pending migrations.
+        Recording of migrations is checked only if the database
+        has a history: the baseline of a new one is created by `migrate`.
+
+        :param on_progress: callback that gets progress events of migrations.
+        :raises ValueError: if errors were found during migration verification.
+        :return: the results of the migrations, errors don't stop the rehearsal.
+        """
+        analyzing_result = self.analyze()
+        if analyzing_result.invalid_versions:
+            raise ValueError(
+                "Errors were found during migration verification. "
+                "Run the `analyze` command for more information.",
+            )
+
+        has_history = bool(analyzing_result.latest_applied_version)
+        return [
+            self._rehearse(migration, on_progress, has_history)
+            for migration in analyzing_result.pending_migrations
+        ]
 
     def analyze(self) -> analyzer.AnalyzingResult:
         """
@@ -88,5 +360,648 @@ class Executor:
         Finds pending migrations and missed migrations.
         :return: analysis result.
         """
-        applied_migrations = self.dao.get_applied_migrations()
-        return analyzer.analyze(self.local_migrations, applied_migrations)
+        with self.metrics.timer("analyze"):
+            applied_migrations = self.dao.get_applied_migrations()
+            return analyzer.analyze(
+                self.local_migrations,
+                applied_migrations,
+                self.dao.get_squash_point(),
+            )
+
+    def analyze_all(  # noqa: WPS210
+        self,
+        migrations_paths: Mapping[Optional[str], loader.Traversable],
+    ) -> list[analyzer.ChainStatus]:
+        """
+        Analyze the chains of all projects and migration targets.
+
+        The chains are read from the history store at once, each one
+        is compared against the local migrations of its project.
+        Projects that have local migrations but no chain are reported
+        without a migration target and with all their migrations pending.
+
+        :param migrations_paths: the paths to migrations by project name,
+                                 `None` is the default project.
+        :return: the statuses sorted by project and migration target.
+        """
+        with self.metrics.timer("analyze"):
+            chains = self.dao.get_chains()
+        local_migrations = {
+            project: loader.load(migrations_path)
+            for project, migrations_path in migrations_paths.items()
+        }
+        statuses = [
+            analyzer.ChainStatus(
+                project=chain.project,
+                migration_target=chain.migration_target,
+                analyzing_result=(
+                    analyzer.analyze(
+                        local_migrations[chain.project],
+                        chain.migrations,
+                        chain.squashed_to,
+                    )
+                    if chain.project in local_migrations
+                    else None
+                ),
+            )
+            for chain in chains
+        ]
+        analyzed_projects = {chain.project for chain in chains}
+        statuses.extend(
+            analyzer.ChainStatus(
+                project=project,
+                migration_target=None,
+                analyzing_result=analyzer.analyze(migrations, []),
+            )
+            for project, migrations in local_migrations.items()
+            if project not in analyzed_projects
+        )
+        return sorted(
+            statuses,
+            key=lambda status: (status.project or "", status.migration_target or ""),
+        )
+
+    def history(
+        self,
+        all_projects: bool = False,
+        page_size: int = 1000,
+    ) -> Iterator[HistoryEntry]:
+        """
+        Get the records of applied migrations in the order they were applied.
+
+        The records are read page by page as the iterator is consumed,
+        so they can be aggregated with `report.HistoryReport`
+        without keeping the whole history in memory.
+
+        :param all_projects: get the records of all projects and migration targets.
+        :param page_size: the number of records read at once.
+        :return: the records.
+        """
+        return self.dao.read_history(all_projects=all_projects, page_size=page_size)
+
+    def explain(self, statement: str) -> Optional[linter.Plan]:
+        """
+        Get the plan of a statement without executing it.
+
+        :param statement: the statement.
+        :return: the plan or `None` if the statement can't be explained.
+        """
+        with self._session() as session:
+            try:
+                return session.run(f"EXPLAIN {statement}").consume().plan
+            except Neo4jError:
+                return None
+
+    def lint(
+        self,
+        explainer: Optional[linter.Explainer] = None,
+        rules: Optional[Mapping[str, linter.Rule]] = None,
+        migrations: Optional[list[Migration]] = None,
+    ) -> list[linter.LintIssue]:
+        """
+        Check the plans of pending Cypher migrations for performance problems.
+
+        Plans are built against the current schema, so indexes created
+        by other pending migrations are not taken into account.
+
+        :param explainer: returns the plan of a statement,
+                          the database is used by default.
+        :param rules: the rules by name, `linter.DEFAULT_RULES` by default.
+        :param migrations: the migrations to check, pending ones by default.
+        :return: found issues.
+        """
+        if migrations is None:
+            migrations = self.analyze().pending_migrations
+
+        cypher_migrations = [
+            migration
+            for migration in migrations
+            if isinstance(migration, CypherMigration)
+        ]
+        return linter.lint(cypher_migrations, explainer or self.explain, rules)
+
+    def squash(self, up_to: str, dry_run: bool = False) -> list[Migration]:
+        """
+        Replace applied migrations up to the version with the Baseline.
+
+        After that, the history and the analysis don't depend on
+        the squashed migrations, so their local files can be deleted.
+
+        :param up_to: the last squashed version, it must be applied.
+        :param dry_run: do not make actual changes.
+        :raises ValueError: if there are invalid versions up to the version.
+        :return: the squashed migrations.
+        """
+        invalid_versions = [
+            invalid_version.version
+            for invalid_version in self.analyze().invalid_versions
+            if Version(invalid_version.version) <= Version(up_to)
+        ]
+        if invalid_versions:
+            versions = ", ".join(invalid_versions)
+            raise ValueError(
+                f"Migrations must be repaired before squashing: {versions}",
+            )
+        return self.dao.squash(up_to, dry_run=dry_run)
+
+    def repair(
+        self,
+        delete_missed_locally: bool = False,
+        dry_run: bool = False,
+    ) -> analyzer.RepairPlan:
+        """
+        Repair the history: update records of changed migrations.
+
+        Checksums, descriptions, types and sources of `DIFFERENT` versions
+        are replaced with the local ones, records of `MISSED_LOCALLY` versions
+        are deleted if requested. All changes are made in one transaction.
+
+        :param delete_missed_locally: delete records of migrations missed locally.
+        :param dry_run: do not make actual changes.
+        :return: the changes.
+        """
+        repair_plan = analyzer.plan_repair(
+            self.local_migrations,
+            self.dao.get_applied_migrations(),
+            self.dao.get_squash_point(),
+            delete_missed_locally,
+        )
+        if not dry_run and (repair_plan.updates or repair_plan.deletions):
+            self.dao.repair(
+                [local_migration for _, local_migration in repair_plan.updates],
+                [migration.version for migration in repair_plan.deletions],
+            )
+        return repair_plan
+
+    def reapply_changed(
+        self,
+        on_apply: Optional[Callable[[Migration], None]] = None,
+    ) -> list[Migration]:
+        """
+        Apply the migrations changed since they were applied again.
+
+        It's meant for disposable databases (e.g. of tests) that keep
+        the history between runs. The changes of the applied versions
+        are not reverted, so the migrations should be idempotent
+        (`IF NOT EXISTS`, `MERGE`). The records of the migrations
+        are updated as by `repair`.
+
+        :param on_apply: callback that is called when each migration is applied.
+        :return: the reapplied migrations.
+        """
+        changed_versions = {
+            local_migration.version
+            for _, local_migration in self.repair(dry_run=True).updates
+        }
+        changed = [
+            migration
+            for migration in self.local_migrations
+            if migration.version in changed_versions
+        ]
+        for migration in changed:
+            self.retry_policy.run(
+                partial(self._reapply, migration, on_apply),
+                on_retry=partial(self._on_retry, migration.version),
+            )
+        if changed:
+            self.dao.repair(changed, [])
+        return changed
+
+    def cancel(self) -> None:
+        """
+        Cancel the migration run.
+
+        No more migrations are started, and the running transactions
+        of this executor are terminated on the server (best effort),
+        so the current migration is rolled back.
+        It is safe to call this method from another thread.
+        """
+        self.cancelled.set()
+        for database in (self.database, self.schema_database):
+            with suppress(Neo4jError, DriverError):
+                self._terminate_transactions(database)
+
+    def _load(
+        self,
+        migrations_path: loader.Traversable,
+        batch_size: Optional[int],
+    ) -> list[Migration]:
+        with self.metrics.timer("load"):
+            local_migrations = loader.load(migrations_path)
+        for local_migration in local_migrations:
+            if isinstance(local_migration, CypherMigration):
+                local_migration.batch_size = batch_size
+        return local_migrations
+
+    def _estimate(
+        self,
+        migrations: list[Migration],
+        rehearsals: Iterable[rehearsal.Rehearsal] = (),
+    ) -> dict[str, budget.Estimate]:
+        return budget.estimate(
+            migrations,
+            rehearsals,
+            self.dao.read_history(all_targets=True),
+        )
+
+    def _apply_in_order(
+        self,
+        migrations: list[Migration],
+        on_apply: Optional[Callable[[Migration], None]],
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+        deadline: Optional[budget.Deadline],
+    ) -> list[Migration]:
+        """Apply the migrations one by one, return the ones deferred by the deadline."""
+        for index, migration in enumerate(migrations):
+            if deadline and not deadline.allows(migration):
+                return migrations[index:]
+            self._record(
+                migration,
+                self._execute(
+                    migration,
+                    on_apply,
+                    on_progress,
+                    self._can_record_in_transaction(migration),
+                ),
+            )
+        return []
+
+    def _can_record_in_transaction(self, migration: Migration) -> bool:
+        """Check if the migration can be recorded by its own transaction."""
+        return (
+            isinstance(self.dao, MigrationDAO)
+            and self.database == self.schema_database
+            and self.dao.can_record_in(migration)
+        )
+
+    def _execute(
+        self,
+        migration: Migration,
+        on_apply: Optional[Callable[[Migration], None]],
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+        record_in_transaction: bool = False,
+    ) -> Optional[float]:
+        """
+        Apply the migration.
+
+        :param migration: the migration.
+        :param on_apply: callback that is called when the migration is applied.
+        :param on_progress: callback that gets progress events of the migration.
+        :param record_in_transaction: record the migration in its transaction,
+                                      see `_apply`.
+        :raises MigrationCancelledError: if the run has been cancelled.
+        :return: duration of migration execution (seconds) or `None`
+                 if the migration has already been recorded as applied.
+        """
+        if self.cancelled.is_set():
+            raise progress.MigrationCancelledError(
+                f"Migration V{migration.version} is cancelled",
+            )
+        self.dao.add_migration(migration, 0, dry_run=True)
+
+        with self._converting_termination(migration):
+            if isinstance(migration, DataMigration) and migration.commit_per_batch:
+                # Batches are retried one by one, the committed ones aren't rerun.
+                return self._apply(
+                    migration,
+                    retried=False,
+                    on_apply=on_apply,
+                    on_progress=on_progress,
+                )
+            return self.retry_policy.run(
+                lambda attempt: self._apply(
+                    migration,
+                    retried=attempt > 1,
+                    on_apply=on_apply,
+                    on_progress=on_progress,
+                    record_in_transaction=record_in_transaction,
+                ),
+                on_retry=partial(self._on_retry, migration.version),
+            )
+
+    def _reapply(
+        self,
+        migration: Migration,
+        on_apply: Optional[Callable[[Migration], None]],
+        attempt: int,
+    ) -> None:
+        # The migration is recorded, so it's not checked on retries.
+        self._apply(migration, retried=False, on_apply=on_apply, on_progress=None)
+
+    def _apply_schema(self, statements: list[str], attempt: int) -> None:
+        with self._session() as session:
+            with session.begin_transaction(
+                metadata=self.metadata,
+                timeout=self.timeout,
+            ) as tx:
+                self.metrics.increment("transactions")
+                for statement in statements:
+                    tx.run(statement).consume()
+
+    def _record(self, migration: Migration, duration: Optional[float]) -> None:
+        if duration is not None:
+            self.dao.add_migration(
+                migration,
+                duration,
+                on_retry=partial(self._on_retry, migration.version),
+            )
+            self.metrics.observe_migration(migration.version, duration)
+
+    def _on_retry(self, version: str, exc: Exception) -> None:
+        self.retries[version] += 1
+        self.metrics.increment("retries")
+
+    def _apply(
+        self,
+        migration: Migration,
+        retried: bool,
+        on_apply: Optional[Callable[[Migration], None]],
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+        record_in_transaction: bool = False,
+    ) -> Optional[float]:
+        """
+        Apply the migration in a new transaction.
+
+        A retried migration is skipped if it has been recorded as applied.
+        Recorded in its transaction, a migration whose commit has failed
+        ambiguously (e.g. the connection was lost) is never applied twice.
+        Otherwise (the history is stored in another database or store,
+        the migration may change the schema, runs in a worker process
+        or commits per batch) the record is written after the commit,
+        and such a migration is applied again, so it should be idempotent.
+
+        :param migration: the migration.
+        :param retried: whether the previous attempt has failed.
+        :param on_apply: callback that is called when the migration is applied.
+        :param on_progress: callback that gets progress events of the migration.
+        :param record_in_transaction: record the migration in its transaction,
+                                      see `MigrationDAO.can_record_in`.
+        :return: duration of migration execution (seconds) or `None`
+                 if the migration has already been recorded as applied.
+        """
+        if retried and self.dao.is_applied(migration.version):
+            return None
+
+        if isinstance(migration, DataMigration) and migration.commit_per_batch:
+            duration = self._apply_batches(migration, on_progress)
+            if on_apply:
+                on_apply(migration)
+            return duration
+
+        self.metrics.increment("transactions")
+        if self.worker_config and isinstance(migration, PythonMigration):
+            return self._apply_in_worker(
+                migration, self.worker_config, on_apply, on_progress
+            )
+
+        return self._apply_in_transaction(
+            migration,
+            on_apply,
+            on_progress,
+            record_in_transaction,
+        )
+
+    def _apply_in_transaction(
+        self,
+        migration: Migration,
+        on_apply: Optional[Callable[[Migration], None]],
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+        record_in_transaction: bool,
+    ) -> Optional[float]:
+        with self._session() as session:
+            with self._begin_transaction(session, migration) as tx:
+                start_time = time.monotonic()
+                with (
+                    progress.track(
+                        migration.version,
+                        on_progress,
+                        self.progress_interval,
+                        self.cancelled,
+                    ),
+                    self._instrument(migration, tx) as migration_tx,
+                    bind_batch_runner(partial(self._run_partition_batch, migration)),
+                ):
+                    migration.apply(migration_tx)
+                duration = time.monotonic() - start_time
+
+                if record_in_transaction:
+                    cast(MigrationDAO, self.dao).add_migration_in(
+                        tx,
+                        migration,
+                        duration,
+                    )
+                if on_apply:
+                    on_apply(migration)
+        if record_in_transaction:
+            self.metrics.observe_migration(migration.version, duration)
+            return None
+        return duration
+
+    def _apply_batches(
+        self,
+        migration: DataMigration,
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+    ) -> float:
+        """
+        Apply the data migration committing each batch in a new transaction.
+
+        Batches that failed with transient errors are retried, the migration
+        itself is not, so a batch is attempted at most
+        `RetryPolicy.max_attempts` times and the committed batches aren't
+        applied again in the same run.
+        The committed batches are not recorded, so a migration that
+        has failed is applied from the first row again by the next run
+        and its template must be idempotent.
+
+        :param migration: the migration.
+        :param on_progress: callback that gets progress events of the migration.
+        :return: duration of migration execution (seconds).
+        """
+        start_time = time.monotonic()
+        with progress.track(
+            migration.version,
+            on_progress,
+            self.progress_interval,
+            self.cancelled,
+        ):
+            for rows in migration.batches():
+                self.retry_policy.run(
+                    partial(self._apply_batch, migration, rows),
+                    on_retry=partial(self._on_retry, migration.version),
+                )
+        return time.monotonic() - start_time
+
+    def _apply_batch(
+        self,
+        migration: DataMigration,
+        rows: list[dict[str, Any]],
+        attempt: int,
+    ) -> None:
+        with self._session() as session:
+            with self._begin_transaction(session, migration) as tx:
+                self.metrics.increment("transactions")
+                migration.apply_batch(
+                    cast(Transaction, MeteredTransaction(tx, self.metrics)),
+                    rows,
+                )
+
+    def _run_partition_batch(
+        self,
+        migration: Migration,
+        query: str,
+        parameters: dict[str, Any],
+    ) -> int:
+        """Apply a batch of `partition.run` in a new transaction, return the updates."""
+        return self.retry_policy.run(
+            partial(self._apply_partition_batch, migration, query, parameters),
+            on_retry=partial(self._on_retry, migration.version),
+        )
+
+    def _apply_partition_batch(
+        self,
+        migration: Migration,
+        query: str,
+        parameters: dict[str, Any],
+        attempt: int,
+    ) -> int:
+        with self._session() as session:
+            with self._begin_transaction(session, migration) as tx:
+                self.metrics.increment("transactions")
+                metered_tx = MeteredTransaction(tx, self.metrics)
+                return count_updates(
+                    metered_tx.run(query, parameters).consume().counters
+                )
+
+    def _apply_in_worker(
+        self,
+        migration: PythonMigration,
+        worker_config: worker.WorkerConfig,
+        on_apply: Optional[Callable[[Migration], None]],
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+    ) -> float:
+        task = worker.WorkerTask(
+            version=migration.version,
+            filename=migration.source or f"V{migration.version}.py",
+            bytecode=worker.bytecode(migration, self.migrations_path),
+            database=self.database,
+            transaction=self._transaction_options(migration),
+            progress_interval=self.progress_interval,
+            bookmarks=tuple(self.bookmark_manager.get_bookmarks()),
+            retry_policy=self.retry_policy,
+        )
+        worker_result = worker.run(
+            worker_config,
+            task,
+            lambda: on_apply(migration) if on_apply else None,
+            on_progress,
+            self.cancelled,
+        )
+        self.bookmark_manager.update_bookmarks(task.bookmarks, worker_result.bookmarks)
+        self.metrics.increment("migration_queries", worker_result.queries)
+        return worker_result.duration
+
+    def _rehearse(
+        self,
+        migration: Migration,
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+        has_history: bool,
+    ) -> rehearsal.Rehearsal:
+        migration_rehearsal = rehearsal.Rehearsal(
+            version=migration.version,
+            description=migration.description,
+        )
+        try:
+            if has_history:
+                self.dao.add_migration(migration, 0, dry_run=True)
+            with self._converting_termination(migration):
+                self._apply_and_rollback(migration, migration_rehearsal, on_progress)
+        except progress.MigrationCancelledError:
+            raise
+        except Exception as exc:
+            migration_rehearsal.error = f"{type(exc).__name__}: {exc}"
+        return migration_rehearsal
+
+    def _apply_and_rollback(
+        self,
+        migration: Migration,
+        migration_rehearsal: rehearsal.Rehearsal,
+        on_progress: Optional[Callable[[progress.ProgressEvent], None]],
+    ) -> None:
+        """Apply the migration, record its counters and duration, roll it back."""
+        with self._session() as session:
+            with self._begin_transaction(session, migration) as tx:
+                recording_tx = rehearsal.RecordingTransaction(tx)
+                with (
+                    progress.track(
+                        migration.version,
+                        on_progress,
+                        self.progress_interval,
+                        self.cancelled,
+                    ),
+                    bind_batch_runner(recording_tx.run_batch),
+                    migration_rehearsal.timer(),
+                ):
+                    migration.apply(cast(Transaction, recording_tx))
+                migration_rehearsal.counters = recording_tx.counters()
+                tx.rollback()
+
+    @contextmanager
+    def _converting_termination(self, migration: Migration) -> Iterator[None]:
+        """Raise errors of transactions terminated by `cancel` as cancellation."""
+        try:
+            yield
+        except (Neo4jError, DriverError) as exc:
+            if not self.cancelled.is_set():
+                raise
+            raise progress.MigrationCancelledError(
+                f"Migration V{migration.version} is cancelled",
+            ) from exc
+
+    def _begin_transaction(self, session: Session, migration: Migration) -> Transaction:
+        return session.begin_transaction(**self._transaction_options(migration))
+
+    def _transaction_options(self, migration: Migration) -> dict[str, Any]:
+        return {
+            "metadata": {
+                **self.metadata,
+                "version": migration.version,
+                "source": migration.source,
+            },
+            "timeout": self.timeout if migration.timeout is None else migration.timeout,
+        }
+
+    def _instrument(
+        self,
+        migration: Migration,
+        tx: Transaction,
+    ) -> AbstractContextManager[Transaction]:
+        metered_tx = cast(Transaction, MeteredTransaction(tx, self.metrics))
+        if self.profiler and isinstance(migration, PythonMigration):
+            return self.profiler.profile(migration.version, metered_tx)
+        return nullcontext(metered_tx)
+
+    def _terminate_transactions(self, database: Optional[str]) -> None:
+        with self.driver.session(database=database) as session:
+            transaction_ids = session.run(
+                """
+                SHOW TRANSACTIONS YIELD transactionId, metaData
+                WHERE metaData.runId = $run_id
+                RETURN collect(transactionId) AS ids
+                """,
+                run_id=self.metadata["runId"],
+            ).single(strict=True)["ids"]
+            if transaction_ids:
+                session.run("TERMINATE TRANSACTIONS $ids", ids=transaction_ids)
+
+    def _ping(self, database: Optional[str]) -> None:
+        with self.driver.session(
+            database=database,
+            default_access_mode=READ_ACCESS,
+        ) as session:
+            session.run("RETURN 1").consume()
+
+    def _session(self) -> Session:
+        return self.driver.session(
+            database=self.database,
+            bookmark_manager=self.bookmark_manager,
+        )
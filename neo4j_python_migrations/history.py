@@ -0,0 +1,564 @@
+import binascii
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import wraps
+from getpass import getuser
+from threading import RLock
+from typing import Any, Callable, Iterator, Optional, Protocol, TypeVar, cast
+
+from packaging.version import Version
+
+from neo4j_python_migrations.migration import Migration
+
+
+def squash_digest(migrations: list[Migration], previous: Optional[str] = None) -> str:
+    """
+    Get the combined digest of squashed migrations.
+
+    :param migrations: sorted squashed migrations.
+    :param previous: the digest of the previous squash, if any.
+    :return: the digest.
+    """
+    digest = int(previous) if previous else 0
+    for migration in migrations:
+        checksum = migration.checksum or ""
+        digest = binascii.crc32(f"{migration.version}:{checksum}".encode(), digest)
+    return str(digest)
+
+
+def select_squashed(applied_migrations: list[Migration], up_to: str) -> list[Migration]:
+    """
+    Select applied migrations to squash.
+
+    :param applied_migrations: sorted applied migrations.
+    :param up_to: the last squashed version.
+    :raises ValueError: if the version is not applied.
+    :return: the migrations up to the version.
+    """
+    squashed = [
+        migration
+        for migration in applied_migrations
+        if migration.parsed_version <= Version(up_to)
+    ]
+    if not squashed or squashed[-1].version != up_to:
+        raise ValueError(f"Version {up_to} is not applied")
+    return squashed
+
+
+@dataclass
+class Chain:
+    """The applied migrations of a project in a migration target."""
+
+    project: Optional[str]
+    migration_target: Optional[str]
+    # Sorted applied migrations, the Baseline is ignored.
+    migrations: list[Migration] = field(default_factory=list)
+    squashed_to: Optional[str] = None
+
+
+@dataclass
+class HistoryEntry:
+    """A record of an applied migration with the details of its run."""
+
+    project: Optional[str]
+    migration_target: Optional[str]
+    migration: Migration
+    # When the migration was applied.
+    installed_on: Optional[datetime] = None
+    # Duration of migration execution (seconds).
+    duration: Optional[float] = None
+    # The OS user that applied the migration.
+    installed_by: Optional[str] = None
+    # The database user that applied the migration.
+    connected_as: Optional[str] = None
+
+
+class HistoryStore(Protocol):
+    """Storage of the applied migrations chain."""
+
+    def create_baseline(self) -> None:
+        """Create a base node if it doesn't already exist."""
+
+    def create_constraints(self) -> None:
+        """Create constraints for maintaining the integrity of the storage."""
+
+    def add_migration(
+        self,
+        migration: Migration,
+        duration: float,
+        dry_run: bool = False,
+        on_retry: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        """
+        Add a migration record.
+
+        :param migration: applied migration.
+        :param duration: duration of migration execution (seconds).
+        :param dry_run: do not make actual changes.
+        :param on_retry: callback that is called before each retry.
+        """
+
+    def add_migrations(self, records: list[tuple[Migration, float]]) -> None:
+        """
+        Add records of migrations at the end of the chain in one write.
+
+        :param records: applied migrations in version order
+                        and their durations (seconds).
+        """
+
+    def is_applied(self, version: str) -> bool:
+        """
+        Check if there is a record of the migration version.
+
+        :param version: the version.
+        """
+
+    def get_applied_migrations(self) -> list[Migration]:
+        """Get an ordered list of applied migrations, the Baseline is ignored."""
+
+    def get_squash_point(self) -> Optional[str]:
+        """Get the version the history has been squashed to, if any."""
+
+    def get_chains(self) -> list[Chain]:
+        """Get the chains of all projects and migration targets of the storage."""
+
+    def read_history(
+        self,
+        all_projects: bool = False,
+        page_size: int = 1000,
+        all_targets: bool = False,
+    ) -> Iterator[HistoryEntry]:
+        """
+        Get the records of applied migrations in the order they were applied.
+
+        The records are read page by page as the iterator is consumed.
+
+        :param all_projects: get the records of all projects and migration targets.
+        :param page_size: the number of records read at once.
+        :param all_targets: get the records of the project in all migration targets.
+        """
+
+    def squash(self, up_to: str, dry_run: bool = False) -> list[Migration]:
+        """
+        Replace applied migrations up to the version with the Baseline.
+
+        The Baseline records the version and the combined digest
+        of the squashed migrations.
+
+        :param up_to: the last squashed version, it must be applied.
+        :param dry_run: do not make actual changes.
+        """
+
+    def repair(self, updates: list[Migration], deletions: list[str]) -> None:
+        """
+        Update and delete migration records in one transaction.
+
+        :param updates: migrations whose records should get their description,
+                        type, source and checksum.
+        :param deletions: versions whose records should be deleted.
+        """
+
+
+_Method = TypeVar("_Method", bound=Callable[..., Any])
+
+
+def _serialized(method: _Method) -> _Method:
+    """Serialize calls of the method across threads."""
+
+    @wraps(method)
+    def wrapper(self: "SQLiteHistoryStore", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return cast(_Method, wrapper)
+
+
+class SQLiteHistoryStore:
+    """
+    History store based on SQLite.
+
+    It keeps the history in memory unless a file is specified,
+    so it is suitable for tests and for planning without a connection
+    to Neo4j (for example, using a history exported by `export-history`).
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        project: Optional[str] = None,
+        database: Optional[str] = None,
+    ):
+        """
+        Initialize the class instance and create the table if needed.
+
+        :param path: the path to the SQLite file, the history is kept in memory
+                     by default.
+        :param project: the name of the project for differentiation migration
+                        chains within the same storage.
+        :param database: the database that should be migrated.
+        """
+        # Migrations applied by several workers use the store from their threads.
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = RLock()
+        self.connection.row_factory = sqlite3.Row
+        self.project = project or ""
+        self.database = database or ""
+        self.baseline = "BASELINE"
+        with self.connection:
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS migrations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project TEXT NOT NULL,
+                    migration_target TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    description TEXT,
+                    type TEXT,
+                    source TEXT,
+                    checksum TEXT,
+                    installed_on TEXT,
+                    duration REAL,
+                    installed_by TEXT,
+                    squashed_to TEXT,
+                    squashed_digest TEXT,
+                    UNIQUE (project, migration_target, version)
+                )
+                """,
+            )
+
+    @_serialized
+    def create_baseline(self) -> None:  # noqa: D102
+        with self.connection:
+            self.connection.execute(
+                """
+                INSERT OR IGNORE INTO migrations (project, migration_target, version)
+                VALUES (?, ?, ?)
+                """,
+                (self.project, self.database, self.baseline),
+            )
+
+    def create_constraints(self) -> None:
+        """The uniqueness of versions is guaranteed by the table definition."""
+
+    @_serialized
+    def add_migration(  # noqa: D102
+        self,
+        migration: Migration,
+        duration: float,
+        dry_run: bool = False,
+        on_retry: Optional[Callable[[Exception], None]] = None,
+    ) -> None:
+        if not self.is_applied(self.baseline):
+            raise ValueError(
+                "The migration record could not be created. "
+                "Check the migration graph.",
+            )
+
+        try:
+            self.connection.execute(
+                """
+                INSERT INTO migrations (
+                    project, migration_target, version, description, type,
+                    source, checksum, installed_on, duration, installed_by
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.project,
+                    self.database,
+                    migration.version,
+                    migration.description,
+                    migration.type,
+                    migration.source,
+                    migration.checksum,
+                    datetime.now(timezone.utc).isoformat(),
+                    duration,
+                    getuser(),
+                ),
+            )
+        except sqlite3.IntegrityError as exc:
+            self.connection.rollback()
+            raise ValueError(
+                "The migration record could not be created. "
+                "Check the migration graph.",
+            ) from exc
+
+        if dry_run:
+            self.connection.rollback()
+        else:
+            self.connection.commit()
+
+    @_serialized
+    def add_migrations(  # noqa: D102
+        self,
+        records: list[tuple[Migration, float]],
+    ) -> None:
+        if not self.is_applied(self.baseline):
+            raise ValueError(
+                "The migration records could not be created. "
+                "Check the migration graph.",
+            )
+
+        installed_on = datetime.now(timezone.utc).isoformat()
+        try:
+            with self.connection:
+                self.connection.executemany(
+                    """
+                    INSERT INTO migrations (
+                        project, migration_target, version, description, type,
+                        source, checksum, installed_on, duration, installed_by
+                    )
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    [
+                        (
+                            self.project,
+                            self.database,
+                            migration.version,
+                            migration.description,
+                            migration.type,
+                            migration.source,
+                            migration.checksum,
+                            installed_on,
+                            duration,
+                            getuser(),
+                        )
+                        for migration, duration in records
+                    ],
+                )
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(
+                "The migration records could not be created. "
+                "Check the migration graph.",
+            ) from exc
+
+    @_serialized
+    def is_applied(self, version: str) -> bool:  # noqa: D102
+        row = self.connection.execute(
+            """
+            SELECT count(*) FROM migrations
+            WHERE project = ? AND migration_target = ? AND version = ?
+            """,
+            (self.project, self.database, version),
+        ).fetchone()
+        return bool(row[0])
+
+    @_serialized
+    def get_applied_migrations(self) -> list[Migration]:  # noqa: D102
+        rows = self.connection.execute(
+            """
+            SELECT version, description, type, source, checksum FROM migrations
+            WHERE project = ? AND migration_target = ? AND version != ?
+            """,
+            (self.project, self.database, self.baseline),
+        )
+        return sorted(Migration.from_dict(dict(row)) for row in rows)
+
+    @_serialized
+    def get_squash_point(self) -> Optional[str]:  # noqa: D102
+        row = self._get_baseline()
+        return row["squashed_to"] if row else None
+
+    @_serialized
+    def get_chains(self) -> list[Chain]:  # noqa: D102
+        chains: dict[tuple[str, str], Chain] = {}
+        rows = self.connection.execute(
+            """
+            SELECT
+                project, migration_target, version, description, type,
+                source, checksum, squashed_to
+            FROM migrations
+            ORDER BY id
+            """,
+        )
+        for row in rows:
+            key = (row["project"], row["migration_target"])
+            if key not in chains:
+                chains[key] = Chain(
+                    project=row["project"] or None,
+                    migration_target=row["migration_target"] or None,
+                )
+            if row["version"] == self.baseline:
+                chains[key].squashed_to = row["squashed_to"]
+            else:
+                chains[key].migrations.append(Migration.from_dict(dict(row)))
+        for chain in chains.values():
+            chain.migrations.sort()
+        return list(chains.values())
+
+    def read_history(  # noqa: D102
+        self,
+        all_projects: bool = False,
+        page_size: int = 1000,
+        all_targets: bool = False,
+    ) -> Iterator[HistoryEntry]:
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self.connection.execute(
+                    """
+                    SELECT * FROM migrations
+                    WHERE
+                        id > ? AND version != ?
+                        AND (
+                            ? OR (project = ? AND (? OR migration_target = ?))
+                        )
+                    ORDER BY id
+                    LIMIT ?
+                    """,
+                    (
+                        last_id,
+                        self.baseline,
+                        all_projects,
+                        self.project,
+                        all_targets,
+                        self.database,
+                        page_size,
+                    ),
+                ).fetchall()
+            yield from (_history_entry(row) for row in rows)
+            if len(rows) < page_size:
+                return
+            last_id = rows[-1]["id"]
+
+    @_serialized
+    def squash(  # noqa: D102
+        self,
+        up_to: str,
+        dry_run: bool = False,
+    ) -> list[Migration]:
+        squashed = select_squashed(self.get_applied_migrations(), up_to)
+        if dry_run:
+            return squashed
+
+        baseline = self._get_baseline()
+        previous_digest = baseline["squashed_digest"] if baseline else None
+        with self.connection:
+            self.connection.executemany(
+                """
+                DELETE FROM migrations
+                WHERE project = ? AND migration_target = ? AND version = ?
+                """,
+                [
+                    (self.project, self.database, migration.version)
+                    for migration in squashed
+                ],
+            )
+            self._set_squash_point(up_to, squash_digest(squashed, previous_digest))
+        return squashed
+
+    @_serialized
+    def repair(  # noqa: D102
+        self,
+        updates: list[Migration],
+        deletions: list[str],
+    ) -> None:
+        with self.connection:
+            self.connection.executemany(
+                """
+                UPDATE migrations
+                SET description = ?, type = ?, source = ?, checksum = ?
+                WHERE project = ? AND migration_target = ? AND version = ?
+                """,
+                [
+                    (
+                        migration.description,
+                        migration.type,
+                        migration.source,
+                        migration.checksum,
+                        self.project,
+                        self.database,
+                        migration.version,
+                    )
+                    for migration in updates
+                ],
+            )
+            self.connection.executemany(
+                """
+                DELETE FROM migrations
+                WHERE project = ? AND migration_target = ? AND version = ?
+                """,
+                [(self.project, self.database, version) for version in deletions],
+            )
+
+    @_serialized
+    def import_migrations(
+        self,
+        entries: list[HistoryEntry],
+        squashed_to: Optional[str] = None,
+    ) -> None:
+        """
+        Replace the history with the given records of applied migrations.
+
+        Useful for exporting the history from Neo4j. The durations,
+        the times and the users of the runs are kept, so the exported
+        history can be used to estimate durations offline.
+
+        :param entries: records of applied migrations.
+        :param squashed_to: the version the history has been squashed to.
+        """
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM migrations WHERE project = ? AND migration_target = ?",
+                (self.project, self.database),
+            )
+        self.create_baseline()
+        with self.connection:
+            if squashed_to:
+                self._set_squash_point(squashed_to, None)
+            self.connection.executemany(
+                """
+                INSERT INTO migrations (
+                    project, migration_target, version, description, type,
+                    source, checksum, installed_on, duration, installed_by
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        self.project,
+                        self.database,
+                        entry.migration.version,
+                        entry.migration.description,
+                        entry.migration.type,
+                        entry.migration.source,
+                        entry.migration.checksum,
+                        entry.installed_on.isoformat() if entry.installed_on else None,
+                        entry.duration,
+                        entry.installed_by,
+                    )
+                    for entry in entries
+                ],
+            )
+
+    def _get_baseline(self) -> Optional[sqlite3.Row]:
+        return self.connection.execute(
+            """
+            SELECT squashed_to, squashed_digest FROM migrations
+            WHERE project = ? AND migration_target = ? AND version = ?
+            """,
+            (self.project, self.database, self.baseline),
+        ).fetchone()
+
+    def _set_squash_point(self, squashed_to: str, digest: Optional[str]) -> None:
+        self.connection.execute(
+            """
+            UPDATE migrations SET squashed_to = ?, squashed_digest = ?
+            WHERE project = ? AND migration_target = ? AND version = ?
+            """,
+            (squashed_to, digest, self.project, self.database, self.baseline),
+        )
+
+
+def _history_entry(row: sqlite3.Row) -> HistoryEntry:
+    return HistoryEntry(
+        project=row["project"] or None,
+        migration_target=row["migration_target"] or None,
+        migration=Migration.from_dict(dict(row)),
+        installed_on=(
+            datetime.fromisoformat(row["installed_on"]) if row["installed_on"] else None
+        ),
+        duration=row["duration"],
+        installed_by=row["installed_by"],
+    )
@@ -0,0 +1,245 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Iterator, Mapping, Optional
+
+from neo4j_python_migrations.migration import CypherMigration
+
+# A raw query plan as returned by the driver in `ResultSummary.plan`.
+Plan = dict[str, Any]
+
+# A lint rule gets a statement and its plan and returns a problem description
+# or `None` if the statement is fine.
+Rule = Callable[[str, Plan], Optional[str]]
+
+# Returns the plan of a statement or `None` if the statement can't be explained.
+Explainer = Callable[[str], Optional[Plan]]
+
+_WRITE_OPERATORS = frozenset(
+    (
+        "Create",
+        "Merge",
+        "Delete",
+        "DetachDelete",
+        "SetProperty",
+        "SetProperties",
+        "SetNodeProperty",
+        "SetNodeProperties",
+        "SetNodePropertiesFromMap",
+        "SetRelationshipProperty",
+        "SetRelationshipProperties",
+        "SetRelationshipPropertiesFromMap",
+        "SetLabels",
+        "RemoveLabels",
+        "Foreach",
+    ),
+)
+_SCAN_OPERATORS = frozenset(("AllNodesScan", "NodeByLabelScan"))
+_DELETE_OPERATORS = frozenset(("Delete", "DetachDelete"))
+_BATCHING_OPERATORS = frozenset(("TransactionApply", "TransactionForeach", "Limit"))
+
+
+@dataclass
+class LintIssue:
+    """A problem found in a statement of a pending migration."""
+
+    version: str
+    statement: str
+    rule: str
+    message: str
+
+
+def operator_type(plan: Plan) -> str:
+    """
+    Get the name of the plan operator without the runtime suffix.
+
+    :param plan: the plan.
+    :return: the operator name, for example `NodeByLabelScan`.
+    """
+    return str(plan.get("operatorType", "")).split("@")[0]
+
+
+def walk(plan: Plan) -> Iterator[Plan]:
+    """
+    Iterate over the plan operator and all its children.
+
+    :param plan: the plan.
+    :yields: plan operators.
+    """
+    yield plan
+    for child in plan.get("children", []):
+        yield from walk(child)
+
+
+def _operators(plan: Plan) -> set[str]:
+    return {operator_type(operator) for operator in walk(plan)}
+
+
+def eager_write(statement: str, plan: Plan) -> Optional[str]:
+    """
+    Find Eager operators in updating statements.
+
+    Eager materializes all intermediate rows in memory before writing.
+
+    :param statement: the statement.
+    :param plan: the plan of the statement.
+    :return: the problem description.
+    """
+    operators = _operators(plan)
+    if "Eager" in operators and operators & _WRITE_OPERATORS:
+        return "Eager operator in an updating statement."
+    return None
+
+
+def label_scan(statement: str, plan: Plan) -> Optional[str]:
+    """
+    Find full node scans where an index lookup is usually expected.
+
+    :param statement: the statement.
+    :param plan: the plan of the statement.
+    :return: the problem description.
+    """
+    scans = ", ".join(sorted(_operators(plan) & _SCAN_OPERATORS))
+    if scans:
+        return f"{scans} is used instead of an index."
+    return None
+
+
+def cartesian_product(statement: str, plan: Plan) -> Optional[str]:
+    """
+    Find cartesian products of disconnected patterns.
+
+    :param statement: the statement.
+    :param plan: the plan of the statement.
+    :return: the problem description.
+    """
+    if "CartesianProduct" in _operators(plan):
+        return "CartesianProduct of disconnected patterns."
+    return None
+
+
+def unbounded_delete(statement: str, plan: Plan) -> Optional[str]:
+    """
+    Find deletes that are neither limited nor run in batches.
+
+    :param statement: the statement.
+    :param plan: the plan of the statement.
+    :return: the problem description.
+    """
+    operators = _operators(plan)
+    if operators & _DELETE_OPERATORS and not operators & _BATCHING_OPERATORS:
+        return "Unbounded DELETE, delete in batches with LIMIT or partition.run."
+    return None
+
+
+def unindexed_merge(statement: str, plan: Plan) -> Optional[str]:
+    """
+    Find MERGE operations that look up nodes without an index.
+
+    :param statement: the statement.
+    :param plan: the plan of the statement.
+    :return: the problem description.
+    """
+    for operator in walk(plan):
+        if operator_type(operator) == "Merge" and (
+            _operators(operator) & _SCAN_OPERATORS
+        ):
+            return "MERGE on properties that are not indexed."
+    return None
+
+
+DEFAULT_RULES: Mapping[str, Rule] = MappingProxyType(
+    {
+        "eager-write": eager_write,
+        "label-scan": label_scan,
+        "cartesian-product": cartesian_product,
+        "unbounded-delete": unbounded_delete,
+        "unindexed-merge": unindexed_merge,
+    },
+)
+
+
+class CapturedPlans:
+    """
+    Plans captured earlier and stored in a JSON file.
+
+    It can be used instead of a database connection (for example, in CI).
+    """
+
+    def __init__(self, plans: Optional[dict[str, Plan]] = None):
+        self.plans = plans or {}
+
+    def __call__(self, statement: str) -> Optional[Plan]:
+        return self.plans.get(statement)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "CapturedPlans":
+        """
+        Load plans from a JSON file.
+
+        :param path: the path to the file.
+        :return: class instance.
+        """
+        return cls(json.loads(path.read_text()))
+
+    def capture(self, explainer: Explainer) -> Explainer:
+        """
+        Wrap the explainer to remember every plan it returns.
+
+        :param explainer: the explainer to wrap.
+        :return: the wrapped explainer.
+        """
+
+        def captured(statement: str) -> Optional[Plan]:
+            plan = explainer(statement)
+            if plan is not None:
+                self.plans[statement] = plan
+            return plan
+
+        return captured
+
+    def save(self, path: Path) -> None:
+        """
+        Save plans to a JSON file.
+
+        :param path: the path to the file.
+        """
+        path.write_text(json.dumps(self.plans, indent=2, sort_keys=True))
+
+
+def lint(
+    migrations: list[CypherMigration],
+    explainer: Explainer,
+    rules: Optional[Mapping[str, Rule]] = None,
+) -> list[LintIssue]:
+    """
+    Check the plans of migration statements against the rules.
+
+    Statements that can't be explained are skipped.
+
+    :param migrations: the migrations to check.
+    :param explainer: returns the plan of a statement.
+    :param rules: the rules by name, `DEFAULT_RULES` by default.
+    :return: found issues.
+    """
+    rules = DEFAULT_RULES if rules is None else rules
+    issues: list[LintIssue] = []
+    for migration in migrations:
+        for statement in migration.statements:
+            plan = explainer(statement)
+            if plan is not None:
+                issues.extend(_check(migration.version, statement, plan, rules))
+    return issues
+
+
+def _check(
+    version: str,
+    statement: str,
+    plan: Plan,
+    rules: Mapping[str, Rule],
+) -> Iterator[LintIssue]:
+    for name, rule in rules.items():
+        message = rule(statement, plan)
+        if message:
+            yield LintIssue(version, statement, name, message)
@@ -1,35 +1,78 @@
 import re
+import sys
+from functools import partial
 from importlib.util import module_from_spec, spec_from_file_location
-from itertools import chain
 from pathlib import Path
+from types import MappingProxyType, ModuleType
+from typing import Callable, Collection, Iterable, Optional, Union
 
+from neo4j_python_migrations import batching, bundle
 from neo4j_python_migrations.migration import (
     CypherMigration,
+    DataMigration,
     Migration,
     PythonMigration,
 )
 
+if sys.version_info >= (3, 11):
+    from importlib.resources.abc import Traversable
+else:
+    from importlib.abc import Traversable
+
 _VERSION_PATTERN = re.compile(
     r"V(\d+(?:_\d+)*|\d+(?:\.\d+)*)__([\w ]+)(?:\.(\w+))?",
 )
+_HEADER_PATTERN = re.compile(r"//\s*(\w+)\s*:\s*(.*?)\s*$")
+# Options of the header, other leading comments are ordinary comments.
+HEADER_OPTIONS = frozenset(
+    (
+        "timeout",
+        "estimate",
+        "depends_on",
+        "bootstrap",
+        "batch_size",
+        "commit_per_batch",
+    ),
+)
+_DATA_EXTENSIONS = frozenset(("csv", "jsonl"))
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(ms|s|m|h)?")
+_DURATION_UNITS = MappingProxyType({"ms": 0.001, "s": 1, "m": 60, "h": 3600})
 
 
-def load(path: Path) -> list[Migration]:  # noqa: WPS210
+def load(path: Traversable) -> list[Migration]:  # noqa: WPS210
     """
     Load local migrations that are stored at the specified path.
 
-    :param path: the path to migrations.
-    :raises ValueError: if there are files with the same version.
+    Besides file system paths, package resources
+    (`importlib.resources.files("myapp") / "migrations"`) and paths
+    inside zip archives (`zipfile.Path`) are supported,
+    so migrations can be shipped in wheels and zipapps.
+
+    Files with other extensions are ignored, but misnamed migrations
+    (e.g. `V0001__init.cypher.bak` or `V0001__add-index.cypher`)
+    aren't skipped silently.
+
+    :param path: the path to the directory with migrations
+                 or to a bundle created by the `bundle` command.
+    :raises ValueError: if there are files with the same version
+                        or misnamed migration files.
     :return: sorted list of migrations.
     """
+    if path.is_file():
+        return bundle.load(path)
+    if not path.is_dir():
+        return []
+
     migrations: dict[str, Migration] = {}
-    loaders = {
+    load_data_migration = partial(_load_data_migration, path=path)
+    loaders: dict[str, Callable[..., Migration]] = {
         "py": _load_python_migration,
         "cypher": _load_cypher_migration,
+        "csv": load_data_migration,
+        "jsonl": load_data_migration,
     }
-    for migration_file in chain(path.glob("*.py"), path.glob("*.cypher")):
-        match = _VERSION_PATTERN.match(migration_file.name)
-
+    for migration_file in path.iterdir():
+        match = _match_file_name(migration_file.name, loaders.keys())
         if not match:
             continue
 
@@ -52,6 +95,93 @@ def load(path: Path) -> list[Migration]:  # noqa: WPS210
     return sorted(migrations.values())
 
 
+def parse_duration(duration: Union[str, float]) -> float:
+    """
+    Parse a duration like `90`, `90s`, `1.5m`, `500ms` or `2h`.
+
+    :param duration: the duration, seconds if there is no unit.
+    :raises ValueError: if the duration has an invalid format.
+    :return: the duration in seconds.
+    """
+    if isinstance(duration, (int, float)):
+        return float(duration)
+
+    match = _DURATION_PATTERN.fullmatch(duration.strip())
+    if not match:
+        raise ValueError(f"Invalid duration: {duration}")
+    amount, unit = match.groups()
+    return float(amount) * _DURATION_UNITS[unit or "s"]
+
+
+def parse_header(query: str) -> dict[str, str]:
+    """
+    Parse options from the leading comments of a Cypher script.
+
+    For example, `// timeout: 5m` gives `{"timeout": "5m"}`.
+    Only the lowercase names of `HEADER_OPTIONS` are options,
+    other comments (e.g. `// Timeout: none, rely on the server`)
+    are ignored.
+
+    :param query: the Cypher script.
+    :return: the options.
+    """
+    options = {}
+    for line in query.lstrip().splitlines():
+        line = line.strip()
+        if not line.startswith("//"):
+            break
+        match = _HEADER_PATTERN.match(line)
+        if match and match.group(1) in HEADER_OPTIONS:
+            options[match.group(1)] = match.group(2)
+    return options
+
+
+def parse_dependencies(
+    dependencies: Union[str, Iterable[str], None],
+) -> Optional[tuple[str, ...]]:
+    """
+    Parse versions of dependencies like `0001, V0002` or `["0001", "0002"]`.
+
+    :param dependencies: comma-separated versions or a collection of them.
+    :return: the versions or `None` if the dependencies are not declared.
+    """
+    if dependencies is None:
+        return None
+    if isinstance(dependencies, str):
+        dependencies = dependencies.split(",")
+    return tuple(
+        _prepare_version(dependency.strip().removeprefix("V"))
+        for dependency in dependencies
+        if dependency.strip()
+    )
+
+
+def _match_file_name(
+    file_name: str,
+    extensions: Collection[str],
+) -> Optional[re.Match[str]]:
+    match = _VERSION_PATTERN.fullmatch(file_name)
+    if match and match.groups()[2] in extensions:
+        return match
+
+    suffixes = file_name.split(".")[1:]
+    is_misnamed = _VERSION_PATTERN.match(file_name) and any(
+        suffix in extensions for suffix in suffixes
+    )
+    if is_misnamed and not _is_data_template(file_name):
+        raise ValueError(f"Invalid migration file name: {file_name}")
+    return None
+
+
+def _is_data_template(file_name: str) -> bool:
+    match = _VERSION_PATTERN.fullmatch(file_name.removesuffix(".cypher"))
+    return (
+        file_name.endswith(".cypher")
+        and match is not None
+        and match.groups()[2] in _DATA_EXTENSIONS
+    )
+
+
 def _prepare_version(version: str) -> str:
     return version.replace("_", ".")
 
@@ -63,27 +193,97 @@ def _prepare_description(description: str) -> str:
 def _load_python_migration(
     version: str,
     description: str,
-    migration_file: Path,
+    migration_file: Traversable,
 ) -> PythonMigration:
-    spec = spec_from_file_location(migration_file.stem, migration_file)
-    module = module_from_spec(spec)  # type: ignore
-    spec.loader.exec_module(module)  # type: ignore
+    module = _import_module(migration_file)
+    timeout = getattr(module, "TIMEOUT", None)
+    estimate = getattr(module, "ESTIMATE", None)
     return PythonMigration(
         version=version,
         description=description,
         code=module.up,
         source=migration_file.name,
+        timeout=None if timeout is None else parse_duration(timeout),
+        depends_on=parse_dependencies(getattr(module, "DEPENDS_ON", None)),
+        estimate=None if estimate is None else parse_duration(estimate),
+        run_on_bootstrap=_runs_on_bootstrap(getattr(module, "BOOTSTRAP", None)),
+    )
+
+
+def _import_module(migration_file: Traversable) -> ModuleType:
+    name = migration_file.name.removesuffix(".py")
+    if isinstance(migration_file, Path):
+        spec = spec_from_file_location(name, migration_file)
+        module = module_from_spec(spec)  # type: ignore
+        spec.loader.exec_module(module)  # type: ignore
+        return module
+
+    # Resources that are not files (e.g. in zip archives) can't be
+    # imported by path, so the module is compiled from the source.
+    module = ModuleType(name)
+    module.__file__ = str(migration_file)
+    code = compile(  # noqa: WPS421
+        migration_file.read_bytes(),
+        module.__file__,
+        "exec",
     )
+    exec(code, module.__dict__)  # noqa: S102, WPS421
+    return module
 
 
 def _load_cypher_migration(
     version: str,
     description: str,
-    migration_file: Path,
+    migration_file: Traversable,
 ) -> CypherMigration:
+    query = migration_file.read_text()
+    options = parse_header(query)
+    timeout = options.get("timeout")
+    estimate = options.get("estimate")
     return CypherMigration(
         version=version,
         description=description,
-        query=migration_file.read_text(),
+        query=query,
         source=migration_file.name,
+        timeout=None if timeout is None else parse_duration(timeout),
+        depends_on=parse_dependencies(options.get("depends_on")),
+        estimate=None if estimate is None else parse_duration(estimate),
+        run_on_bootstrap=_runs_on_bootstrap(options.get("bootstrap")),
     )
+
+
+def _load_data_migration(
+    version: str,
+    description: str,
+    migration_file: Traversable,
+    path: Traversable,
+) -> DataMigration:
+    template_file = path / f"{migration_file.name}.cypher"
+    if not template_file.is_file():
+        raise ValueError(
+            f"Migration V{version} has no Cypher template {template_file.name}",
+        )
+
+    template = template_file.read_text()
+    options = parse_header(template)
+    timeout = options.get("timeout")
+    estimate = options.get("estimate")
+    return DataMigration(
+        version=version,
+        description=description,
+        path=migration_file,
+        template=template,
+        source=migration_file.name,
+        timeout=None if timeout is None else parse_duration(timeout),
+        depends_on=parse_dependencies(options.get("depends_on")),
+        estimate=None if estimate is None else parse_duration(estimate),
+        run_on_bootstrap=_runs_on_bootstrap(options.get("bootstrap")),
+        batch_size=int(options.get("batch_size", batching.DEFAULT_BATCH_SIZE)),
+        commit_per_batch=options.get("commit_per_batch", "").lower() == "true",
+    )
+
+
+def _runs_on_bootstrap(mode: Optional[str]) -> bool:
+    if mode not in {None, "collapse", "run"}:
+        raise ValueError(f"Unknown bootstrap mode: {mode}, use collapse or run")
+    return mode == "run"
@@ -0,0 +1,258 @@
+import os
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Iterator, Optional, Sequence
+from urllib.request import Request, urlopen
+
+from neo4j import Result, Transaction
+
+_Sample = tuple[dict[str, str], float]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, 1800, 3600)
+
+_PREFIX = "neo4j_migrations"
+_ESCAPES = MappingProxyType(str.maketrans({"\\": r"\\", "\n": r"\n", '"': r"\""}))
+_COUNTERS = MappingProxyType(
+    {
+        "migrations_applied": "Migrations applied by the run.",
+        "transactions": "Migration transactions started, including retried ones.",
+        "migration_queries": "Queries sent by migrations, not counting the history.",
+        "retries": "Transactions retried after transient errors.",
+    },
+)
+
+
+class Metrics:
+    """
+    Metrics of a migration run in the Prometheus text format.
+
+    The executor only increments numbers in memory, and the metrics
+    are rendered once at the end of the run, so they can be always on.
+    The result can be written for the node_exporter textfile collector
+    or pushed to a Pushgateway.
+    """
+
+    def __init__(
+        self,
+        labels: Optional[dict[str, str]] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize the class instance.
+
+        :param labels: labels added to all metrics, e.g. project and database.
+        :param buckets: upper bounds of the migration duration histogram (seconds).
+        """
+        self.labels = labels or {}
+        self.buckets = sorted(buckets)
+        self.counters: Counter[str] = Counter()
+        # The duration of each applied migration (seconds) by version.
+        self.durations: dict[str, float] = {}
+        # The duration of the run phases (seconds), e.g. `load` and `analyze`.
+        self.phases: dict[str, float] = {}
+        # Whether the last run has succeeded, `None` if there were no runs.
+        self.success: Optional[bool] = None
+        self._lock = Lock()
+
+    def increment(self, counter: str, count: int = 1) -> None:
+        """
+        Increment a counter.
+
+        :param counter: the name of the counter, see `_COUNTERS`.
+        :param count: the increment.
+        """
+        with self._lock:
+            self.counters[counter] += count
+
+    def observe_migration(self, version: str, duration: float) -> None:
+        """
+        Record an applied migration.
+
+        :param version: the version of the migration.
+        :param duration: duration of migration execution (seconds).
+        """
+        with self._lock:
+            self.counters["migrations_applied"] += 1
+            self.durations[version] = duration
+
+    @contextmanager
+    def timer(self, phase: str) -> Iterator[None]:
+        """
+        Measure the duration of a run phase.
+
+        :param phase: the name of the phase.
+        :yields: nothing.
+        """
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start_time
+            with self._lock:
+                self.phases[phase] = duration
+
+    def render(self) -> str:
+        """
+        Render the metrics in the Prometheus text format.
+
+        :return: the text.
+        """
+        with self._lock:
+            lines = [
+                *self._render_counters(),
+                *self._render_durations(),
+                *self._render_phases(),
+                *self._metric(
+                    "last_run_timestamp_seconds",
+                    "gauge",
+                    "The time of the last run.",
+                    [({}, time.time())],
+                ),
+            ]
+            if self.success is not None:
+                lines.extend(
+                    self._metric(
+                        "last_run_success",
+                        "gauge",
+                        "Whether the last run has succeeded.",
+                        [({}, int(self.success))],
+                    ),
+                )
+        return "".join(f"{line}\n" for line in lines)
+
+    def write(self, path: Path) -> None:
+        """
+        Write the metrics to a file atomically.
+
+        The textfile collector never sees a partially written file.
+
+        :param path: the path to the file, usually `*.prom`.
+        """
+        prefix = f".{path.name}."
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=prefix)
+        try:
+            with os.fdopen(fd, "w") as temp_file:
+                temp_file.write(self.render())
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def push(self, url: str, timeout: float = 10) -> None:
+        """
+        Push the metrics to a Pushgateway.
+
+        :param url: the URL of the group,
+                    e.g. `http://localhost:9091/metrics/job/migrations`.
+        :param timeout: the timeout of the request (seconds).
+        """
+        request = Request(
+            url,
+            data=self.render().encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+            method="PUT",
+        )
+        with urlopen(request, timeout=timeout):  # noqa: S310
+            return
+
+    def _render_counters(self) -> Iterator[str]:
+        for counter, description in _COUNTERS.items():
+            yield from self._metric(
+                f"{counter}_total",
+                "counter",
+                description,
+                [({}, self.counters[counter])],
+            )
+
+    def _render_durations(self) -> Iterator[str]:
+        name = f"{_PREFIX}_migration_duration_seconds"
+        yield f"# HELP {name} Duration of migration execution."
+        yield f"# TYPE {name} histogram"
+        yield from self._histogram(name, list(self.durations.values()))
+        yield from self._metric(
+            "migration_last_duration_seconds",
+            "gauge",
+            "Duration of the last execution of a migration.",
+            [
+                ({"version": version}, value)
+                for version, value in self.durations.items()
+            ],
+        )
+
+    def _render_phases(self) -> Iterator[str]:
+        yield from self._metric(
+            "phase_duration_seconds",
+            "gauge",
+            "Duration of the phases of the last run (load, analyze, migrate).",
+            [({"phase": phase}, value) for phase, value in self.phases.items()],
+        )
+
+    def _histogram(self, name: str, observations: list[float]) -> Iterator[str]:
+        for bucket in self.buckets:
+            count = sum(observation <= bucket for observation in observations)
+            yield self._sample(f"{name}_bucket", {"le": str(bucket)}, count)
+        yield self._sample(f"{name}_bucket", {"le": "+Inf"}, len(observations))
+        yield self._sample(f"{name}_sum", {}, sum(observations))
+        yield self._sample(f"{name}_count", {}, len(observations))
+
+    def _metric(
+        self,
+        name: str,
+        metric_type: str,
+        description: str,
+        samples: list[_Sample],
+    ) -> Iterator[str]:
+        full_name = f"{_PREFIX}_{name}"
+        yield f"# HELP {full_name} {description}"
+        yield f"# TYPE {full_name} {metric_type}"
+        for labels, value in samples:
+            yield self._sample(full_name, labels, value)
+
+    def _sample(self, name: str, labels: dict[str, str], value: float) -> str:
+        all_labels = {**self.labels, **labels}
+        if not all_labels:
+            return f"{name} {value}"
+        rendered_labels = ",".join(
+            f'{label}="{label_value.translate(_ESCAPES)}"'
+            for label, label_value in all_labels.items()
+        )
+        return f"{name}{{{rendered_labels}}} {value}"
+
+
+class MeteredTransaction:
+    """
+    A transaction proxy that counts queries sent to the server by migrations.
+
+    It is given to migrations instead of the transaction itself,
+    all other attributes are delegated to the transaction.
+    """
+
+    def __init__(self, tx: Transaction, metrics: Metrics):
+        """
+        Initialize the class instance.
+
+        :param tx: the transaction.
+        :param metrics: the metrics to update.
+        """
+        self._tx = tx
+        self._metrics = metrics
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._tx, name)
+
+    def run(self, *args: Any, **kwargs: Any) -> Result:
+        """
+        Run a query within the transaction and count it.
+
+        :param args: positional arguments of `Transaction.run`.
+        :param kwargs: keyword arguments of `Transaction.run`.
+        :return: the result.
+        """
+        self._metrics.increment("migration_queries")
+        return self._tx.run(*args, **kwargs)
@@ -1,17 +1,40 @@
 import binascii
-from dataclasses import asdict, dataclass, field
+import csv
+import io
+import json
+import sys
+from dataclasses import dataclass, field, fields
 from enum import Enum
-from typing import Any, Callable, Optional
+from functools import partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
 
-from neo4j import Transaction
 from packaging.version import Version
 
+from neo4j_python_migrations import batching, progress
+
+if sys.version_info >= (3, 11):
+    from importlib.resources.abc import Traversable
+else:
+    from importlib.abc import Traversable
+
+# The driver is imported only for type checking,
+# so local migrations can be loaded and analyzed without it.
+if TYPE_CHECKING:
+    from neo4j import SummaryCounters, Transaction
+
+_CHUNK_SIZE = 1024 * 1024
+
+# A row of a data file.
+_Row = dict[str, Any]
+
 
 class MigrationType(str, Enum):  # noqa: WPS600
     """The type of migration to store in the database."""
 
     PYTHON = "PYTHON"
     CYPHER = "CYPHER"
+    DATA = "DATA"
 
 
 @dataclass(kw_only=True, order=False)
@@ -24,6 +47,17 @@ class Migration:
     type: str
     source: Optional[str] = None
     checksum: Optional[str] = None
+    # Transaction timeout (seconds), overrides the default one of the executor.
+    timeout: Optional[float] = field(default=None, compare=False)
+    # Versions of migrations this one depends on, they can be applied
+    # concurrently with it otherwise. `None` means all previous migrations.
+    depends_on: Optional[tuple[str, ...]] = field(default=None, compare=False)
+    # The expected duration (seconds) declared by the migration,
+    # used by runs with a time budget when there is no measured one.
+    estimate: Optional[float] = field(default=None, compare=False)
+    # Whether the migration is applied by a bootstrap of an empty database,
+    # only its schema statements are collapsed into the net schema otherwise.
+    run_on_bootstrap: bool = field(default=False, compare=False)
 
     @classmethod
     def from_dict(cls, properties: dict[str, Any]) -> "Migration":
@@ -49,9 +83,14 @@ class Migration:
         :param other: the child.
         :return: class instance.
         """
-        return cls.from_dict(asdict(other))
+        return cls.from_dict(
+            {
+                migration_field.name: getattr(other, migration_field.name)
+                for migration_field in fields(other)
+            },
+        )
 
-    def apply(self, tx: Transaction) -> None:
+    def apply(self, tx: "Transaction") -> None:
         """
         Apply migration to the database.
 
@@ -71,10 +110,10 @@ class Migration:
 class PythonMigration(Migration):
     """Migration based on a python code."""
 
-    code: Callable[[Transaction], None]
+    code: Callable[["Transaction"], None]
     type: str = field(default=MigrationType.PYTHON, init=False)
 
-    def apply(self, tx: Transaction) -> None:  # noqa: D102
+    def apply(self, tx: "Transaction") -> None:  # noqa: D102
         self.code(tx)
 
 
@@ -84,16 +123,25 @@ class CypherMigration(Migration):
 
     query: str = field(repr=False)
     type: str = field(default=MigrationType.CYPHER, init=False)
-    statements: list[str] = field(init=False, repr=False)
+    # Statements of the query, they are split from the query if not given
+    # (precompiled bundles store them along with the checksum).
+    statements: list[str] = field(default_factory=list, repr=False)
+    # The maximum number of rows of queries that merge statements of the same
+    # shape (see `batching`), statements are applied one by one if not given.
+    batch_size: Optional[int] = field(default=None, compare=False, repr=False)
 
     def __post_init__(self) -> None:
         super().__post_init__()
-        self.statements = list(  # noqa: WPS601
-            filter(
-                None,
-                [statement.strip() for statement in self.query.split(";")[:-1]],
-            ),
-        )
+        if not self.statements:
+            self.statements = list(  # noqa: WPS601
+                filter(
+                    None,
+                    [statement.strip() for statement in self.query.split(";")[:-1]],
+                ),
+            )
+
+        if self.checksum is not None:
+            return
 
         checksum = None
         for st in self.statements:
@@ -106,6 +154,115 @@ class CypherMigration(Migration):
 
         self.checksum = str(checksum)
 
-    def apply(self, tx: Transaction) -> None:  # noqa: D102
-        for statement in self.statements:
-            tx.run(statement)
+    def apply(self, tx: "Transaction") -> None:
+        """
+        Apply migration to the database.
+
+        The number of updated entities is reported to the progress channel.
+        If the batch size is set, consecutive statements that differ only
+        in literals are applied as one parameterized query.
+
+        :param tx: neo4j transaction.
+        """
+        channel = progress.current()
+        for query, parameters in self._queries():
+            query_result = (
+                tx.run(query) if parameters is None else tx.run(query, parameters)
+            )
+            channel.advance(count_updates(query_result.consume().counters))
+
+    def _queries(self) -> Iterable[batching.Query]:
+        if self.batch_size:
+            return batching.batch(self.statements, self.batch_size)
+        return ((statement, None) for statement in self.statements)
+
+
+@dataclass
+class DataMigration(Migration):
+    """
+    Migration that loads rows of a CSV or JSONL file with a Cypher template.
+
+    The template gets a batch of rows as the `$rows` parameter,
+    for example `UNWIND $rows AS row MERGE (:Country {code: row.code})`.
+    Values of CSV rows are strings.
+    """
+
+    # The data file, it is read lazily, so it must exist until the migration is applied.
+    path: Traversable = field(repr=False, compare=False)
+    template: str = field(repr=False)
+    type: str = field(default=MigrationType.DATA, init=False)
+    # The number of rows per `$rows`.
+    batch_size: int = field(default=batching.DEFAULT_BATCH_SIZE, compare=False)
+    # Whether each batch is committed in its own transaction,
+    # the template should be idempotent then (e.g. use `MERGE`).
+    commit_per_batch: bool = field(default=False, compare=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.checksum is not None:
+            return
+
+        checksum = binascii.crc32(self.template.encode())
+        with self.path.open("rb") as data_file:
+            for chunk in iter(partial(data_file.read, _CHUNK_SIZE), b""):
+                checksum = binascii.crc32(chunk, checksum)
+        self.checksum = str(checksum)
+
+    def batches(self) -> Iterator[list[_Row]]:
+        """
+        Read the rows of the file in batches.
+
+        Only one batch is kept in memory.
+
+        :yields: batches of rows.
+        """
+        with io.TextIOWrapper(
+            self.path.open("rb"),
+            encoding="utf-8",
+            newline="",
+        ) as data_file:
+            rows: Iterator[_Row] = (
+                csv.DictReader(data_file)
+                if self.path.name.endswith(".csv")
+                else (json.loads(line) for line in data_file if line.strip())
+            )
+            yield from iter(lambda: list(islice(rows, self.batch_size)), [])
+
+    def apply(self, tx: "Transaction") -> None:
+        """
+        Apply migration to the database.
+
+        All batches are applied in the transaction.
+
+        :param tx: neo4j transaction.
+        """
+        for rows in self.batches():
+            self.apply_batch(tx, rows)
+
+    def apply_batch(self, tx: "Transaction", rows: list[_Row]) -> None:
+        """
+        Apply the template to a batch of rows.
+
+        The number of rows is reported to the progress channel.
+
+        :param tx: neo4j transaction.
+        :param rows: the rows.
+        """
+        tx.run(self.template, rows=rows).consume()
+        progress.current().advance(len(rows))
+
+
+def count_updates(counters: "SummaryCounters") -> int:
+    """
+    Count the entities updated by a query.
+
+    :param counters: the update counters of the query.
+    :return: created and deleted nodes and relationships, and set properties.
+    """
+    return (
+        counters.nodes_created
+        + counters.nodes_deleted
+        + counters.relationships_created
+        + counters.relationships_deleted
+        + counters.properties_set
+    )
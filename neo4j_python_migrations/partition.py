@@ -0,0 +1,254 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from neo4j_python_migrations import progress
+
+# Parameters of a batch query.
+Parameters = dict[str, Any]
+
+# Applies a query with parameters in a new transaction that is committed
+# (in the transaction of the migration when it is rehearsed),
+# returns the number of updated entities.
+BatchRunner = Callable[[str, Parameters], int]
+
+_current: ContextVar[Optional[BatchRunner]] = ContextVar(
+    "batch_runner",
+    default=None,
+)
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A part of the data processed by a sequence of batches."""
+
+    name: str
+    # Parameters of the batch queries, they are read lazily.
+    batches: Iterable[Parameters]
+
+
+@dataclass
+class PartitionResult:
+    """The progress of a partition."""
+
+    name: str
+    # The number of committed batches.
+    batches: int = 0
+    # The number of updated entities.
+    updates: int = 0
+    # The error of the failed batch, the next batches are not applied.
+    error: Optional[BaseException] = None
+
+
+class PartitionError(Exception):
+    """Some partitions have failed."""
+
+    def __init__(self, results: list[PartitionResult]):
+        """
+        Initialize the class instance.
+
+        :param results: the results of all partitions.
+        """
+        self.results = results
+        failed = ", ".join(
+            f"{partition_result.name} ({partition_result.error})"
+            for partition_result in results
+            if partition_result.error is not None
+        )
+        super().__init__(f"Partitions failed: {failed}")
+
+
+@contextmanager
+def bind(runner: BatchRunner) -> Iterator[None]:
+    """
+    Make the runner of batches current for the migration being applied.
+
+    :param runner: the runner of batches.
+    :yields: nothing.
+    """
+    token = _current.set(runner)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def id_ranges(start: int, stop: int, batch_size: int) -> Iterator[Parameters]:
+    """
+    Split the range of IDs into batches.
+
+    :param start: the first ID.
+    :param stop: the ID after the last one.
+    :param batch_size: the number of IDs per batch.
+    :yields: the parameters `start` and `end` (exclusive) of each batch.
+    """
+    for batch_start in range(start, stop, batch_size):
+        yield {"start": batch_start, "end": min(batch_start + batch_size, stop)}
+
+
+def by_id_range(
+    start: int,
+    stop: int,
+    batch_size: int,
+    partitions: int,
+) -> list[Partition]:
+    """
+    Split the range of IDs into contiguous partitions of batches.
+
+    :param start: the first ID.
+    :param stop: the ID after the last one.
+    :param batch_size: the number of IDs per batch.
+    :param partitions: the number of partitions.
+    :return: the partitions named by their ranges.
+    """
+    size = max(-(-(stop - start) // partitions), 1)
+    return [
+        Partition(
+            f"{partition_start}..{min(partition_start + size, stop)}",
+            id_ranges(partition_start, min(partition_start + size, stop), batch_size),
+        )
+        for partition_start in range(start, stop, size)
+    ]
+
+
+def by_label(
+    labels: Iterable[str],
+    start: int,
+    stop: int,
+    batch_size: int,
+) -> list[Partition]:
+    """
+    Make a partition of batches per label.
+
+    :param labels: the labels.
+    :param start: the first ID.
+    :param stop: the ID after the last one.
+    :param batch_size: the number of IDs per batch.
+    :return: the partitions named by the labels, batches get
+             the parameters `label`, `start` and `end`.
+    """
+    return [
+        Partition(label, _labeled(label, id_ranges(start, stop, batch_size)))
+        for label in labels
+    ]
+
+
+def run(
+    query: str,
+    partitions: Iterable[Partition],
+    sessions: int = 4,
+    max_in_flight: Optional[int] = None,
+    on_batch: Optional[Callable[[PartitionResult], None]] = None,
+) -> list[PartitionResult]:
+    """
+    Apply the query to batches of the partitions concurrently.
+
+    Each batch is committed in its own transaction of a new session
+    of the executor, transactions that failed with transient errors
+    are retried. The query should be idempotent (e.g. use `MERGE`),
+    since the batches committed before an error are applied again
+    by the next run. Partitions take turns, so they advance together.
+    An error stops only its partition, the others are completed.
+    When the migration is rehearsed, the batches are applied one
+    at a time in its transaction, which is rolled back.
+
+    The updated entities are reported to the progress channel
+    of the migration, so the run can be cancelled between batches.
+
+    :param query: the query, it gets the parameters of a batch.
+    :param partitions: the partitions.
+    :param sessions: the maximum number of concurrent batches.
+    :param max_in_flight: the maximum number of submitted batches,
+                          twice the number of sessions by default.
+    :param on_batch: callback that gets the partition of each applied batch.
+    :raises RuntimeError: if it is called outside of the executor.
+    :raises PartitionError: if some partitions have failed.
+    :return: the results of the partitions.
+    """
+    runner = _current.get()
+    if runner is None:
+        raise RuntimeError("Partitions can be run only by a migration of the executor")
+
+    partitioned_run = _PartitionedRun(
+        runner,
+        query,
+        list(partitions),
+        max_in_flight or sessions * 2,
+        on_batch,
+    )
+    with ThreadPoolExecutor(sessions, "partition") as pool:
+        partitioned_run.run(pool)
+
+    results = partitioned_run.results
+    if any(partition_result.error is not None for partition_result in results):
+        raise PartitionError(results)
+    return results
+
+
+class _PartitionedRun:
+    """The state of `run`."""
+
+    def __init__(
+        self,
+        runner: BatchRunner,
+        query: str,
+        partitions: list[Partition],
+        max_in_flight: int,
+        on_batch: Optional[Callable[[PartitionResult], None]],
+    ):
+        self.runner = runner
+        self.query = query
+        self.max_in_flight = max_in_flight
+        self.on_batch = on_batch
+        self.results = [PartitionResult(partition.name) for partition in partitions]
+        # Partitions with batches to submit, in the order of their turns.
+        self._turns = deque(
+            zip(self.results, (iter(partition.batches) for partition in partitions)),
+        )
+        self._running: dict[Future[int], PartitionResult] = {}
+
+    def run(self, pool: ThreadPoolExecutor) -> None:
+        channel = progress.current()
+        while self._turns or self._running:
+            self._submit(pool)
+            done, _ = wait(self._running, return_when=FIRST_COMPLETED)
+            for future in done:
+                channel.advance(self._collect(future, self._running.pop(future)))
+
+    def _submit(self, pool: ThreadPoolExecutor) -> None:
+        while self._turns and len(self._running) < self.max_in_flight:
+            partition_result, batches = self._turns.popleft()
+            if partition_result.error is not None:
+                continue
+            parameters = next(batches, None)
+            if parameters is None:
+                continue
+            future = pool.submit(
+                copy_context().run,
+                self.runner,
+                self.query,
+                parameters,
+            )
+            self._running[future] = partition_result
+            self._turns.append((partition_result, batches))
+
+    def _collect(self, future: Future[int], partition_result: PartitionResult) -> int:
+        """Update the partition, return the number of updated entities."""
+        error = future.exception()
+        if error is not None:
+            partition_result.error = partition_result.error or error
+            return 0
+        updates = future.result()
+        partition_result.batches += 1
+        partition_result.updates += updates
+        if self.on_batch:
+            self.on_batch(partition_result)
+        return updates
+
+
+def _labeled(label: str, batches: Iterable[Parameters]) -> Iterator[Parameters]:
+    for batch in batches:
+        yield {"label": label, **batch}
@@ -0,0 +1,223 @@
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Collection, Iterator, Optional, cast
+
+# The driver is imported only for type checking and the profilers
+# when they run, so `ProfileMode` can be used by the CLI without them.
+if TYPE_CHECKING:
+    import tracemalloc
+
+    from neo4j import Result, Transaction
+
+_TOP_ALLOCATIONS = 25
+
+
+class ProfileMode(str, Enum):  # noqa: WPS600
+    """What to profile."""
+
+    CPU = "cpu"
+    MEMORY = "memory"
+
+
+@dataclass
+class ProfileReport:
+    """The profile of a migration."""
+
+    version: str
+    # Wall-clock time of the migration (seconds).
+    wall_time: float
+    # Time spent in `tx.run` and in reading results (seconds).
+    server_time: float
+    # CPU time of the process (seconds).
+    cpu_time: float
+    # Peak of the traced memory (bytes), `None` if memory is not profiled.
+    peak_memory: Optional[int] = None
+    paths: tuple[Path, ...] = ()
+
+    @property
+    def client_time(self) -> float:
+        """
+        Wall-clock time spent outside of the server calls (seconds).
+
+        :return: the time.
+        """
+        return max(self.wall_time - self.server_time, 0)
+
+
+class Profiler:
+    """
+    Profiler of Python migrations.
+
+    Each migration is profiled separately, the results are written
+    to one file per version and mode: `V<version>.prof` for cProfile
+    (it can be viewed with `pstats` or snakeviz) and `V<version>.memory.txt`
+    for the top allocations recorded by tracemalloc.
+    """
+
+    def __init__(self, modes: Collection[ProfileMode], output_dir: Path):
+        """
+        Initialize the class instance.
+
+        :param modes: what to profile.
+        :param output_dir: the directory for profile files.
+        """
+        self.modes = modes
+        self.output_dir = output_dir
+        self.reports: list[ProfileReport] = []
+        self._peak_memory: Optional[int] = None
+
+    @contextmanager
+    def profile(self, version: str, tx: "Transaction") -> Iterator["Transaction"]:
+        """
+        Profile a migration.
+
+        :param version: the version of the migration.
+        :param tx: the transaction of the migration.
+        :yields: the transaction that measures time spent in server calls,
+                 it should be given to the migration.
+        """
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        timed_tx = TimedTransaction(tx)
+        start_time = time.monotonic()
+        start_cpu_time = time.process_time()
+        with ExitStack() as stack:
+            paths = []
+            if ProfileMode.CPU in self.modes:
+                paths.append(stack.enter_context(self._profile_cpu(version)))
+            if ProfileMode.MEMORY in self.modes:
+                paths.append(stack.enter_context(self._trace_memory(version)))
+            yield cast("Transaction", timed_tx)
+
+        self.reports.append(
+            ProfileReport(
+                version=version,
+                wall_time=time.monotonic() - start_time,
+                server_time=timed_tx.server_time,
+                cpu_time=time.process_time() - start_cpu_time,
+                peak_memory=self._peak_memory,
+                paths=tuple(paths),
+            ),
+        )
+
+    @contextmanager
+    def _profile_cpu(self, version: str) -> Iterator[Path]:
+        import cProfile
+
+        path = self.output_dir / f"V{version}.prof"
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield path
+        finally:
+            profile.disable()
+            profile.dump_stats(path)
+
+    @contextmanager
+    def _trace_memory(self, version: str) -> Iterator[Path]:
+        import tracemalloc
+
+        path = self.output_dir / f"V{version}.memory.txt"
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            yield path
+        finally:
+            snapshot = self._stop_tracing(started)
+
+        statistics = snapshot.statistics("lineno")[:_TOP_ALLOCATIONS]
+        path.write_text(
+            "".join(
+                [
+                    f"Peak traced memory: {self._peak_memory} bytes\n",
+                    *(f"{statistic}\n" for statistic in statistics),
+                ],
+            ),
+        )
+
+    def _stop_tracing(self, started: bool) -> "tracemalloc.Snapshot":
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        self._peak_memory = tracemalloc.get_traced_memory()[1]
+        if started:
+            tracemalloc.stop()
+        return snapshot
+
+
+class TimedTransaction:
+    """
+    A transaction proxy that measures time spent waiting for the server.
+
+    Both sending queries and reading their results are measured.
+    """
+
+    def __init__(self, tx: "Transaction"):
+        """
+        Initialize the class instance.
+
+        :param tx: the transaction.
+        """
+        self._tx = tx
+        # Time spent waiting for the server (seconds).
+        self.server_time: float = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._tx, name)
+
+    def run(self, *args: Any, **kwargs: Any) -> "Result":
+        """
+        Run a query within the transaction and measure it.
+
+        :param args: positional arguments of `Transaction.run`.
+        :param kwargs: keyword arguments of `Transaction.run`.
+        :return: the result that measures reading of records.
+        """
+        with self.timer():
+            query_result = self._tx.run(*args, **kwargs)
+        return cast("Result", _TimedResult(query_result, self))
+
+    @contextmanager
+    def timer(self) -> Iterator[None]:
+        """
+        Add the duration of the block to the server time.
+
+        :yields: nothing.
+        """
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.server_time += time.monotonic() - start_time
+
+
+class _TimedResult:
+    """A result proxy that measures reading of records."""
+
+    def __init__(self, query_result: "Result", tx: TimedTransaction):
+        self._result = query_result
+        self._tx = tx
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._result, name)
+        if not callable(attribute):
+            return attribute
+
+        def measured(*args: Any, **kwargs: Any) -> Any:
+            with self._tx.timer():
+                return attribute(*args, **kwargs)
+
+        return measured
+
+    def __iter__(self) -> Iterator[Any]:
+        records = iter(self._result)
+        while True:
+            with self._tx.timer():
+                record = next(records, None)
+            if record is None:
+                return
+            yield record
@@ -0,0 +1,160 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Event
+from typing import Callable, Iterator, Optional
+
+
+class MigrationCancelledError(Exception):
+    """The migration has been cancelled."""
+
+
+@dataclass
+class ProgressEvent:
+    """The progress of the migration being applied."""
+
+    version: str
+    processed: int
+    total: Optional[int]
+    elapsed: float
+
+    @property
+    def rate(self) -> float:
+        """
+        Processed rows per second.
+
+        :return: the rate.
+        """
+        if not self.elapsed:
+            return 0
+        return self.processed / self.elapsed
+
+    @property
+    def eta(self) -> Optional[float]:
+        """
+        Estimated time to completion (seconds).
+
+        :return: the estimate or `None` if the total is unknown.
+        """
+        if self.total is None or not self.rate:
+            return None
+        return max(self.total - self.processed, 0) / self.rate
+
+
+class Progress:
+    """
+    Progress channel of a migration.
+
+    Events are emitted not more often than once per interval,
+    so `advance` is cheap enough to be called for every row.
+    It is also a cancellation point: when the migration is cancelled,
+    `advance` raises `MigrationCancelledError`.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+        interval: float = 1,
+        cancelled: Optional[Event] = None,
+    ):
+        """
+        Initialize the class instance.
+
+        :param version: the version of the migration.
+        :param on_progress: callback that gets progress events.
+        :param interval: the minimum pause between events (seconds).
+        :param cancelled: the event that is set when the migration is cancelled.
+        """
+        self.version = version
+        self.on_progress = on_progress
+        self.interval = interval
+        self.cancelled = cancelled
+        self.processed = 0
+        self.total: Optional[int] = None
+        self._started_at = time.monotonic()
+        self._reported_at = self._started_at
+        self._reported = False
+
+    def set_total(self, total: Optional[int]) -> None:
+        """
+        Set the expected number of rows, it is used to calculate ETA.
+
+        :param total: the number of rows.
+        """
+        self.total = total
+
+    def advance(self, count: int = 1) -> None:
+        """
+        Mark rows as processed.
+
+        :param count: the number of processed rows.
+        :raises MigrationCancelledError: if the migration has been cancelled.
+        """
+        self.processed += count
+        if self.cancelled is not None and self.cancelled.is_set():
+            raise MigrationCancelledError(f"Migration V{self.version} is cancelled")
+        if self.on_progress is None:
+            return
+
+        now = time.monotonic()
+        if now - self._reported_at >= self.interval:
+            self._reported_at = now
+            self._report(now)
+
+    def finish(self) -> None:
+        """Emit the final event if any events have been emitted before."""
+        if self._reported:
+            self._report(time.monotonic())
+
+    def _report(self, now: float) -> None:
+        self._reported = True
+        if self.on_progress:
+            self.on_progress(
+                ProgressEvent(
+                    version=self.version,
+                    processed=self.processed,
+                    total=self.total,
+                    elapsed=now - self._started_at,
+                ),
+            )
+
+
+_current: ContextVar[Optional[Progress]] = ContextVar("progress", default=None)
+
+
+def current() -> Progress:
+    """
+    Get the progress channel of the migration being applied.
+
+    Outside of the executor a channel without a receiver is returned.
+
+    :return: the progress channel.
+    """
+    return _current.get() or Progress("")
+
+
+@contextmanager
+def track(
+    version: str,
+    on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+    interval: float = 1,
+    cancelled: Optional[Event] = None,
+) -> Iterator[Progress]:
+    """
+    Make a new progress channel current for the migration.
+
+    :param version: the version of the migration.
+    :param on_progress: callback that gets progress events.
+    :param interval: the minimum pause between events (seconds).
+    :param cancelled: the event that is set when the migration is cancelled.
+    :yields: the progress channel.
+    """
+    channel = Progress(version, on_progress, interval, cancelled)
+    token = _current.set(channel)
+    try:
+        yield channel
+    finally:
+        _current.reset(token)
+    channel.finish()
@@ -0,0 +1,166 @@
+# The plugin is loaded by every pytest run of the environment,
+# so the driver and the executor are imported only by the fixtures.
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import pytest
+
+if TYPE_CHECKING:
+    from neo4j import Driver
+
+    from neo4j_python_migrations.executor import Executor
+    from neo4j_python_migrations.migration import Migration
+
+# Deletes data in batches, keeps the history, indexes and constraints.
+RESET_QUERY = """
+MATCH (n) WHERE NOT n:__Neo4jMigration
+CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+# Settings: the name of the ini option (with the `neo4j_migrations_` prefix),
+# the environment variable that overrides it and the default.
+_SETTINGS = (
+    ("uri", "NEO4J_MIGRATIONS_URI", "neo4j://127.0.0.1:7687"),
+    ("user", "NEO4J_MIGRATIONS_USER", "neo4j"),
+    ("password", "NEO4J_MIGRATIONS_PASS", "neo4j"),
+    ("path", "NEO4J_MIGRATIONS_PATH", ""),
+    ("project", "NEO4J_MIGRATIONS_PROJECT", ""),
+    ("database", "NEO4J_MIGRATIONS_DATABASE", ""),
+    ("schema_database", "NEO4J_MIGRATIONS_SCHEMA_DATABASE", ""),
+    ("reset_batch_size", "NEO4J_MIGRATIONS_RESET_BATCH_SIZE", "10000"),
+)
+
+_migrated_key = pytest.StashKey["MigratedDatabase"]()
+
+
+class MigratedDatabase:
+    """A test database that is migrated once per test session."""
+
+    def __init__(self, executor: Executor, reset_batch_size: int = 10000):
+        """
+        Initialize the class instance.
+
+        :param executor: the executor of the migrations of the database.
+        :param reset_batch_size: the number of nodes deleted per transaction
+                                 by `reset`.
+        """
+        self.executor = executor
+        self.reset_batch_size = reset_batch_size
+        # Migrations applied by the session.
+        self.applied: list[Migration] = []
+        # Migrations applied again because they were changed since the last run.
+        self.reapplied: list[Migration] = []
+
+    @property
+    def driver(self) -> Driver:
+        """
+        The driver of the database.
+
+        :returns: the driver.
+        """
+        return self.executor.driver
+
+    def migrate(self) -> None:
+        """
+        Apply the changed and the pending migrations.
+
+        The history is kept by `reset`, so a database reused by the next
+        test session gets only the migrations whose files have changed
+        and the new ones.
+        """
+        self.reapplied = self.executor.reapply_changed()
+        self.executor.migrate(on_apply=self.applied.append)
+
+    def reset(self) -> None:
+        """Delete the data, keep the history of migrations, indexes and constraints."""
+        with self.driver.session(database=self.executor.database) as session:
+            session.run(RESET_QUERY, batch_size=self.reset_batch_size).consume()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:  # noqa: D103
+    for name, envvar, default in _SETTINGS:
+        parser.addini(
+            f"neo4j_migrations_{name}",
+            help=f"neo4j-python-migrations: {name.replace('_', ' ')} "
+            f"(overridden by ${envvar}).",
+            default=default,
+        )
+
+
+def pytest_terminal_summary(  # noqa: D103
+    terminalreporter: pytest.TerminalReporter,
+    config: pytest.Config,
+) -> None:
+    migrated = config.stash.get(_migrated_key, None)
+    if migrated is None:
+        return
+    applied = " ".join(f"V{migration.version}" for migration in migrated.applied)
+    reapplied = " ".join(f"V{migration.version}" for migration in migrated.reapplied)
+    terminalreporter.write_line(
+        f"neo4j migrations: applied {len(migrated.applied)} {applied}".rstrip(),
+    )
+    if reapplied:
+        terminalreporter.write_line(f"neo4j migrations: reapplied changed {reapplied}")
+
+
+@pytest.fixture(scope="session")
+def neo4j_migrated(pytestconfig: pytest.Config) -> Iterator[MigratedDatabase]:
+    """
+    Apply the migrations once per test session.
+
+    :param pytestconfig: the config of the session.
+    :yields: the migrated database.
+    """
+    from neo4j import GraphDatabase
+
+    from neo4j_python_migrations.executor import Executor
+
+    path = _setting(pytestconfig, "path")
+    if not path:
+        raise pytest.UsageError(
+            "Set the neo4j_migrations_path ini option or $NEO4J_MIGRATIONS_PATH",
+        )
+    with GraphDatabase.driver(
+        _setting(pytestconfig, "uri"),
+        auth=(_setting(pytestconfig, "user"), _setting(pytestconfig, "password")),
+    ) as driver:
+        migrated = MigratedDatabase(
+            Executor(
+                driver=driver,
+                migrations_path=Path(path),
+                project=_setting(pytestconfig, "project") or None,
+                database=_setting(pytestconfig, "database") or None,
+                schema_database=_setting(pytestconfig, "schema_database") or None,
+            ),
+            reset_batch_size=int(_setting(pytestconfig, "reset_batch_size")),
+        )
+        migrated.migrate()
+        pytestconfig.stash[_migrated_key] = migrated
+        yield migrated
+
+
+@pytest.fixture
+def neo4j_migrated_driver(neo4j_migrated: MigratedDatabase) -> Iterator[Driver]:
+    """
+    Get the driver of the migrated database, the data is deleted after the test.
+
+    :param neo4j_migrated: the migrated database.
+    :yields: the driver.
+    """
+    yield neo4j_migrated.driver
+    neo4j_migrated.reset()
+
+
+def _setting(config: pytest.Config, name: str) -> str:
+    envvar = next(
+        setting_envvar
+        for setting_name, setting_envvar, _ in _SETTINGS
+        if setting_name == name
+    )
+    value: Optional[str] = os.environ.get(envvar)
+    if value is None:
+        value = str(config.getini(f"neo4j_migrations_{name}"))
+    return value
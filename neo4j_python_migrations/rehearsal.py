@@ -0,0 +1,134 @@
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Iterator, Optional
+
+from neo4j import Result, Transaction
+
+from neo4j_python_migrations.migration import count_updates
+
+COUNTERS = (
+    "nodes_created",
+    "nodes_deleted",
+    "relationships_created",
+    "relationships_deleted",
+    "properties_set",
+    "labels_added",
+    "labels_removed",
+    "indexes_added",
+    "indexes_removed",
+    "constraints_added",
+    "constraints_removed",
+)
+
+
+@dataclass
+class Rehearsal:
+    """The result of a migration applied in a transaction that was rolled back."""
+
+    version: str
+    description: str
+    # Duration of migration execution (seconds).
+    duration: float = 0
+    # Non-zero update counters of all queries of the migration.
+    counters: dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @contextmanager
+    def timer(self) -> Iterator[None]:
+        """
+        Measure the duration of the migration, also if it fails.
+
+        :yields: nothing.
+        """
+        start_time = time.monotonic()
+        try:
+            yield
+        finally:
+            self.duration = time.monotonic() - start_time
+
+
+class RecordingTransaction:
+    """A transaction proxy that collects update counters of queries."""
+
+    def __init__(self, tx: Transaction):
+        """
+        Initialize the class instance.
+
+        :param tx: the transaction.
+        """
+        self._tx = tx
+        self._results: list[Result] = []
+        self._lock = Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._tx, name)
+
+    def run(self, *args: Any, **kwargs: Any) -> Result:
+        """
+        Run a query within the transaction and remember its result.
+
+        :param args: positional arguments of `Transaction.run`.
+        :param kwargs: keyword arguments of `Transaction.run`.
+        :return: the result.
+        """
+        query_result = self._tx.run(*args, **kwargs)
+        self._results.append(query_result)
+        return query_result
+
+    def run_batch(self, query: str, parameters: dict[str, Any]) -> int:
+        """
+        Run a batch of `partition.run` within the transaction.
+
+        Batches of concurrent partitions share the transaction,
+        so they are run one at a time.
+
+        :param query: the query.
+        :param parameters: the parameters of the batch.
+        :return: the number of updated entities.
+        """
+        with self._lock:
+            return count_updates(self.run(query, parameters).consume().counters)
+
+    def counters(self) -> dict[str, int]:
+        """
+        Sum the update counters of all queries.
+
+        Results that have not been read are consumed,
+        so it must be called before the transaction is closed.
+
+        :return: non-zero counters.
+        """
+        total: Counter[str] = Counter()
+        for query_result in self._results:
+            summary_counters = query_result.consume().counters
+            total.update(
+                {counter: getattr(summary_counters, counter) for counter in COUNTERS},
+            )
+        return {name: count for name, count in total.items() if count}
+
+
+def save(rehearsals: list[Rehearsal], path: Path) -> None:
+    """
+    Save rehearsals to a JSON file.
+
+    :param rehearsals: the rehearsals.
+    :param path: the path to the file.
+    """
+    path.write_text(
+        json.dumps([asdict(rehearsal) for rehearsal in rehearsals], indent=2),
+    )
+
+
+def load(path: Path) -> list[Rehearsal]:
+    """
+    Load rehearsals from a JSON file created by `save`.
+
+    :param path: the path to the file.
+    :return: the rehearsals.
+    """
+    return [Rehearsal(**rehearsal) for rehearsal in json.loads(path.read_text())]
@@ -0,0 +1,105 @@
+import heapq
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from neo4j_python_migrations.history import HistoryEntry
+
+# A project and a migration target.
+ChainKey = tuple[Optional[str], Optional[str]]
+
+
+@dataclass
+class Aggregate:
+    """The number and the total duration of migration runs."""
+
+    count: int = 0
+    # Seconds.
+    total: float = 0
+
+    @property
+    def mean(self) -> float:
+        """
+        The mean duration of the runs.
+
+        :returns: the duration (seconds).
+        """
+        return self.total / self.count if self.count else 0
+
+    def add(self, duration: float) -> None:
+        """
+        Add a run.
+
+        :param duration: the duration of the run (seconds).
+        """
+        self.count += 1
+        self.total += duration
+
+
+@dataclass
+class HistoryReport:
+    """
+    Aggregations of the history of applied migrations.
+
+    Records are added one by one, so the history can be streamed
+    without keeping it in memory. Records without a duration
+    (e.g. imported ones) are ignored.
+    """
+
+    # The number of the slowest migrations to keep.
+    top: int = 10
+    # Durations by project and migration target.
+    chains: dict[ChainKey, Aggregate] = field(default_factory=dict)
+    # Durations by month of the run (`YYYY-MM`).
+    months: dict[str, Aggregate] = field(default_factory=dict)
+    _slowest: list[tuple[float, int, HistoryEntry]] = field(
+        default_factory=list,
+        repr=False,
+    )
+    _added: int = field(default=0, repr=False)
+
+    @classmethod
+    def build(cls, entries: Iterable[HistoryEntry], top: int = 10) -> "HistoryReport":
+        """
+        Aggregate the records.
+
+        :param entries: the records.
+        :param top: the number of the slowest migrations to keep.
+        :return: the report.
+        """
+        report = cls(top=top)
+        for entry in entries:
+            report.add(entry)
+        return report
+
+    @property
+    def slowest(self) -> list[HistoryEntry]:
+        """
+        The slowest migrations.
+
+        :returns: the records, the slowest first.
+        """
+        return [entry for _, _, entry in sorted(self._slowest, reverse=True)]
+
+    def add(self, entry: HistoryEntry) -> None:
+        """
+        Add a record to the aggregations.
+
+        :param entry: the record.
+        """
+        if entry.duration is None:
+            return
+
+        chain_key = (entry.project, entry.migration_target)
+        self.chains.setdefault(chain_key, Aggregate()).add(entry.duration)
+        if entry.installed_on:
+            month = entry.installed_on.strftime("%Y-%m")
+            self.months.setdefault(month, Aggregate()).add(entry.duration)
+
+        # The counter keeps the order of records of the same duration
+        # and saves comparing the records themselves.
+        self._added += 1
+        item = (entry.duration, -self._added, entry)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, item)
+        elif self._slowest and item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
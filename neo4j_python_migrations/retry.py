@@ -0,0 +1,70 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar, Union
+
+from neo4j.exceptions import DriverError, Neo4jError
+
+ResultT = TypeVar("ResultT")
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Settings for retrying transactions that failed with transient errors.
+
+    Transient errors are, for example, deadlocks, leader switches
+    and lost connections to cluster members.
+    """
+
+    max_attempts: int = 5
+    initial_delay: float = 1
+    multiplier: float = 2
+    max_delay: float = 30
+    jitter: float = 0.2
+
+    def delay(self, attempt: int) -> float:
+        """
+        Get the pause before the next attempt.
+
+        :param attempt: the number of the failed attempt, starting from 1.
+        :return: the pause in seconds.
+        """
+        delay = min(
+            self.initial_delay * self.multiplier ** (attempt - 1),
+            self.max_delay,
+        )
+        return delay * random.uniform(  # noqa: S311
+            1 - self.jitter,
+            1 + self.jitter,
+        )
+
+    def run(
+        self,
+        work: Callable[[int], ResultT],
+        on_retry: Optional[Callable[[Exception], None]] = None,
+    ) -> ResultT:
+        """
+        Run the work, repeating it while it fails with transient errors.
+
+        :param work: the function that gets the number of the attempt,
+                     starting from 1.
+        :param on_retry: callback that is called before each retry.
+        :raises Exception: if the error is not transient
+                           or there are no attempts left.
+        :return: the result of the work.
+        """
+        attempt = 1
+        while True:  # noqa: WPS457
+            try:
+                return work(attempt)
+            except (Neo4jError, DriverError) as exc:
+                if not self._can_retry(exc, attempt):
+                    raise
+                if on_retry:
+                    on_retry(exc)
+                time.sleep(self.delay(attempt))
+                attempt += 1
+
+    def _can_retry(self, exc: Union[Neo4jError, DriverError], attempt: int) -> bool:
+        return attempt < self.max_attempts and exc.is_retryable()
@@ -0,0 +1,145 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextvars import copy_context
+from typing import Callable, Optional, cast
+
+from neo4j_python_migrations.migration import Migration
+
+# Applies a migration, returns its duration (seconds) or `None`
+# if it has already been recorded as applied.
+Execute = Callable[[Migration], Optional[float]]
+
+# Records an applied migration.
+Record = Callable[[Migration, Optional[float]], None]
+
+_Future = Future[Optional[float]]
+
+
+class UnrecordedMigrationsError(Exception):
+    """
+    Migrations were applied after a failed one, but can't be recorded.
+
+    The history is a chain in the order of versions, so migrations
+    that follow the failed one are recorded only after it. They are
+    applied again by the next run, which should succeed
+    if they are idempotent.
+    """
+
+    def __init__(self, failed: Migration, unrecorded: list[Migration]):
+        """
+        Initialize the class instance.
+
+        :param failed: the failed migration, the error is the cause.
+        :param unrecorded: the applied but unrecorded migrations.
+        """
+        self.failed = failed
+        self.unrecorded = unrecorded
+        versions = ", ".join(f"V{migration.version}" for migration in unrecorded)
+        super().__init__(
+            f"Migration V{failed.version} failed, migrations {versions} "
+            "were applied but not recorded and will be applied again",
+        )
+
+
+class Scheduler:
+    """
+    Applies independent migrations concurrently.
+
+    A migration is started when all its dependencies are applied.
+    The migrations are recorded in the given order, as soon as
+    all the previous ones are recorded. After the first error no new
+    migrations are started, the running ones are awaited and recorded
+    if possible, and the error is raised. If migrations that follow
+    the failed one have been applied, `UnrecordedMigrationsError`
+    caused by the error is raised instead.
+    """
+
+    def __init__(
+        self,
+        migrations: list[Migration],
+        dependencies: dict[str, set[str]],
+        workers: int,
+    ):
+        """
+        Initialize the class instance.
+
+        :param migrations: sorted pending migrations.
+        :param dependencies: versions of pending migrations
+                             that each migration depends on.
+        :param workers: the maximum number of concurrent migrations.
+        """
+        self.migrations = migrations
+        self.dependencies = dependencies
+        self.workers = workers
+        self._waiting = list(migrations)
+        self._running: dict[_Future, Migration] = {}
+        # Durations of applied migrations by version.
+        self._applied: dict[str, Optional[float]] = {}
+        self._recorded = 0
+        self._failure: Optional[BaseException] = None
+        self._failed: Optional[Migration] = None
+
+    def run(self, execute: Execute, record: Record) -> None:
+        """
+        Apply and record the migrations.
+
+        Migrations are applied in threads of a pool,
+        each one gets a copy of the context of the caller.
+
+        :param execute: the function that applies a migration.
+        :param record: the function that records an applied migration,
+                       it's called in the thread of the caller.
+        :raises ValueError: if dependencies of the migrations can't be resolved.
+        :raises UnrecordedMigrationsError: if migrations were applied
+                                           after the failed one.
+        :raises BaseException: the first error of the migrations.
+        """
+        with ThreadPoolExecutor(self.workers, "migration") as pool:
+            while self._running or (self._waiting and self._failure is None):
+                if self._failure is None:
+                    self._submit_ready(pool, execute)
+                if not self._running:
+                    raise ValueError("Dependencies of migrations can't be resolved")
+                done, _ = wait(self._running, return_when=FIRST_COMPLETED)
+                self._collect(done)
+                self._record(record)
+        if self._failure is not None:
+            self._raise_failure()
+
+    def _submit_ready(self, pool: ThreadPoolExecutor, execute: Execute) -> None:
+        for migration in list(self._waiting):
+            if len(self._running) >= self.workers:
+                return
+            if self.dependencies[migration.version].issubset(self._applied):
+                self._waiting.remove(migration)
+                future = pool.submit(copy_context().run, execute, migration)
+                self._running[future] = migration
+
+    def _collect(self, done: set[_Future]) -> None:
+        for future in done:
+            migration = self._running.pop(future)
+            exc = future.exception()
+            if exc is None:
+                self._applied[migration.version] = future.result()
+            elif self._failure is None:
+                self._failure = exc
+                self._failed = migration
+
+    def _record(self, record: Record) -> None:
+        while self._recorded < len(self.migrations):
+            migration = self.migrations[self._recorded]
+            if migration.version not in self._applied:
+                return
+            record(migration, self._applied[migration.version])
+            self._recorded += 1
+
+    def _raise_failure(self) -> None:
+        unrecorded = [
+            migration
+            for migration in self.migrations[self._recorded :]
+            if self._applied.get(migration.version) is not None
+        ]
+        if unrecorded and self._failed is not None:
+            raise UnrecordedMigrationsError(self._failed, unrecorded) from (
+                self._failure
+            )
+        raise cast(BaseException, self._failure)
@@ -0,0 +1,329 @@
+import marshal
+import multiprocessing
+import pickle  # noqa: S403
+import re
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from threading import Event
+from types import ModuleType
+from typing import Any, Callable, Iterator, Optional, cast
+
+from neo4j import Bookmarks, Driver, GraphDatabase, Session, Transaction
+
+from neo4j_python_migrations import partition, progress
+from neo4j_python_migrations.metrics import MeteredTransaction, Metrics
+from neo4j_python_migrations.migration import PythonMigration, count_updates
+from neo4j_python_migrations.retry import RetryPolicy
+
+if sys.version_info >= (3, 11):
+    from importlib.resources.abc import Traversable
+else:
+    from importlib.abc import Traversable
+
+if sys.platform != "win32":
+    import resource
+
+_POLL_INTERVAL = 0.1
+_SIZE_PATTERN = re.compile(r"(?i)(\d+)\s*([KMGT]?)i?B?")
+_SIZE_UNITS = ("", "K", "M", "G", "T")
+
+
+class WorkerError(Exception):
+    """The worker process has failed without a transferable exception."""
+
+
+@dataclass(frozen=True)
+class WorkerConfig:
+    """Settings of worker processes for Python migrations."""
+
+    # The URI and the credentials of the driver of a worker.
+    uri: str
+    auth: tuple[str, str]
+    # The limit of the address space of a worker (bytes), POSIX only.
+    memory_limit: Optional[int] = None
+    # Keyword arguments of `GraphDatabase.driver`.
+    driver_options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class WorkerTask:
+    """A Python migration to apply in a worker process."""
+
+    version: str
+    # The file name of the migration module.
+    filename: str
+    # Marshalled code of the migration module.
+    bytecode: bytes
+    database: Optional[str]
+    # Options of `Session.begin_transaction`.
+    transaction: dict[str, Any]
+    progress_interval: float
+    # Bookmarks the worker session should wait for.
+    bookmarks: tuple[str, ...] = ()
+    # The retry policy of batches of `partition.run`.
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+
+
+@dataclass(frozen=True)
+class WorkerResult:
+    """The result of a migration applied in a worker process."""
+
+    # Duration of migration execution (seconds).
+    duration: float
+    # Bookmarks of the committed transaction.
+    bookmarks: tuple[str, ...]
+    # The number of queries sent by the migration.
+    queries: int
+
+
+def parse_size(size: str) -> int:
+    """
+    Parse a size like `512M` or `4GiB` (binary units).
+
+    :param size: the size, bytes if there is no unit.
+    :raises ValueError: if the size can't be parsed.
+    :return: the size (bytes).
+    """
+    match = _SIZE_PATTERN.fullmatch(size.strip())
+    if not match:
+        raise ValueError(f"Invalid size: {size!r}")
+    number, unit = match.groups()
+    return int(number) * 1024 ** _SIZE_UNITS.index(unit.upper())
+
+
+def bytecode(migration: PythonMigration, migrations_path: Traversable) -> bytes:
+    """
+    Get marshalled code of the module of a Python migration.
+
+    :param migration: the migration.
+    :param migrations_path: the directory the migration has been loaded from.
+    :raises ValueError: if the migration has no source.
+    :return: the code.
+    """
+    # Migrations loaded from bundles carry compiled code.
+    bundled_code = getattr(migration.code, "bytecode", None)
+    if bundled_code is not None:
+        return cast(bytes, bundled_code)
+    if not migration.source:
+        raise ValueError(
+            f"Migration V{migration.version} can't be run in a worker process",
+        )
+    source = (migrations_path / migration.source).read_bytes()
+    return marshal.dumps(compile(source, migration.source, "exec"))  # noqa: WPS421
+
+
+def run(
+    config: WorkerConfig,
+    task: WorkerTask,
+    on_apply: Callable[[], None],
+    on_progress: Optional[Callable[[progress.ProgressEvent], None]] = None,
+    cancelled: Optional[Event] = None,
+) -> WorkerResult:
+    """
+    Apply a Python migration in a spawned worker process.
+
+    The worker has its own driver, so the memory used by the migration
+    is returned to the system when the worker exits. Progress events
+    are streamed to the parent, and the transaction is committed only
+    after `on_apply` has succeeded in the parent.
+
+    :param config: settings of the worker.
+    :param task: the migration.
+    :param on_apply: callback that is called before the transaction is committed.
+    :param on_progress: callback that gets progress events of the migration.
+    :param cancelled: the event that is set when the migration is cancelled,
+                      the worker is terminated then.
+    :raises WorkerError: if the worker has exited unexpectedly.
+    :raises MigrationCancelledError: if the migration has been cancelled.
+    :return: the result of the migration.
+    """
+    with _spawn(config, task) as (process, connection):
+        while True:
+            kind, payload = _receive(process, connection, task.version, cancelled)
+            if kind == "done":
+                return cast(WorkerResult, payload)
+            if kind == "error":
+                raise payload
+            if kind == "applied":
+                _confirm(connection, on_apply)
+            elif on_progress:
+                on_progress(payload)
+
+
+@contextmanager
+def _spawn(
+    config: WorkerConfig,
+    task: WorkerTask,
+) -> Iterator[tuple[BaseProcess, Connection]]:
+    context = multiprocessing.get_context("spawn")
+    connection, child_connection = context.Pipe()
+    process = context.Process(
+        target=_main,
+        args=(config, task, child_connection),
+        name=f"migration-V{task.version}",
+        daemon=True,
+    )
+    process.start()
+    child_connection.close()
+    with connection:
+        try:
+            yield process, connection
+        finally:
+            process.terminate()
+            process.join()
+
+
+def _receive(
+    process: BaseProcess,
+    connection: Connection,
+    version: str,
+    cancelled: Optional[Event],
+) -> tuple[str, Any]:
+    while not connection.poll(_POLL_INTERVAL):
+        if cancelled is not None and cancelled.is_set():
+            raise progress.MigrationCancelledError(f"Migration V{version} is cancelled")
+    try:
+        return cast(tuple[str, Any], connection.recv())
+    except EOFError:
+        process.join()
+        raise WorkerError(
+            f"The worker of migration V{version} has exited "
+            f"with code {process.exitcode}",
+        )
+
+
+def _confirm(connection: Connection, on_apply: Callable[[], None]) -> None:
+    try:
+        on_apply()
+    except BaseException:
+        connection.send(False)
+        raise
+    connection.send(True)
+
+
+def _main(config: WorkerConfig, task: WorkerTask, connection: Connection) -> None:
+    try:
+        if config.memory_limit:
+            _limit_memory(config.memory_limit)
+        worker_result = _apply(config, task, connection)
+    except BaseException as exc:
+        traceback.print_exc()
+        connection.send(("error", _transferable(exc)))
+    else:
+        connection.send(("done", worker_result))
+    connection.close()
+
+
+def _apply(
+    config: WorkerConfig,
+    task: WorkerTask,
+    connection: Connection,
+) -> Optional[WorkerResult]:
+    module = ModuleType(task.filename.removesuffix(".py"))
+    module.__file__ = task.filename
+    exec(marshal.loads(task.bytecode), module.__dict__)  # noqa: S102, WPS421
+
+    with GraphDatabase.driver(
+        config.uri,
+        auth=config.auth,
+        **config.driver_options,
+    ) as driver:
+        with driver.session(
+            database=task.database,
+            bookmarks=Bookmarks.from_raw_values(task.bookmarks),
+        ) as session:
+            applied = _apply_in_transaction(
+                driver,
+                session,
+                module.up,
+                task,
+                connection,
+            )
+            if applied is None:
+                return None
+            return WorkerResult(
+                duration=applied[0],
+                bookmarks=tuple(session.last_bookmarks().raw_values),
+                queries=applied[1],
+            )
+
+
+def _apply_in_transaction(
+    driver: Driver,
+    session: Session,
+    up: Callable[[Transaction], None],
+    task: WorkerTask,
+    connection: Connection,
+) -> Optional[tuple[float, int]]:
+    """Apply the migration, return its duration and the number of queries."""
+    metrics = Metrics()
+    with session.begin_transaction(**task.transaction) as tx:
+        start_time = time.monotonic()
+        with (
+            progress.track(
+                task.version,
+                lambda event: connection.send(("progress", event)),
+                task.progress_interval,
+            ),
+            partition.bind(partial(_run_partition_batch, driver, task, metrics)),
+        ):
+            up(cast(Transaction, MeteredTransaction(tx, metrics)))
+        duration = time.monotonic() - start_time
+
+        connection.send(("applied", None))
+        if not connection.recv():
+            tx.rollback()
+            return None
+    return duration, metrics.counters["migration_queries"]
+
+
+def _run_partition_batch(
+    driver: Driver,
+    task: WorkerTask,
+    metrics: Metrics,
+    query: str,
+    parameters: dict[str, Any],
+) -> int:
+    """Apply a batch of `partition.run` in a new transaction, return the updates."""
+    return task.retry_policy.run(
+        lambda attempt: _apply_partition_batch(
+            driver, task, metrics, query, parameters
+        ),
+    )
+
+
+def _apply_partition_batch(
+    driver: Driver,
+    task: WorkerTask,
+    metrics: Metrics,
+    query: str,
+    parameters: dict[str, Any],
+) -> int:
+    with driver.session(
+        database=task.database,
+        bookmarks=Bookmarks.from_raw_values(task.bookmarks),
+    ) as session:
+        with session.begin_transaction(**task.transaction) as tx:
+            metered_tx = MeteredTransaction(tx, metrics)
+            return count_updates(metered_tx.run(query, parameters).consume().counters)
+
+
+def _limit_memory(limit: int) -> None:
+    if sys.platform == "win32":
+        raise ValueError("The memory limit of workers is not supported on Windows")
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _transferable(exc: BaseException) -> BaseException:
+    """Return the exception if it can be sent to the parent, or its description."""
+    try:
+        pickle.loads(pickle.dumps(exc))  # noqa: S301
+    except Exception:
+        return WorkerError(f"{type(exc).__name__}: {exc}")
+    return exc
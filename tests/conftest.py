@@ -5,6 +5,8 @@ import pytest
 from neo4j import Driver, GraphDatabase
 from yarl import URL
 
+pytest_plugins = ["pytester"]
+
 username = os.environ.get("NEO4J_MIGRATIONS_USER", "neo4j")
 password = os.environ.get("NEO4J_MIGRATIONS_PASS", "neo4j")
 host = os.environ.get("NEO4J_MIGRATIONS_HOST", "localhost")
@@ -1,8 +1,13 @@
+import pytest
+
 from neo4j_python_migrations.analyzer import (
     AnalyzingResult,
     InvalidVersion,
     InvalidVersionStatus,
+    RepairPlan,
     analyze,
+    dependencies,
+    plan_repair,
 )
 from neo4j_python_migrations.migration import Migration, MigrationType
 
@@ -101,3 +106,93 @@ def test_migrations_are_different() -> None:
         ],
         latest_applied_version="0001",
     )
+
+
+def test_squashed_migrations_are_satisfied() -> None:
+    local_migrations = [
+        Migration(version="0001", description="123", type=MigrationType.PYTHON),
+        Migration(version="0002", description="123", type=MigrationType.PYTHON),
+        Migration(version="0003", description="123", type=MigrationType.PYTHON),
+    ]
+    remote_migrations = [local_migrations[1]]
+
+    assert analyze(local_migrations, remote_migrations, "0001") == AnalyzingResult(
+        pending_migrations=[local_migrations[2]],
+        latest_applied_version="0002",
+    )
+
+
+def test_whole_history_is_squashed() -> None:
+    local_migrations = [
+        Migration(version="0002", description="123", type=MigrationType.PYTHON),
+        Migration(version="0003", description="123", type=MigrationType.PYTHON),
+    ]
+
+    assert analyze(local_migrations, [], "0002") == AnalyzingResult(
+        pending_migrations=[local_migrations[1]],
+        latest_applied_version="0002",
+    )
+
+
+def test_plan_repair() -> None:
+    local_migrations = [
+        Migration(version="0001", description="new", type="CYPHER", checksum="2"),
+        Migration(version="0003", description="123", type="CYPHER", checksum="3"),
+        Migration(version="0004", description="123", type="CYPHER", checksum="4"),
+    ]
+    remote_migrations = [
+        Migration(version="0001", description="old", type="CYPHER", checksum="1"),
+        Migration(version="0002", description="123", type="CYPHER", checksum="2"),
+        Migration(version="0003", description="123", type="CYPHER", checksum="3"),
+    ]
+
+    assert plan_repair(local_migrations, remote_migrations) == RepairPlan(
+        updates=[(remote_migrations[0], local_migrations[0])],
+    )
+    assert plan_repair(
+        local_migrations,
+        remote_migrations,
+        delete_missed_locally=True,
+    ) == RepairPlan(
+        updates=[(remote_migrations[0], local_migrations[0])],
+        deletions=[remote_migrations[1]],
+    )
+
+
+def test_dependencies() -> None:
+    local_migrations = [
+        Migration(version="0001", description="", type="CYPHER"),
+        Migration(version="0002", description="", type="CYPHER", depends_on=()),
+        Migration(version="0003", description="", type="CYPHER", depends_on=("1",)),
+        Migration(version="0004", description="", type="CYPHER", depends_on=("0002",)),
+        Migration(version="0005", description="", type="CYPHER"),
+    ]
+
+    assert dependencies(local_migrations[1:], local_migrations) == {
+        "0002": set(),
+        "0003": set(),
+        "0004": {"0002"},
+        "0005": {"0002", "0003", "0004"},
+    }
+
+
+@pytest.mark.parametrize(
+    "depends_on, message",
+    [
+        (("0003",), "depends on unknown version 0003"),
+        (("0002",), "can only depend on previous versions, not on 0002"),
+    ],
+)
+def test_invalid_dependencies(depends_on: tuple[str, ...], message: str) -> None:
+    local_migrations = [
+        Migration(version="0001", description="", type="CYPHER"),
+        Migration(
+            version="0002",
+            description="",
+            type="CYPHER",
+            depends_on=depends_on,
+        ),
+    ]
+
+    with pytest.raises(ValueError, match=message):
+        dependencies(local_migrations, local_migrations)
@@ -0,0 +1,84 @@
+from typing import Any, Optional
+
+import pytest
+
+from neo4j_python_migrations import batching
+
+_Batch = tuple[str, Optional[dict[str, Any]]]
+
+
+@pytest.mark.parametrize(
+    "statement, expected_query, expected_row",
+    [
+        (
+            r"CREATE (:X {id: 1, name: 'a\'b', ok: true})",
+            "CREATE (:X {id: row.p0, name: row.p1, ok: row.p2})",
+            {"p0": 1, "p1": "a'b", "p2": True},
+        ),
+        (
+            r'MERGE (n:X {id: 2.5e1}) SET n.tags = ["\u00e9", null]',
+            "MERGE (n:X {id: row.p0}) SET n.tags = [row.p1, row.p2]",
+            {"p0": 25.0, "p1": "é", "p2": None},
+        ),
+        (
+            "// 1 comment\nMATCH (a:X {id: -1}), (b:`Y 2`) CREATE (a)-[:R]->(b)",
+            "// 1 comment\nMATCH (a:X {id: -row.p0}), (b:`Y 2`) CREATE (a)-[:R]->(b)",
+            {"p0": 1},
+        ),
+        (
+            "MATCH (n:X {id: 1}) WHERE n.name IS NULL SET n.name = null",
+            "MATCH (n:X {id: row.p0}) WHERE n.name IS NULL SET n.name = row.p1",
+            {"p0": 1, "p1": None},
+        ),
+        (
+            "MATCH (n:X) WHERE n.name IS /* set */ NOT null SET n.ok = false",
+            "MATCH (n:X) WHERE n.name IS /* set */ NOT null SET n.ok = row.p0",
+            {"p0": False},
+        ),
+    ],
+)
+def test_shape(
+    statement: str, expected_query: str, expected_row: dict[str, Any]
+) -> None:
+    statement_shape = batching.shape(statement)
+
+    assert statement_shape == batching.Shape(query=expected_query, row=expected_row)
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "CREATE INDEX x FOR (n:X) ON (n.id)",
+        "MATCH (n:X {id: 1}) RETURN n",
+        "CREATE (:X {id: $id})",
+        "MATCH (a)-[*1..3]->(b) DELETE a",
+        "MATCH (n) WITH n LIMIT 10 DELETE n",
+        "CREATE (row:X {id: 1})",
+        "CREATE (:X {id: 0x1F})",
+        "CALL db.awaitIndexes()",
+    ],
+)
+def test_shape_skips_unsupported_statements(statement: str) -> None:
+    assert batching.shape(statement) is None
+
+
+def test_batch_merges_consecutive_statements_of_the_same_shape() -> None:
+    statements = [
+        "CREATE (:X {id: 1})",
+        "CREATE (:X {id: 2})",
+        "CREATE (:X {id: 3})",
+        "CREATE (:Y {id: 4})",
+        "MATCH (n:X) DETACH DELETE n",
+        "CREATE (:X {id: 5})",
+        "CREATE (:X {id: 6})",
+    ]
+    unwind_x = "UNWIND $rows AS row\nCREATE (:X {id: row.p0})"
+    expected: list[_Batch] = [
+        (unwind_x, {"rows": [{"p0": 1}, {"p0": 2}]}),
+        (unwind_x, {"rows": [{"p0": 3}]}),
+        ("CREATE (:Y {id: 4})", None),
+        ("MATCH (n:X) DETACH DELETE n", None),
+        (unwind_x, {"rows": [{"p0": 5}, {"p0": 6}]}),
+    ]
+
+    assert list(batching.batch(statements, batch_size=2)) == expected
@@ -0,0 +1,151 @@
+from unittest.mock import Mock
+
+import pytest
+
+from neo4j_python_migrations import bootstrap
+from neo4j_python_migrations.migration import (
+    CypherMigration,
+    Migration,
+    PythonMigration,
+)
+
+
+def _cypher(version: str, query: str) -> CypherMigration:
+    return CypherMigration(version=version, description="", query=query)
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        (
+            "CREATE INDEX person_name IF NOT EXISTS FOR (p:Person) ON (p.name)",
+            bootstrap.SchemaStatement(
+                "CREATE INDEX person_name IF NOT EXISTS FOR (p:Person) ON (p.name)",
+                "INDEX",
+                "person_name",
+                conditional=True,
+            ),
+        ),
+        (
+            "// timeout: 5m\ncreate text index `a b` for (p:Person) on (p.bio)",
+            bootstrap.SchemaStatement(
+                "create text index `a b` for (p:Person) on (p.bio)",
+                "INDEX",
+                "a b",
+            ),
+        ),
+        (
+            "CREATE CONSTRAINT FOR (p:Person)\n  REQUIRE p.id IS UNIQUE",
+            bootstrap.SchemaStatement(
+                "CREATE CONSTRAINT FOR (p:Person)\n  REQUIRE p.id IS UNIQUE",
+                "CONSTRAINT",
+                "CREATE CONSTRAINT FOR (p:Person) REQUIRE p.id IS UNIQUE",
+            ),
+        ),
+        (
+            "DROP CONSTRAINT person_id IF EXISTS",
+            bootstrap.SchemaStatement(
+                "DROP CONSTRAINT person_id IF EXISTS",
+                "CONSTRAINT",
+                "person_id",
+                drop=True,
+                conditional=True,
+            ),
+        ),
+        ("CREATE (:Person {name: 'index'})", None),
+        ("MATCH (n) DETACH DELETE n", None),
+    ],
+)
+def test_parse_schema_statement(
+    statement: str,
+    expected: bootstrap.SchemaStatement,
+) -> None:
+    assert bootstrap.parse_schema_statement(statement) == expected
+
+
+def test_plan_collapses_net_schema() -> None:
+    seed = _cypher("0004", "CREATE (:Config {id: 1});")
+    seed.run_on_bootstrap = True
+    backfill: Migration = PythonMigration(version="0005", description="", code=Mock())
+    migrations: list[Migration] = [
+        _cypher(
+            "0001",
+            "CREATE INDEX old_name FOR (p:Person) ON (p.name);\n"
+            "CREATE CONSTRAINT person_id FOR (p:Person) REQUIRE p.id IS UNIQUE;",
+        ),
+        _cypher(
+            "0002",
+            "DROP INDEX old_name;\n"
+            "CREATE INDEX new_name FOR (p:Person) ON (p.name);\n"
+            "MATCH (p:Person) SET p.active = true;",
+        ),
+        _cypher(
+            "0003",
+            "CREATE CONSTRAINT person_id IF NOT EXISTS "
+            "FOR (p:Person) REQUIRE p.id IS UNIQUE;\n"
+            "DROP INDEX missing IF EXISTS;",
+        ),
+        seed,
+        backfill,
+    ]
+
+    bootstrap_plan = bootstrap.plan(migrations)
+
+    assert bootstrap_plan.schema == [
+        "CREATE CONSTRAINT person_id IF NOT EXISTS "
+        "FOR (p:Person) REQUIRE p.id IS UNIQUE",
+        "CREATE INDEX new_name IF NOT EXISTS FOR (p:Person) ON (p.name)",
+    ]
+    assert bootstrap_plan.elided == 4
+    assert bootstrap_plan.collapsed == [migrations[0], migrations[2]]
+    assert bootstrap_plan.applied == [seed]
+    assert bootstrap_plan.skipped == [migrations[1], backfill]
+
+
+def test_plan_creates_unnamed_objects_if_not_exists() -> None:
+    migration = _cypher(
+        "0001",
+        "CREATE TEXT INDEX FOR (p:Person) ON (p.name);\n"
+        "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE;",
+    )
+
+    assert bootstrap.plan([migration]).schema == [
+        "CREATE TEXT INDEX IF NOT EXISTS FOR (p:Person) ON (p.name)",
+        "CREATE CONSTRAINT IF NOT EXISTS FOR (p:Person) REQUIRE p.id IS UNIQUE",
+    ]
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        (
+            "CREATE INDEX a FOR (p:Person) ON (p.x);\n"
+            "CREATE INDEX a FOR (p:Person) ON (p.y);",
+            "V0001 creates an existing index a",
+        ),
+        ("DROP CONSTRAINT unknown;", "V0001 drops an absent constraint unknown"),
+    ],
+)
+def test_plan_rejects_impossible_histories(query: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        bootstrap.plan([_cypher("0001", query)])
+
+
+def test_plan_rejects_schema_shared_with_migrations_run_on_bootstrap() -> None:
+    seed = _cypher(
+        "0002",
+        "CREATE INDEX config_id FOR (c:Config) ON (c.id);\n"
+        "CREATE (:Config {id: 1});",
+    )
+    seed.run_on_bootstrap = True
+    migrations: list[Migration] = [
+        _cypher("0001", "CREATE INDEX person_name FOR (p:Person) ON (p.name);"),
+        seed,
+        _cypher("0003", "DROP INDEX config_id;"),
+    ]
+
+    with pytest.raises(ValueError, match="V0003 changes index config_id of V0002"):
+        bootstrap.plan(migrations)
+    assert bootstrap.plan(migrations[:2]).schema == [
+        "CREATE INDEX person_name IF NOT EXISTS FOR (p:Person) ON (p.name)",
+    ]
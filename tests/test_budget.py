@@ -0,0 +1,108 @@
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from neo4j_python_migrations import budget
+from neo4j_python_migrations.history import HistoryEntry
+from neo4j_python_migrations.migration import CypherMigration, Migration
+from neo4j_python_migrations.rehearsal import Rehearsal
+
+
+def _migration(
+    version: str,
+    estimate: Optional[float] = None,
+    checksum: str = "",
+) -> Migration:
+    migration = CypherMigration(
+        version=version,
+        description="",
+        query="",
+        estimate=estimate,
+    )
+    migration.checksum = checksum
+    return migration
+
+
+def _entry(version: str, duration: Optional[float], checksum: str) -> HistoryEntry:
+    return HistoryEntry(
+        project=None,
+        migration_target="staging",
+        migration=_migration(version, checksum=checksum),
+        duration=duration,
+    )
+
+
+def test_estimate_prefers_measured_durations() -> None:
+    migrations = [
+        _migration("0001", estimate=60, checksum="a"),
+        _migration("0002", estimate=60, checksum="b"),
+        _migration("0003", estimate=60, checksum="c"),
+        _migration("0004"),
+    ]
+    rehearsals = [
+        Rehearsal(version="0001", description="", duration=5),
+        Rehearsal(version="0002", description="", duration=1, error="failed"),
+    ]
+    history = [
+        _entry("0002", 10, "b"),
+        _entry("0002", 20, "b"),
+        _entry("0003", 30, "changed"),
+        _entry("0003", None, "c"),
+    ]
+
+    estimates = budget.estimate(migrations, rehearsals, history)
+
+    assert estimates == {
+        "0001": budget.Estimate(5, "rehearsal"),
+        "0002": budget.Estimate(20, "history"),
+        "0003": budget.Estimate(60, "declared"),
+        "0004": budget.Estimate(),
+    }
+
+
+@pytest.mark.parametrize(
+    "seconds, selected",
+    [(30, 2), (29, 1), (31, 3)],
+)
+def test_plan_selects_prefix_within_budget(seconds: float, selected: int) -> None:
+    migrations = [_migration("0001"), _migration("0002"), _migration("0003")]
+    estimates = {
+        "0001": budget.Estimate(10, "declared"),
+        "0002": budget.Estimate(20, "declared"),
+        "0003": budget.Estimate(1, "declared"),
+    }
+
+    planned = budget.plan(migrations, estimates, seconds)
+
+    assert planned == (migrations[:selected], migrations[selected:])
+
+
+def test_plan_stops_at_migration_without_estimate() -> None:
+    migrations = [_migration("0001"), _migration("0002")]
+    estimates = {"0001": budget.Estimate(), "0002": budget.Estimate(1, "declared")}
+
+    assert budget.plan(migrations, estimates, 100) == ([], migrations)
+
+
+def test_plan_falls_back_to_declared_estimates() -> None:
+    migrations = [_migration("0001", estimate=10), _migration("0002")]
+
+    planned = budget.plan(migrations, {}, 100)
+
+    assert planned == (migrations[:1], migrations[1:])
+    assert budget.Deadline(100, {}).allows(migrations[0])
+
+
+@patch("neo4j_python_migrations.budget.time")
+def test_deadline(time_mock: MagicMock) -> None:
+    time_mock.monotonic.return_value = 100
+    deadline = budget.Deadline(
+        60, {"0001": budget.Estimate(30, "declared"), "0002": budget.Estimate()}
+    )
+
+    time_mock.monotonic.return_value = 130
+    assert deadline.allows(_migration("0001"))
+    assert not deadline.allows(_migration("0002"))
+    time_mock.monotonic.return_value = 131
+    assert not deadline.allows(_migration("0001"))
@@ -0,0 +1,108 @@
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from neo4j_python_migrations import bundle, loader
+from neo4j_python_migrations.migration import (
+    DataMigration,
+    Migration,
+    PythonMigration,
+)
+
+
+@pytest.fixture
+def migrations_path(tmp_path: Path) -> Path:
+    path = tmp_path / "migrations"
+    path.mkdir()
+    path.joinpath("V0001__initial.cypher").write_text(
+        "// timeout: 1m\nCREATE (:A);\nCREATE (:B);\n",
+    )
+    path.joinpath("V0002__python.py").write_text(
+        "TIMEOUT = 5\nBOOTSTRAP = 'run'\ndef up(tx):\n    tx.run('RETURN 1')\n",
+    )
+    return path
+
+
+def test_bundle_is_loaded_like_directory(migrations_path: Path, tmp_path: Path) -> None:
+    bundle_path = tmp_path / "migrations.bundle"
+    migrations = loader.load(migrations_path)
+
+    bundle.write(migrations, migrations_path, bundle_path)
+    bundled_migrations = loader.load(bundle_path)
+
+    assert [Migration.from_other(migration) for migration in bundled_migrations] == [
+        Migration.from_other(migration) for migration in migrations
+    ]
+    assert [migration.timeout for migration in bundled_migrations] == [60, 5]
+    assert [migration.run_on_bootstrap for migration in bundled_migrations] == [
+        False,
+        True,
+    ]
+    assert bundled_migrations[0].statements == migrations[0].statements  # type: ignore
+
+
+def test_bundled_python_migration_is_executed_lazily(
+    migrations_path: Path,
+    tmp_path: Path,
+) -> None:
+    bundle_path = tmp_path / "migrations.bundle"
+    bundle.write(loader.load(migrations_path), migrations_path, bundle_path)
+    migrations_path.joinpath("V0002__python.py").unlink()
+
+    python_migration = bundle.load(bundle_path)[1]
+    tx = Mock()
+    python_migration.apply(tx)
+
+    assert isinstance(python_migration, PythonMigration)
+    tx.run.assert_called_once_with("RETURN 1")
+
+
+def test_bundled_data_migration_keeps_its_data(
+    migrations_path: Path,
+    tmp_path: Path,
+) -> None:
+    migrations_path.joinpath("V0003__countries.csv").write_text("code\nNL\nSE\n")
+    migrations_path.joinpath("V0003__countries.csv.cypher").write_text(
+        "// batch_size: 1\nUNWIND $rows AS row MERGE (:Country {code: row.code})",
+    )
+    bundle_path = tmp_path / "migrations.bundle"
+    migrations = loader.load(migrations_path)
+    bundle.write(migrations, migrations_path, bundle_path)
+    migrations_path.joinpath("V0003__countries.csv").unlink()
+
+    data_migration = bundle.load(bundle_path)[2]
+
+    assert isinstance(data_migration, DataMigration)
+    assert Migration.from_other(data_migration) == Migration.from_other(migrations[2])
+    assert data_migration.batch_size == 1
+    batches = list(data_migration.batches())
+    assert batches == [[{"code": "NL"}], [{"code": "SE"}]]
+
+
+def test_loaded_bundle_survives_rebuild(migrations_path: Path, tmp_path: Path) -> None:
+    bundle_path = tmp_path / "migrations.bundle"
+    bundle.write(loader.load(migrations_path), migrations_path, bundle_path)
+    python_migration = bundle.load(bundle_path)[1]
+
+    # Rebuilding the bundle doesn't affect the loaded migrations.
+    migrations_path.joinpath("V0002__python.py").write_text(
+        "def up(tx):\n    tx.run('RETURN 2')\n",
+    )
+    bundle.write(loader.load(migrations_path), migrations_path, bundle_path)
+    tx = Mock()
+    python_migration.apply(tx)
+
+    tx.run.assert_called_once_with("RETURN 1")
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "migrations",
+        "migrations.bundle",
+    ]
+
+
+def test_load_invalid_bundle(tmp_path: Path) -> None:
+    bundle_path = tmp_path / "migrations.bundle"
+    bundle_path.write_bytes(b"not a bundle, just some bytes")
+
+    with pytest.raises(ValueError, match="is not a migration bundle"):
+        bundle.load(bundle_path)
@@ -1,17 +1,113 @@
+import json
+import subprocess  # noqa: S404
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any
 from unittest.mock import MagicMock, patch
 
+import pytest
 from typer.testing import CliRunner
 
+from neo4j_python_migrations import loader, rehearsal
 from neo4j_python_migrations.analyzer import (
     AnalyzingResult,
+    ChainStatus,
     InvalidVersion,
     InvalidVersionStatus,
 )
+from neo4j_python_migrations.bootstrap import BootstrapPlan
+from neo4j_python_migrations.budget import Estimate
 from neo4j_python_migrations.cli import cli
-from neo4j_python_migrations.migration import Migration
+from neo4j_python_migrations.executor import Executor
+from neo4j_python_migrations.history import HistoryEntry, SQLiteHistoryStore
+from neo4j_python_migrations.migration import CypherMigration, Migration
 
 runner = CliRunner()
 
+# Modules that the CLI imports only when commands need them.
+_HEAVY_MODULES = (
+    "neo4j",
+    "neo4j_python_migrations.executor",
+    "sqlite3",
+    "cProfile",
+    "tracemalloc",
+    "multiprocessing",
+    "urllib.request",
+)
+
+
+def _import_times(*args: str) -> tuple[dict[str, int], str]:
+    """Run the CLI, return cumulative import times by module and the output."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "neo4j_python_migrations", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    import_times = {}
+    for line in completed.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line.split("|")
+            if cumulative.strip().isdigit():
+                import_times[module.strip()] = int(cumulative)
+    return import_times, completed.stdout
+
+
+def test_cli_imports_no_heavy_modules() -> None:
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, neo4j_python_migrations.cli; print(*sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imported = set(completed.stdout.split())
+    assert not imported.intersection(_HEAVY_MODULES)
+
+
+def test_offline_status_without_driver(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__create.cypher").write_text("CREATE (:Node);")
+
+    import_times, output = _import_times(
+        "--path",
+        str(tmp_path),
+        "status",
+        "--offline",
+    )
+
+    assert "neo4j" not in import_times
+    assert "V0001" in output
+    assert "PENDING" in output
+
+
+def test_offline_status_with_history(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__create.cypher").write_text("CREATE (:Node);")
+    tmp_path.joinpath("V0002__create.cypher").write_text("CREATE (:Other);")
+    history_store = SQLiteHistoryStore(str(tmp_path / "history.sqlite"))
+    history_store.create_baseline()
+    history_store.add_migration(loader.load(tmp_path)[0], duration=0)
+
+    result = runner.invoke(
+        cli,
+        [
+            "--path",
+            str(tmp_path),
+            "status",
+            "--offline",
+            "--history",
+            str(tmp_path / "history.sqlite"),
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "V0001         APPLIED" in result.output
+    assert "V0002         PENDING" in result.output
+
 
 @patch("neo4j.GraphDatabase.driver")
 def test_analyze_when_there_are_pending_migrations(driver: MagicMock) -> None:
@@ -47,6 +143,94 @@ def test_analyze_when_there_are_invalid_versions(driver: MagicMock) -> None:
     assert result.exit_code != 0
 
 
+@patch("neo4j.GraphDatabase.driver")
+def test_analyze_all_projects(driver: MagicMock) -> None:
+    with patch(
+        "neo4j_python_migrations.executor.Executor.analyze_all",
+    ) as executor_mock:
+        executor_mock.return_value = [
+            ChainStatus("project1", None, AnalyzingResult("0001")),
+            ChainStatus("project2", "db1"),
+        ]
+        result = runner.invoke(
+            cli,
+            [
+                "--path",
+                ".",
+                "--project",
+                "project1",
+                "analyze",
+                "--all-projects",
+                "--project-path",
+                "project2=other",
+            ],
+        )
+
+        executor_mock.assert_called_with(
+            {"project1": Path("."), "project2": Path("other")},
+        )
+    assert result.exit_code == 0
+    assert "UP-TO-DATE" in result.output
+    assert "NO LOCAL PATH" in result.output
+
+
+@patch("neo4j.GraphDatabase.driver")
+def test_history_summary(driver: MagicMock) -> None:
+    entry = HistoryEntry(
+        project=None,
+        migration_target=None,
+        migration=Migration(version="0001", description="slow", type="CYPHER"),
+        installed_on=datetime(2024, 1, 1),
+        duration=90,
+    )
+    with patch("neo4j_python_migrations.executor.Executor.history") as executor_mock:
+        executor_mock.return_value = iter([entry])
+        result = runner.invoke(
+            cli,
+            ["--path", ".", "history", "--slowest", "5", "--summary"],
+        )
+
+    assert result.exit_code == 0
+    assert "V0001 0:01:30" in result.output
+    assert "2024-01: 0:01:30 for 1 migrations" in result.output
+
+
+@patch("neo4j_python_migrations.executor.Executor.warm_up")
+@patch("neo4j.GraphDatabase.driver")
+def test_connection_profile(
+    driver: MagicMock,
+    warm_up: MagicMock,
+    tmp_path: Path,
+) -> None:
+    config = tmp_path / "connection.json"
+    config.write_text('{"max_connection_pool_size": 10, "fetch_size": 100}')
+    with patch("neo4j_python_migrations.executor.Executor.analyze") as executor_mock:
+        executor_mock.return_value = AnalyzingResult()
+        result = runner.invoke(
+            cli,
+            [
+                "--path",
+                ".",
+                "--connection-config",
+                str(config),
+                "--fetch-size",
+                "5000",
+                "--no-keep-alive",
+                "--warm-up",
+                "analyze",
+            ],
+        )
+
+    assert result.exit_code == 0
+    assert driver.call_args.kwargs == {
+        "auth": ("neo4j", "neo4j"),
+        "max_connection_pool_size": 10,
+        "fetch_size": 5000,
+        "keep_alive": False,
+    }
+    warm_up.assert_called_once()
+
+
 @patch("neo4j.GraphDatabase.driver")
 def test_migrate(driver: MagicMock) -> None:
     with patch("neo4j_python_migrations.executor.Executor.migrate") as executor_mock:
@@ -54,3 +238,200 @@ def test_migrate(driver: MagicMock) -> None:
 
         assert result.exit_code == 0
         executor_mock.assert_called()
+
+
+@patch("neo4j.GraphDatabase.driver")
+def test_migrate_with_time_budget(driver: MagicMock, tmp_path: Path) -> None:
+    rehearsal_file = tmp_path / "rehearsal.json"
+    rehearsal.save(
+        [rehearsal.Rehearsal(version="0001", description="", duration=90)],
+        rehearsal_file,
+    )
+    migration = Migration(version="0002", description="slow", type="CYPHER")
+
+    def migrate(executor: Executor, **kwargs: Any) -> list[Migration]:
+        executor.estimates = {"0002": Estimate(3600, "history")}
+        return [migration]
+
+    with patch(
+        "neo4j_python_migrations.executor.Executor.migrate",
+        autospec=True,
+        side_effect=migrate,
+    ) as migrate_mock:
+        result = runner.invoke(
+            cli,
+            [
+                "--path",
+                str(tmp_path),
+                "migrate",
+                "--time-budget",
+                "20m",
+                "--rehearsal-file",
+                str(rehearsal_file),
+            ],
+        )
+
+        migrate_kwargs = migrate_mock.call_args.kwargs
+    assert result.exit_code == 0
+    assert [found.version for found in migrate_kwargs["rehearsals"]] == ["0001"]
+    assert migrate_kwargs["time_budget"] == 1200
+    assert "Migration V0002 (slow) DEFERRED: 1:00:00 by history" in result.stdout
+
+
+@patch("neo4j.GraphDatabase.driver")
+def test_migrate_bootstrap(driver: MagicMock) -> None:
+    collapsed = Migration(version="0001", description="schema", type="CYPHER")
+    skipped = Migration(version="0002", description="backfill", type="PYTHON")
+    with patch("neo4j_python_migrations.executor.Executor.bootstrap") as executor_mock:
+        executor_mock.return_value = BootstrapPlan(
+            schema=["CREATE INDEX b FOR (p:Person) ON (p.x)"],
+            elided=2,
+            collapsed=[collapsed],
+            skipped=[skipped],
+        )
+        result = runner.invoke(cli, ["--path", ".", "migrate", "--bootstrap"])
+
+    assert result.exit_code == 0
+    assert "Migration V0001 (schema) COLLAPSED" in result.stdout
+    assert "Migration V0002 (backfill) SKIPPED" in result.stdout
+    assert "Net schema: 1 statements applied, 2 elided." in result.stdout
+
+
+@patch("neo4j.GraphDatabase.driver")
+def test_migrate_bootstrap_with_history(driver: MagicMock) -> None:
+    with patch("neo4j_python_migrations.executor.Executor.bootstrap") as executor_mock:
+        executor_mock.side_effect = ValueError("without history")
+        result = runner.invoke(cli, ["--path", ".", "migrate", "--bootstrap"])
+
+    assert result.exit_code == 1
+    assert "without history" in result.stdout
+
+
+@patch("neo4j.GraphDatabase.driver")
+def test_analyze_with_lint_issues(driver: MagicMock, tmp_path: Path) -> None:
+    plans = tmp_path / "plans.json"
+    plans.write_text(
+        json.dumps({"MATCH (n) DELETE n": {"operatorType": "Delete@neo4j"}}),
+    )
+    with patch("neo4j_python_migrations.executor.Executor.analyze") as executor_mock:
+        executor_mock.return_value = AnalyzingResult(
+            pending_migrations=[
+                CypherMigration(
+                    version="0001",
+                    description="",
+                    query="MATCH (n) DELETE n;",
+                ),
+            ],
+        )
+        result = runner.invoke(
+            cli,
+            ["--path", ".", "analyze", "--lint", "--lint-plans", str(plans)],
+        )
+
+    assert result.exit_code == 1
+    assert "unbounded-delete" in result.stdout
+
+
+def test_export_history_and_analyze_offline(tmp_path: Path) -> None:
+    history = tmp_path / "history.sqlite"
+    migrations_path = tmp_path / "migrations"
+    migrations_path.mkdir()
+    migrations_path.joinpath("V0001__initial.cypher").write_text("RETURN 1;")
+    migrations_path.joinpath("V0002__next.cypher").write_text("RETURN 2;")
+
+    with patch("neo4j.GraphDatabase.driver"):
+        with patch(
+            "neo4j_python_migrations.dao.MigrationDAO.read_history",
+        ) as dao_mock:
+            dao_mock.return_value = iter(
+                [
+                    HistoryEntry(
+                        project=None,
+                        migration_target=None,
+                        migration=CypherMigration(
+                            version="0001",
+                            description="initial",
+                            query="RETURN 1;",
+                            source="V0001__initial.cypher",
+                        ),
+                        duration=3,
+                    ),
+                ],
+            )
+            result = runner.invoke(
+                cli,
+                ["--path", str(migrations_path), "export-history", str(history)],
+            )
+    assert result.exit_code == 0
+
+    result = runner.invoke(
+        cli,
+        ["--path", str(migrations_path), "analyze", "--history", str(history)],
+    )
+
+    assert result.exit_code == 0
+    assert "Latest applied version: 0001" in result.stdout
+    assert "V0002" in result.stdout
+
+
+@pytest.mark.parametrize(
+    "options, message",
+    [
+        (["--time-budget", "20m", "--rehearse"], "--time-budget can't be used"),
+        (["--time-budget", "20m", "--bootstrap"], "--time-budget can't be used"),
+        (["--workers", "2", "--time-budget", "20m"], "--time-budget can't be used"),
+        (["--workers", "2", "--bootstrap"], "--workers can't be used"),
+        (
+            ["--profile-python", "cpu", "--isolate-python"],
+            "--profile-python can't be used",
+        ),
+        (
+            ["--profile-python", "cpu", "--workers", "2"],
+            "--profile-python can't be used",
+        ),
+    ],
+)
+@patch("neo4j.GraphDatabase.driver")
+def test_migrate_rejects_conflicting_options(
+    driver: MagicMock,
+    options: list[str],
+    message: str,
+) -> None:
+    result = runner.invoke(cli, ["--path", ".", "migrate", *options])
+
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+@pytest.mark.parametrize(
+    "method, options",
+    [
+        ("migrate", []),
+        ("rehearse", ["--rehearse"]),
+        ("bootstrap", ["--bootstrap"]),
+    ],
+)
+@patch("neo4j.GraphDatabase.driver")
+def test_migrate_writes_metrics(
+    driver: MagicMock,
+    tmp_path: Path,
+    method: str,
+    options: list[str],
+) -> None:
+    metrics_file = tmp_path / "migrations.prom"
+    with patch(f"neo4j_python_migrations.executor.Executor.{method}") as method_mock:
+        method_mock.return_value = BootstrapPlan() if method == "bootstrap" else []
+        result = runner.invoke(
+            cli,
+            [
+                "--path",
+                str(tmp_path),
+                "migrate",
+                "--metrics-file",
+                str(metrics_file),
+                *options,
+            ],
+        )
+
+    assert result.exit_code == 0
+    assert "neo4j_migrations_migrations_applied_total" in metrics_file.read_text()
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import pytest
+
+from neo4j_python_migrations.connection import ConnectionProfile
+
+
+def test_profile_from_file(tmp_path: Path) -> None:
+    config = tmp_path / "connection.json"
+    config.write_text('{"max_connection_pool_size": 10, "keep_alive": false}')
+
+    profile = ConnectionProfile.from_file(config).merge(
+        fetch_size=5000,
+        max_connection_pool_size=None,
+    )
+
+    assert profile.driver_options() == {
+        "max_connection_pool_size": 10,
+        "keep_alive": False,
+        "fetch_size": 5000,
+    }
+
+
+def test_profile_rejects_unknown_settings(tmp_path: Path) -> None:
+    config = tmp_path / "connection.json"
+    config.write_text('{"max_pool_size": 10}')
+
+    with pytest.raises(ValueError, match="max_pool_size"):
+        ConnectionProfile.from_file(config)
@@ -4,7 +4,12 @@ import pytest
 from neo4j import Driver
 
 from neo4j_python_migrations.dao import MigrationDAO
-from neo4j_python_migrations.migration import Migration, MigrationType
+from neo4j_python_migrations.migration import (
+    CypherMigration,
+    Migration,
+    MigrationType,
+    PythonMigration,
+)
 
 from .conftest import can_connect_to_neo4j, username
 
@@ -174,3 +179,164 @@ def test_database_attr(
 ) -> None:
     dao = MigrationDAO(neo4j_driver, database=db, schema_database=schema_db)
     assert dao.database == expected_db
+
+
+def test_is_applied(neo4j_driver: Driver) -> None:
+    dao = MigrationDAO(neo4j_driver)
+    dao.create_baseline()
+    migration = Migration(version="0001", description="123", type=MigrationType.CYPHER)
+
+    assert not dao.is_applied("0001")
+    dao.add_migration(migration, duration=0.1)
+    assert dao.is_applied("0001")
+
+
+def test_add_migration_in_transaction(neo4j_driver: Driver) -> None:
+    dao = MigrationDAO(neo4j_driver)
+    dao.create_baseline()
+    migration = CypherMigration(version="0001", description="", query="CREATE (:A);")
+
+    with neo4j_driver.session() as session:
+        with session.begin_transaction() as tx:
+            migration.apply(tx)
+            dao.add_migration_in(tx, migration, 0.5)
+            tx.rollback()
+    assert not dao.is_applied("0001")
+
+    with neo4j_driver.session() as session:
+        with session.begin_transaction() as tx:
+            migration.apply(tx)
+            dao.add_migration_in(tx, migration, 0.5)
+    assert dao.is_applied("0001")
+
+
+@pytest.mark.parametrize(
+    "migration, expected",
+    [
+        (CypherMigration(version="1", description="", query="CREATE (:A);"), True),
+        (
+            CypherMigration(
+                version="1",
+                description="",
+                query="CREATE INDEX a FOR (n:A) ON (n.id);",
+            ),
+            False,
+        ),
+        (PythonMigration(version="1", description="", code=print), False),
+    ],
+)
+def test_can_record_in(
+    neo4j_driver: Driver,
+    migration: Migration,
+    expected: bool,
+) -> None:
+    assert MigrationDAO(neo4j_driver).can_record_in(migration) is expected
+
+
+def test_add_migrations(neo4j_driver: Driver) -> None:
+    dao = MigrationDAO(neo4j_driver)
+    dao.create_baseline()
+    migrations = [
+        Migration(version=version, description="", type=MigrationType.CYPHER)
+        for version in ("0001", "0002", "0003")
+    ]
+    dao.add_migration(migrations[0], duration=0.1)
+
+    records = [(migrations[1], 0), (migrations[2], 1.5)]
+    dao.add_migrations(records)
+
+    assert dao.get_applied_migrations() == migrations
+    assert [entry.duration for entry in dao.read_history()] == [0.1, 0, 1.5]
+
+
+def test_read_history_of_migrations_added_at_once(neo4j_driver: Driver) -> None:
+    dao = MigrationDAO(neo4j_driver)
+    dao.create_baseline()
+    versions = [str(number).zfill(4) for number in range(1, 13)]
+    dao.add_migrations(
+        [
+            (Migration(version=version, description="", type=MigrationType.CYPHER), 0)
+            for version in versions
+        ],
+    )
+
+    history = list(dao.read_history(page_size=5))
+
+    assert [entry.migration.version for entry in history] == versions
+
+
+def test_squash(neo4j_driver: Driver) -> None:
+    dao = MigrationDAO(neo4j_driver)
+    dao.create_baseline()
+    migrations = [
+        Migration(version=version, description="", type=MigrationType.CYPHER)
+        for version in ("0001", "0002", "0003")
+    ]
+    for migration in migrations:
+        dao.add_migration(migration, duration=0.1)
+
+    assert dao.squash("0002") == migrations[:2]
+
+    assert dao.get_squash_point() == "0002"
+    assert dao.get_applied_migrations() == migrations[2:]
+    dao.add_migration(
+        Migration(version="0004", description="", type=MigrationType.CYPHER),
+        duration=0.1,
+    )
+    assert [migration.version for migration in dao.get_applied_migrations()] == [
+        "0003",
+        "0004",
+    ]
+
+
+def test_repair(neo4j_driver: Driver) -> None:
+    dao = MigrationDAO(neo4j_driver)
+    dao.create_baseline()
+    for version in ("0001", "0002", "0003", "0004"):
+        dao.add_migration(
+            Migration(version=version, description="old", type=MigrationType.CYPHER),
+            duration=0.1,
+        )
+    updated = Migration(
+        version="0004",
+        description="new",
+        type=MigrationType.CYPHER,
+        checksum="1",
+    )
+
+    dao.repair([updated], ["0002", "0003"])
+
+    assert dao.get_applied_migrations() == [
+        Migration(version="0001", description="old", type=MigrationType.CYPHER),
+        updated,
+    ]
+
+
+def test_get_chains(neo4j_driver: Driver) -> None:
+    migration = Migration(version="0001", description="", type=MigrationType.CYPHER)
+    for project in ("project1", "project2"):
+        dao = MigrationDAO(neo4j_driver, project=project)
+        dao.create_baseline()
+    dao.add_migration(migration, duration=0)
+
+    chains = {chain.project: chain for chain in dao.get_chains()}
+
+    assert not chains["project1"].migrations
+    assert chains["project2"].migrations == [migration]
+
+
+def test_read_history(neo4j_driver: Driver) -> None:
+    dao = MigrationDAO(neo4j_driver)
+    dao.create_baseline()
+    for version in ("0001", "0002", "0003"):
+        dao.add_migration(
+            Migration(version=version, description="", type=MigrationType.CYPHER),
+            duration=2.5,
+        )
+
+    history = list(dao.read_history(page_size=2))
+
+    assert [entry.migration.version for entry in history] == ["0001", "0002", "0003"]
+    assert history[0].duration == pytest.approx(2.5)
+    assert history[0].installed_on
+    assert history[0].connected_as == username
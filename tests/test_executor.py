@@ -1,18 +1,30 @@
+import time
+from pathlib import Path
 from typing import Optional
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import ANY, MagicMock, Mock, call, patch
 
 import pytest
 from _pytest.monkeypatch import MonkeyPatch
-from neo4j import Driver
+from neo4j import READ_ACCESS, Driver, Transaction
+from neo4j.exceptions import ClientError, ServiceUnavailable, TransientError
 
-from neo4j_python_migrations import dao
+from neo4j_python_migrations import dao, partition, progress, rehearsal, worker
 from neo4j_python_migrations.analyzer import (
     AnalyzingResult,
     InvalidVersion,
     InvalidVersionStatus,
 )
+from neo4j_python_migrations.budget import Estimate
 from neo4j_python_migrations.executor import Executor
-from neo4j_python_migrations.migration import CypherMigration, Migration
+from neo4j_python_migrations.history import HistoryEntry, SQLiteHistoryStore
+from neo4j_python_migrations.migration import (
+    CypherMigration,
+    DataMigration,
+    Migration,
+    PythonMigration,
+)
+from neo4j_python_migrations.profiling import ProfileMode, Profiler
+from neo4j_python_migrations.retry import RetryPolicy
 from tests.conftest import can_connect_to_neo4j
 
 
@@ -122,6 +134,7 @@ def test_dao_schema_database(
         database=db,
         schema_database=schema_db,
     )
+    assert isinstance(executor.dao, dao.MigrationDAO)
     assert executor.dao.schema_database == expected_db
 
 
@@ -187,3 +200,1010 @@ def test_on_apply_errors_cause_rollback(
         x = session.run("SHOW CONSTRAINTS YIELD name")
         names = [i[0] for i in x]
         assert "foobar" not in names
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_lint_checks_only_pending_cypher_migrations(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    executor_mock.return_value = AnalyzingResult(
+        pending_migrations=[
+            CypherMigration(
+                version="0001", description="", query="MATCH (n) RETURN n;"
+            ),
+            PythonMigration(version="0002", description="", code=Mock()),
+        ],
+    )
+    explainer = Mock(return_value={"operatorType": "AllNodesScan@neo4j"})
+    executor = Executor(driver=MagicMock(), migrations_path=Mock())
+
+    issues = executor.lint(explainer)
+
+    explainer.assert_called_once_with("MATCH (n) RETURN n")
+    assert [issue.rule for issue in issues] == ["label-scan"]
+
+
+@patch("neo4j_python_migrations.retry.time.sleep")
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_retries_transient_errors(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    sleep_mock: MagicMock,
+) -> None:
+    migration = Mock(version="0001")
+    migration.apply.side_effect = [TransientError("deadlock"), None]
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    executor = Executor(driver=MagicMock(), migrations_path=Mock())
+    executor.dao = Mock()
+    executor.dao.is_applied.return_value = False
+
+    executor.migrate()
+
+    assert migration.apply.call_count == 2
+    assert executor.retries == {"0001": 1}
+    executor.dao.add_migration.assert_called_with(
+        migration,
+        ANY,
+        on_retry=ANY,
+    )
+
+
+@patch("neo4j_python_migrations.retry.time.sleep")
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_does_not_reapply_recorded_migrations(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    sleep_mock: MagicMock,
+) -> None:
+    migration = Mock(version="0001")
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    session.begin_transaction.return_value.__exit__.side_effect = [
+        ServiceUnavailable(),
+    ]
+    executor = Executor(driver=driver, migrations_path=Mock())
+    executor.dao = Mock()
+    executor.dao.is_applied.return_value = True
+
+    executor.migrate()
+
+    migration.apply.assert_called_once()
+    executor.dao.add_migration.assert_called_once_with(migration, 0, dry_run=True)
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_analyze_reads_history_from_followers(loader_mock: MagicMock) -> None:
+    driver = MagicMock()
+    executor = Executor(driver=driver, migrations_path=Mock(), database="test")
+
+    executor.analyze()
+
+    driver.session.assert_called_with(
+        database="test",
+        default_access_mode=READ_ACCESS,
+        bookmark_manager=executor.bookmark_manager,
+    )
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_shares_bookmarks_between_databases(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    migration = Mock(version="0001")
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    query_result = tx.run.return_value
+    query_result.consume.return_value.counters.nodes_created = 1
+    executor = Executor(
+        driver=driver,
+        migrations_path=Mock(),
+        database="test1",
+        schema_database="test2",
+    )
+
+    executor.migrate()
+
+    assert {
+        (call.kwargs["database"], call.kwargs["bookmark_manager"])
+        for call in driver.session.call_args_list
+    } == {("test1", executor.bookmark_manager), ("test2", executor.bookmark_manager)}
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_with_on_progress_callback(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    def up(tx: Transaction) -> None:
+        channel = progress.current()
+        channel.set_total(3)
+        for _ in range(3):
+            channel.advance()
+
+    migration = PythonMigration(version="0001", description="", code=up)
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    on_progress = Mock()
+    executor = Executor(driver=MagicMock(), migrations_path=Mock(), progress_interval=0)
+    executor.dao = Mock()
+
+    executor.migrate(on_progress=on_progress)
+
+    assert [call.args[0].processed for call in on_progress.call_args_list] == [
+        1,
+        2,
+        3,
+        3,
+    ]
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_sets_transaction_timeout_and_metadata(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    migrations: list[Migration] = [
+        CypherMigration(version="0001", description="", query="", source="V1"),
+        CypherMigration(
+            version="0002",
+            description="",
+            query="",
+            source="V2",
+            timeout=300,
+        ),
+    ]
+    executor_mock.return_value = AnalyzingResult(pending_migrations=migrations)
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    executor = Executor(
+        driver=driver,
+        migrations_path=Mock(),
+        project="test",
+        timeout=60,
+    )
+    executor.dao = Mock()
+
+    executor.migrate()
+
+    assert [
+        (call.kwargs["timeout"], call.kwargs["metadata"])
+        for call in session.begin_transaction.call_args_list
+    ] == [
+        (60, {**executor.metadata, "version": "0001", "source": "V1"}),
+        (300, {**executor.metadata, "version": "0002", "source": "V2"}),
+    ]
+    assert executor.metadata["project"] == "test"
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_cancel_terminates_transactions_and_stops_migrating(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    migration = Mock(version="0001")
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    session.run.return_value.single.return_value = {"ids": ["neo4j-transaction-1"]}
+    executor = Executor(driver=driver, migrations_path=Mock(), database="test")
+    executor.dao = Mock()
+
+    executor.cancel()
+
+    session.run.assert_called_with(
+        "TERMINATE TRANSACTIONS $ids",
+        ids=["neo4j-transaction-1"],
+    )
+    with pytest.raises(progress.MigrationCancelledError):
+        executor.migrate()
+    migration.apply.assert_not_called()
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_cancel_converts_termination_of_running_transaction(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    executor = Executor(driver=MagicMock(), migrations_path=Mock())
+    executor.dao = Mock()
+
+    def up(tx: Transaction) -> None:
+        executor.cancelled.set()
+        raise ClientError("The transaction has been terminated.")
+
+    executor_mock.return_value = AnalyzingResult(
+        pending_migrations=[PythonMigration(version="0001", description="", code=up)],
+    )
+
+    with pytest.raises(progress.MigrationCancelledError) as exc_info:
+        executor.migrate()
+    assert isinstance(exc_info.value.__cause__, ClientError)
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_collects_metrics(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    def up(tx: Transaction) -> None:
+        tx.run("RETURN 1")
+        tx.run("RETURN 2")
+
+    migration = PythonMigration(version="0001", description="", code=up)
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    executor = Executor(driver=MagicMock(), migrations_path=Mock(), project="test")
+    executor.dao = Mock()
+
+    executor.migrate()
+
+    assert executor.metrics.counters == {
+        "transactions": 1,
+        "migration_queries": 2,
+        "migrations_applied": 1,
+    }
+    assert list(executor.metrics.durations) == ["0001"]
+    assert executor.metrics.success
+    assert executor.metrics.labels == {"project": "test", "database": ""}
+    assert "load" in executor.metrics.phases
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_profiles_only_python_migrations(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    tmp_path: Path,
+) -> None:
+    executor_mock.return_value = AnalyzingResult(
+        pending_migrations=[
+            CypherMigration(version="0001", description="", query="RETURN 1;"),
+            PythonMigration(version="0002", description="", code=Mock()),
+        ],
+    )
+    profiler = Profiler([ProfileMode.CPU], tmp_path)
+    executor = Executor(driver=MagicMock(), migrations_path=Mock(), profiler=profiler)
+    executor.dao = Mock()
+
+    executor.migrate()
+
+    assert [report.version for report in profiler.reports] == ["0002"]
+    assert tmp_path.joinpath("V0002.prof").exists()
+
+
+@pytest.mark.parametrize(
+    "schema_database, records_in_transaction, records_after_commit",
+    [(None, 1, 0), ("schema", 0, 1)],
+)
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_records_migration_in_its_transaction(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    schema_database: Optional[str],
+    records_in_transaction: int,
+    records_after_commit: int,
+) -> None:
+    migration = CypherMigration(version="0001", description="", query="CREATE (:A);")
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    executor = Executor(
+        driver=driver,
+        migrations_path=Mock(),
+        schema_database=schema_database,
+    )
+    executor.dao = Mock(spec=dao.MigrationDAO)
+    executor.dao.can_record_in.return_value = True
+
+    executor.migrate()
+
+    records = executor.dao.add_migration_in.call_args_list
+    assert len(records) == records_in_transaction
+    assert all(record == call(tx, migration, ANY) for record in records)
+    # The first call only checks that the record can be created.
+    assert executor.dao.add_migration.call_count == 1 + records_after_commit
+    assert executor.metrics.counters["migrations_applied"] == 1
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_commits_data_migration_batches(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    tmp_path: Path,
+) -> None:
+    data_path = tmp_path / "V0001__numbers.jsonl"
+    lines = [f'{{"n": {number}}}\n' for number in range(5)]
+    data_path.write_text("".join(lines))
+    migration = DataMigration(
+        version="0001",
+        description="numbers",
+        path=data_path,
+        template="UNWIND $rows AS row CREATE (:Number {n: row.n})",
+        batch_size=2,
+        commit_per_batch=True,
+    )
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    executor = Executor(driver=driver, migrations_path=Mock())
+    executor.dao = Mock()
+    on_apply = Mock()
+
+    executor.migrate(on_apply=on_apply)
+
+    assert session.begin_transaction.call_count == 3
+    batch_sizes = [len(call.kwargs["rows"]) for call in tx.run.call_args_list]
+    assert batch_sizes == [2, 2, 1]
+    assert executor.metrics.counters["transactions"] == 3
+    on_apply.assert_called_once_with(migration)
+    executor.dao.add_migration.assert_called_with(migration, ANY, on_retry=ANY)
+
+
+@patch("neo4j_python_migrations.retry.time.sleep")
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_counts_retries_of_data_migration_batches(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    sleep_mock: MagicMock,
+    tmp_path: Path,
+) -> None:
+    data_path = tmp_path / "V0001__numbers.jsonl"
+    data_path.write_text('{"n": 1}\n')
+    migration = DataMigration(
+        version="0001",
+        description="numbers",
+        path=data_path,
+        template="UNWIND $rows AS row CREATE (:Number {n: row.n})",
+        commit_per_batch=True,
+    )
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    tx.run.side_effect = [TransientError("deadlock"), MagicMock()]
+    executor = Executor(driver=driver, migrations_path=Mock())
+    executor.dao = Mock()
+
+    executor.migrate()
+
+    assert tx.run.call_count == 2
+    assert executor.retries == {"0001": 1}
+    assert executor.metrics.counters["retries"] == 1
+
+
+@patch("neo4j_python_migrations.retry.time.sleep")
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_does_not_retry_data_migration_committing_batches(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    sleep_mock: MagicMock,
+    tmp_path: Path,
+) -> None:
+    data_path = tmp_path / "V0001__numbers.jsonl"
+    data_path.write_text('{"n": 1}\n{"n": 2}\n')
+    migration = DataMigration(
+        version="0001",
+        description="numbers",
+        path=data_path,
+        template="UNWIND $rows AS row CREATE (:Number {n: row.n})",
+        batch_size=1,
+        commit_per_batch=True,
+    )
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    deadlock = TransientError("deadlock")
+    tx.run.side_effect = [MagicMock(), deadlock, deadlock, deadlock]
+    executor = Executor(
+        driver=driver,
+        migrations_path=Mock(),
+        retry_policy=RetryPolicy(max_attempts=3),
+    )
+    executor.dao = Mock()
+
+    with pytest.raises(TransientError):
+        executor.migrate()
+
+    # The first batch is committed once, the second one is attempted 3 times.
+    assert tx.run.call_count == 4
+    assert executor.retries == {"0001": 2}
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_with_workers_records_history_in_order(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    migrations: list[Migration] = [
+        PythonMigration(version="0001", description="", code=Mock()),
+        PythonMigration(version="0002", description="", code=Mock(), depends_on=()),
+        PythonMigration(version="0003", description="", code=Mock()),
+    ]
+    loader_mock.return_value = migrations
+    executor_mock.return_value = AnalyzingResult(pending_migrations=migrations)
+    executor = Executor(driver=MagicMock(), migrations_path=Mock(), workers=2)
+    executor.dao = Mock()
+
+    executor.migrate()
+
+    assert [
+        call.args[0].version
+        for call in executor.dao.add_migration.call_args_list
+        if not call.kwargs.get("dry_run")
+    ] == ["0001", "0002", "0003"]
+    assert all(migration.code.called for migration in migrations)  # type: ignore
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_migrate_with_workers_and_sqlite_history(loader_mock: MagicMock) -> None:
+    migrations: list[Migration] = [
+        PythonMigration(version="0001", description="", code=Mock(), depends_on=()),
+        PythonMigration(version="0002", description="", code=Mock(), depends_on=()),
+        PythonMigration(version="0003", description="", code=Mock(), depends_on=()),
+    ]
+    loader_mock.return_value = migrations
+    executor = Executor(
+        driver=MagicMock(),
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+        workers=3,
+    )
+
+    executor.migrate()
+
+    assert executor.dao.get_applied_migrations() == [
+        Migration.from_other(migration) for migration in migrations
+    ]
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_within_time_budget(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    migrations: list[Migration] = [
+        PythonMigration(version="0001", description="", code=Mock(), estimate=10),
+        PythonMigration(version="0002", description="", code=Mock(), estimate=10),
+        PythonMigration(version="0003", description="", code=Mock(), estimate=10),
+    ]
+    executor_mock.return_value = AnalyzingResult(pending_migrations=migrations)
+    executor = Executor(driver=MagicMock(), migrations_path=Mock())
+    executor.dao = Mock()
+    executor.dao.read_history.return_value = []
+
+    deferred = executor.migrate(time_budget=25)
+
+    assert deferred == migrations[2:]
+    assert [
+        call.args[0].version
+        for call in executor.dao.add_migration.call_args_list
+        if not call.kwargs.get("dry_run")
+    ] == ["0001", "0002"]
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_migrate_rejects_time_budget_with_workers(loader_mock: MagicMock) -> None:
+    executor = Executor(driver=MagicMock(), migrations_path=Mock(), workers=2)
+
+    with pytest.raises(ValueError, match="several workers"):
+        executor.migrate(time_budget=30)
+
+
+@patch("neo4j_python_migrations.budget.time")
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_stops_when_budget_runs_out(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    time_mock: MagicMock,
+) -> None:
+    migrations: list[Migration] = [
+        PythonMigration(version="0001", description="", code=Mock()),
+        PythonMigration(version="0002", description="", code=Mock()),
+    ]
+    # The first migration takes longer than expected.
+    time_mock.monotonic.side_effect = [0, 0, 25]
+    executor_mock.return_value = AnalyzingResult(pending_migrations=migrations)
+    executor = Executor(driver=MagicMock(), migrations_path=Mock())
+    executor.dao = Mock()
+
+    deferred = executor.migrate(
+        time_budget=30,
+        estimates={"0001": Estimate(10, "history"), "0002": Estimate(10, "history")},
+    )
+
+    assert deferred == migrations[1:]
+    migrations[0].code.assert_called()  # type: ignore
+    migrations[1].code.assert_not_called()  # type: ignore
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_estimate_uses_history_of_project(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    migration = CypherMigration(version="0001", description="", query="RETURN 1")
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    executor = Executor(driver=MagicMock(), migrations_path=Mock(), project="app")
+    executor.dao = Mock()
+    executor.dao.read_history.return_value = [
+        HistoryEntry(
+            project="app", migration_target="staging", migration=migration, duration=3
+        ),
+    ]
+
+    assert executor.estimate() == {"0001": Estimate(3, "history")}
+    executor.dao.read_history.assert_called_with(all_targets=True)
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_runs_partitions_in_own_transactions(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    def up(tx: Transaction) -> None:
+        partition.run(
+            "MATCH (n) WHERE $start <= n.id < $end SET n.done = true",
+            partition.by_id_range(0, 4, 1, partitions=2),
+            sessions=2,
+        )
+
+    migration = PythonMigration(version="0001", description="", code=up)
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    executor = Executor(driver=driver, migrations_path=Mock())
+    executor.dao = Mock()
+
+    executor.migrate()
+
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    starts = [run.args[1]["start"] for run in tx.run.call_args_list]
+    assert session.begin_transaction.call_count == 5
+    assert sorted(starts) == [0, 1, 2, 3]
+    assert executor.metrics.counters["transactions"] == 5
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_rehearse_runs_partitions_in_rolled_back_transaction(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    def up(tx: Transaction) -> None:
+        partition.run(
+            "MATCH (n) WHERE $start <= n.id < $end SET n.done = true",
+            partition.by_id_range(0, 4, 1, partitions=2),
+            sessions=2,
+        )
+
+    migration = PythonMigration(version="0001", description="", code=up)
+    executor_mock.return_value = AnalyzingResult(pending_migrations=[migration])
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    query_result = tx.run.return_value
+    query_result.consume.return_value.counters = Mock(
+        **{**dict.fromkeys(rehearsal.COUNTERS, 0), "properties_set": 1},
+    )
+    executor = Executor(driver=driver, migrations_path=Mock())
+    executor.dao = Mock()
+
+    rehearsals = executor.rehearse()
+
+    assert rehearsals[0].error is None
+    assert rehearsals[0].counters == {"properties_set": 4}
+    session.begin_transaction.assert_called_once()
+    tx.rollback.assert_called_once()
+    tx.commit.assert_not_called()
+
+
+def test_profiling_requires_one_worker() -> None:
+    with pytest.raises(ValueError, match="several workers"):
+        Executor(
+            driver=MagicMock(),
+            migrations_path=Mock(),
+            profiler=Profiler([ProfileMode.CPU], Path()),
+            workers=2,
+        )
+
+
+def test_profiling_is_not_done_in_worker_processes() -> None:
+    with pytest.raises(ValueError, match="worker processes"):
+        Executor(
+            driver=MagicMock(),
+            migrations_path=Mock(),
+            profiler=Profiler([ProfileMode.CPU], Path()),
+            worker_config=worker.WorkerConfig(uri="neo4j://localhost", auth=("", "")),
+        )
+
+
+@patch("neo4j_python_migrations.worker.run")
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_migrate_applies_python_migrations_in_workers(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+    run_mock: MagicMock,
+    tmp_path: Path,
+) -> None:
+    tmp_path.joinpath("V0002__python.py").write_text("def up(tx):\n    pass\n")
+    python_migration = PythonMigration(
+        version="0002",
+        description="python",
+        code=Mock(),
+        source="V0002__python.py",
+    )
+    executor_mock.return_value = AnalyzingResult(
+        pending_migrations=[
+            CypherMigration(version="0001", description="", query="RETURN 1;"),
+            python_migration,
+        ],
+    )
+    run_mock.side_effect = lambda config, task, on_apply, *args: (
+        on_apply() or worker.WorkerResult(duration=2, bookmarks=("b2",), queries=3)
+    )
+    bookmark_manager = Mock()
+    bookmark_manager.get_bookmarks.return_value = ["b1"]
+    worker_config = worker.WorkerConfig(uri="neo4j://localhost", auth=("", ""))
+    executor = Executor(
+        driver=MagicMock(),
+        migrations_path=tmp_path,
+        bookmark_manager=bookmark_manager,
+        worker_config=worker_config,
+    )
+    executor.dao = Mock()
+    on_apply = Mock(return_value=None)
+
+    executor.migrate(on_apply=on_apply)
+
+    run_mock.assert_called_once()
+    task = run_mock.call_args.args[1]
+    assert (task.version, task.filename, task.bookmarks) == (
+        "0002",
+        "V0002__python.py",
+        ("b1",),
+    )
+    assert task.transaction["metadata"]["version"] == "0002"
+    on_apply.assert_called_with(python_migration)
+    executor.dao.add_migration.assert_called_with(python_migration, 2, on_retry=ANY)
+    bookmark_manager.update_bookmarks.assert_called_with(("b1",), ("b2",))
+    # One query of the Cypher migration and three of the Python one.
+    assert executor.metrics.counters["migration_queries"] == 4
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_rehearse_rolls_back_and_records_errors(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    def up(tx: Transaction) -> None:
+        tx.run("CREATE (:Node)")
+        tx.run("CREATE (:Node)")
+
+    executor_mock.return_value = AnalyzingResult(
+        latest_applied_version="0000",
+        pending_migrations=[
+            PythonMigration(version="0001", description="ok", code=up),
+            PythonMigration(
+                version="0002",
+                description="broken",
+                code=Mock(side_effect=ValueError("boom")),
+            ),
+        ],
+    )
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    query_result = tx.run.return_value
+    query_result.consume.return_value.counters = Mock(
+        **{**dict.fromkeys(rehearsal.COUNTERS, 0), "nodes_created": 1},
+    )
+    executor = Executor(driver=driver, migrations_path=Mock())
+    executor.dao = Mock()
+
+    rehearsals = executor.rehearse()
+
+    assert [(result.version, result.error) for result in rehearsals] == [
+        ("0001", None),
+        ("0002", "ValueError: boom"),
+    ]
+    assert rehearsals[0].counters == {"nodes_created": 2}
+    tx.rollback.assert_called_once()
+    tx.commit.assert_not_called()
+    executor.dao.add_migration.assert_called_with(ANY, 0, dry_run=True)
+
+
+@patch("neo4j_python_migrations.loader.load")
+@patch("neo4j_python_migrations.executor.Executor.analyze")
+def test_rehearse_times_only_migration(
+    executor_mock: MagicMock,
+    loader_mock: MagicMock,
+) -> None:
+    executor_mock.return_value = AnalyzingResult(
+        latest_applied_version="0000",
+        pending_migrations=[
+            PythonMigration(version="0001", description="", code=Mock()),
+        ],
+    )
+    executor = Executor(driver=MagicMock(), migrations_path=Mock())
+    executor.dao = Mock()
+    history_check_time = 0.2
+    executor.dao.add_migration.side_effect = lambda *args, **kwargs: time.sleep(
+        history_check_time,
+    )
+
+    rehearsals = executor.rehearse()
+
+    assert rehearsals[0].error is None
+    assert rehearsals[0].duration < history_check_time / 2
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_rehearse_without_history(loader_mock: MagicMock) -> None:
+    loader_mock.return_value = [
+        CypherMigration(version="0001", description="", query="CREATE (:Node);"),
+    ]
+    executor = Executor(
+        driver=MagicMock(),
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+    )
+
+    rehearsals = executor.rehearse()
+
+    assert [(result.version, result.error) for result in rehearsals] == [
+        ("0001", None),
+    ]
+    assert not executor.dao.get_chains()
+
+
+def test_rehearsals_round_trip(tmp_path: Path) -> None:
+    rehearsals = [
+        rehearsal.Rehearsal(
+            version="0001",
+            description="",
+            duration=1.5,
+            counters={"nodes_created": 2},
+        ),
+        rehearsal.Rehearsal(version="0002", description="", error="boom"),
+    ]
+
+    rehearsal.save(rehearsals, tmp_path / "rehearsal.json")
+
+    assert rehearsal.load(tmp_path / "rehearsal.json") == rehearsals
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_squash_requires_valid_versions(loader_mock: MagicMock) -> None:
+    loader_mock.return_value = [
+        CypherMigration(version="0001", description="", query="RETURN 1;"),
+    ]
+    executor = Executor(
+        driver=MagicMock(),
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+    )
+    executor.dao.create_baseline()
+    executor.dao.add_migration(
+        CypherMigration(version="0001", description="", query="RETURN 2;"),
+        duration=0,
+    )
+
+    with pytest.raises(ValueError, match="0001"):
+        executor.squash("0001")
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_bootstrap(loader_mock: MagicMock) -> None:
+    seed = PythonMigration(version="0003", description="", code=Mock())
+    seed.run_on_bootstrap = True
+    migrations: list[Migration] = [
+        CypherMigration(
+            version="0001",
+            description="",
+            query="CREATE INDEX a FOR (p:Person) ON (p.x);",
+        ),
+        CypherMigration(
+            version="0002",
+            description="",
+            query="DROP INDEX a;\nCREATE INDEX b FOR (p:Person) ON (p.x);",
+        ),
+        seed,
+    ]
+    loader_mock.return_value = migrations
+    driver = MagicMock()
+    executor = Executor(
+        driver=driver,
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+    )
+    on_apply = Mock()
+
+    bootstrap_plan = executor.bootstrap(on_apply=on_apply)
+
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    assert tx.run.call_args_list[0] == call(
+        "CREATE INDEX b IF NOT EXISTS FOR (p:Person) ON (p.x)",
+    )
+    assert bootstrap_plan.elided == 2
+    seed.code.assert_called_once()  # type: ignore
+    on_apply.assert_called_once_with(seed)
+    assert executor.dao.get_applied_migrations() == [
+        Migration.from_other(migration) for migration in migrations
+    ]
+    with pytest.raises(ValueError, match="without history"):
+        executor.bootstrap()
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_bootstrap_can_be_rerun_after_failure(loader_mock: MagicMock) -> None:
+    seed = PythonMigration(
+        version="0002",
+        description="",
+        code=Mock(side_effect=[ValueError("seed failed"), None]),
+    )
+    seed.run_on_bootstrap = True
+    loader_mock.return_value = [
+        CypherMigration(
+            version="0001",
+            description="",
+            query="CREATE INDEX a FOR (p:Person) ON (p.x);",
+        ),
+        seed,
+    ]
+    driver = MagicMock()
+    executor = Executor(
+        driver=driver,
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+    )
+
+    with pytest.raises(ValueError, match="seed failed"):
+        executor.bootstrap()
+    assert not executor.dao.get_applied_migrations()
+
+    executor.bootstrap()
+
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    assert (
+        tx.run.call_args_list.count(
+            call("CREATE INDEX a IF NOT EXISTS FOR (p:Person) ON (p.x)"),
+        )
+        == 2
+    )
+    assert len(executor.dao.get_applied_migrations()) == 2
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_analyze_after_squash(loader_mock: MagicMock) -> None:
+    migrations: list[Migration] = [
+        CypherMigration(version="0001", description="", query="RETURN 1;"),
+        CypherMigration(version="0002", description="", query="RETURN 2;"),
+    ]
+    loader_mock.return_value = migrations
+    executor = Executor(
+        driver=MagicMock(),
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+    )
+    executor.dao.create_baseline()
+    executor.dao.add_migration(migrations[0], duration=0)
+
+    assert executor.squash("0001") == [Migration.from_other(migrations[0])]
+    executor.local_migrations = migrations[1:]
+
+    assert executor.analyze() == AnalyzingResult(
+        latest_applied_version="0001",
+        pending_migrations=migrations[1:],
+    )
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_repair(loader_mock: MagicMock) -> None:
+    local_migration = CypherMigration(version="0001", description="", query="RETURN 1;")
+    loader_mock.return_value = [local_migration]
+    executor = Executor(
+        driver=MagicMock(),
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+    )
+    executor.dao.create_baseline()
+    executor.dao.add_migration(
+        CypherMigration(version="0001", description="", query="RETURN 2;"),
+        duration=0,
+    )
+
+    assert executor.repair(dry_run=True).updates
+    assert executor.analyze().invalid_versions
+
+    executor.repair()
+
+    assert not executor.analyze().invalid_versions
+    assert not executor.repair().updates
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_reapply_changed(loader_mock: MagicMock) -> None:
+    changed = PythonMigration(version="0001", description="", code=Mock())
+    changed.checksum = "new"
+    unchanged = PythonMigration(version="0002", description="", code=Mock())
+    loader_mock.return_value = [changed, unchanged]
+    executor = Executor(
+        driver=MagicMock(),
+        migrations_path=Mock(),
+        history_store=SQLiteHistoryStore(),
+    )
+    executor.dao.create_baseline()
+    executor.dao.add_migration(
+        PythonMigration(version="0001", description="", code=Mock(), checksum="old"),
+        duration=0,
+    )
+    executor.dao.add_migration(unchanged, duration=0)
+    on_apply = Mock()
+
+    assert executor.reapply_changed(on_apply=on_apply) == [changed]
+
+    changed.code.assert_called_once()  # type: ignore
+    unchanged.code.assert_not_called()  # type: ignore
+    on_apply.assert_called_once_with(changed)
+    assert not executor.analyze().invalid_versions
+    assert executor.reapply_changed() == []
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_warm_up_queries_each_database_once(loader_mock: MagicMock) -> None:
+    driver = MagicMock()
+    executor = Executor(
+        driver=driver,
+        migrations_path=Mock(),
+        database="neo4j",
+        schema_database="schema",
+    )
+
+    executor.warm_up()
+
+    assert driver.session.call_count == 2
+    driver.session.assert_has_calls(
+        [
+            call(database="neo4j", default_access_mode=READ_ACCESS),
+            call(database="schema", default_access_mode=READ_ACCESS),
+        ],
+        any_order=True,
+    )
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_warm_up_raises_errors(loader_mock: MagicMock) -> None:
+    driver = MagicMock()
+    driver.session.side_effect = ServiceUnavailable("unreachable")
+    executor = Executor(driver=driver, migrations_path=Mock())
+
+    with pytest.raises(ServiceUnavailable):
+        executor.warm_up()
@@ -0,0 +1,306 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from neo4j_python_migrations.analyzer import AnalyzingResult, ChainStatus
+from neo4j_python_migrations.executor import Executor
+from neo4j_python_migrations.history import (
+    HistoryEntry,
+    SQLiteHistoryStore,
+    squash_digest,
+)
+from neo4j_python_migrations.migration import (
+    CypherMigration,
+    Migration,
+    MigrationType,
+)
+
+
+def test_add_and_get_migrations() -> None:
+    store = SQLiteHistoryStore()
+    migrations = [
+        Migration(version="9.0.0", description="123", type=MigrationType.CYPHER),
+        Migration(version="10.9.0", description="te st", type=MigrationType.PYTHON),
+    ]
+    store.create_baseline()
+    store.create_baseline()
+
+    for migration in reversed(migrations):
+        store.add_migration(migration, duration=0.1)
+
+    assert store.get_applied_migrations() == migrations
+    assert store.is_applied("9.0.0")
+    assert not store.is_applied("0001")
+
+
+def test_add_migration_without_baseline() -> None:
+    store = SQLiteHistoryStore()
+    migration = Migration(version="0001", description="123", type="CYPHER")
+
+    with pytest.raises(ValueError):
+        store.add_migration(migration, duration=0.1)
+
+
+def test_add_migrations() -> None:
+    store = SQLiteHistoryStore()
+    migrations = [
+        Migration(version=version, description="", type=MigrationType.CYPHER)
+        for version in ("0001", "0002", "0003")
+    ]
+
+    with pytest.raises(ValueError):
+        store.add_migrations([(migrations[0], 0)])
+    store.create_baseline()
+    store.add_migration(migrations[0], duration=0.1)
+    records = [(migrations[1], 0), (migrations[2], 1.5)]
+    store.add_migrations(records)
+
+    assert store.get_applied_migrations() == migrations
+    with pytest.raises(ValueError):
+        store.add_migrations([(migrations[2], 0)])
+
+
+def test_add_duplicate_migration() -> None:
+    store = SQLiteHistoryStore()
+    migration = Migration(version="0001", description="123", type="CYPHER")
+    store.create_baseline()
+    store.add_migration(migration, duration=0.1)
+
+    with pytest.raises(ValueError):
+        store.add_migration(migration, duration=0.1)
+
+
+def test_dry_run() -> None:
+    store = SQLiteHistoryStore()
+    store.create_baseline()
+
+    store.add_migration(
+        Migration(version="0001", description="123", type="CYPHER"),
+        duration=0,
+        dry_run=True,
+    )
+
+    assert not store.get_applied_migrations()
+
+
+def test_different_projects() -> None:
+    store1 = SQLiteHistoryStore(project="project1")
+    store2 = SQLiteHistoryStore(project="project2")
+    store2.connection = store1.connection
+    for store in (store1, store2):
+        store.create_baseline()
+
+    store2.add_migration(
+        Migration(version="0001", description="123", type="CYPHER"),
+        duration=0,
+    )
+
+    assert not store1.get_applied_migrations()
+    assert store2.get_applied_migrations()
+
+
+def test_get_chains() -> None:
+    store1 = SQLiteHistoryStore(project="project1", database="db1")
+    store2 = SQLiteHistoryStore()
+    store2.connection = store1.connection
+    migration = Migration(version="0001", description="123", type="CYPHER")
+    for store in (store1, store2):
+        store.create_baseline()
+    store1.add_migration(migration, duration=0)
+    store1.squash("0001")
+
+    chains = store1.get_chains()
+
+    assert [(chain.project, chain.migration_target) for chain in chains] == [
+        ("project1", "db1"),
+        (None, None),
+    ]
+    assert chains[0].squashed_to == "0001"
+    assert not chains[0].migrations
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_analyze_all(loader_mock: MagicMock, tmp_path: Path) -> None:
+    applied = CypherMigration(version="0001", description="123", query="RETURN 1;")
+    pending = CypherMigration(version="0002", description="123", query="RETURN 2;")
+    loader_mock.return_value = [applied, pending]
+    store = SQLiteHistoryStore(project="project1")
+    store.create_baseline()
+    store.add_migration(applied, duration=0)
+    other_store = SQLiteHistoryStore(project="unknown")
+    other_store.connection = store.connection
+    other_store.create_baseline()
+    executor = Executor(driver=MagicMock(), migrations_path=Mock(), history_store=store)
+
+    statuses = executor.analyze_all({"project1": tmp_path, "project2": tmp_path})
+
+    assert statuses == [
+        ChainStatus(
+            "project1",
+            None,
+            AnalyzingResult(
+                latest_applied_version="0001", pending_migrations=[pending]
+            ),
+        ),
+        ChainStatus(
+            "project2",
+            None,
+            AnalyzingResult(pending_migrations=[applied, pending]),
+        ),
+        ChainStatus("unknown", None),
+    ]
+
+
+def test_read_history_by_pages() -> None:
+    store1 = SQLiteHistoryStore(project="project1")
+    store2 = SQLiteHistoryStore(project="project2")
+    store2.connection = store1.connection
+    for store in (store1, store2):
+        store.create_baseline()
+    for version in ("0001", "0002", "0003"):
+        migration = Migration(version=version, description="", type="CYPHER")
+        store1.add_migration(migration, duration=1.5)
+        store2.add_migration(migration, duration=2)
+
+    history = list(store1.read_history(page_size=2))
+    all_history = list(store1.read_history(all_projects=True, page_size=2))
+
+    assert [entry.migration.version for entry in history] == ["0001", "0002", "0003"]
+    assert {entry.project for entry in history} == {"project1"}
+    assert history[0].duration == pytest.approx(1.5)
+    assert history[0].installed_on
+    assert len(all_history) == 6
+
+
+def test_read_history_of_project_in_all_targets() -> None:
+    production = SQLiteHistoryStore(project="app", database="production")
+    staging = SQLiteHistoryStore(project="app", database="staging")
+    other = SQLiteHistoryStore(project="other", database="production")
+    for store in (staging, other):
+        store.connection = production.connection
+    migration = Migration(version="0001", description="", type="CYPHER")
+    for store in (production, staging, other):
+        store.create_baseline()
+        store.add_migration(migration, duration=1)
+
+    history = list(production.read_history(all_targets=True))
+
+    assert [(entry.project, entry.migration_target) for entry in history] == [
+        ("app", "production"),
+        ("app", "staging"),
+    ]
+
+
+def test_import_migrations_to_file(tmp_path: Path) -> None:
+    migrations = [
+        Migration(version="0001", description="123", type="CYPHER", checksum="1"),
+        Migration(version="0002", description="123", type="PYTHON"),
+    ]
+    installed_on = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    entries = [
+        HistoryEntry(
+            project=None,
+            migration_target=None,
+            migration=migration,
+            installed_on=installed_on,
+            duration=duration,
+            installed_by="deployer",
+        )
+        for migration, duration in zip(migrations, (1.5, 42))
+    ]
+    SQLiteHistoryStore(str(tmp_path / "history.sqlite")).import_migrations(entries)
+
+    store = SQLiteHistoryStore(str(tmp_path / "history.sqlite"))
+    assert store.get_applied_migrations() == migrations
+    assert list(store.read_history()) == entries
+
+
+@patch("neo4j_python_migrations.loader.load")
+def test_executor_with_history_store(loader_mock: MagicMock) -> None:
+    migration = CypherMigration(version="0001", description="123", query="RETURN 1;")
+    loader_mock.return_value = [migration]
+    driver = MagicMock()
+    store = SQLiteHistoryStore()
+    executor = Executor(driver=driver, migrations_path=Mock(), history_store=store)
+
+    assert executor.analyze() == AnalyzingResult(pending_migrations=[migration])
+    executor.migrate()
+
+    assert executor.analyze() == AnalyzingResult(latest_applied_version="0001")
+    assert store.get_applied_migrations() == [Migration.from_other(migration)]
+
+
+def _squashable_store() -> tuple[SQLiteHistoryStore, list[Migration]]:
+    store = SQLiteHistoryStore()
+    store.create_baseline()
+    migrations = [
+        Migration(version=version, description="", type="CYPHER", checksum="1")
+        for version in ("0001", "0002", "0003")
+    ]
+    for migration in migrations:
+        store.add_migration(migration, duration=0)
+    return store, migrations
+
+
+def _squashed_digest(store: SQLiteHistoryStore) -> str:
+    return store.connection.execute(
+        "SELECT squashed_digest FROM migrations WHERE version = 'BASELINE'",
+    ).fetchone()[0]
+
+
+def test_squash_dry_run() -> None:
+    store, migrations = _squashable_store()
+
+    assert store.squash("0002", dry_run=True) == migrations[:2]
+    assert store.get_squash_point() is None
+
+
+def test_squash() -> None:
+    store, migrations = _squashable_store()
+
+    assert store.squash("0002") == migrations[:2]
+    assert store.get_applied_migrations() == migrations[2:]
+    assert store.get_squash_point() == "0002"
+    assert _squashed_digest(store) == squash_digest(migrations[:2])
+
+
+def test_squash_extends_squash_point() -> None:
+    store, migrations = _squashable_store()
+
+    store.squash("0002")
+    store.squash("0003")
+
+    assert not store.get_applied_migrations()
+    assert _squashed_digest(store) == squash_digest(migrations)
+
+
+def test_squash_not_applied_version() -> None:
+    store = SQLiteHistoryStore()
+    store.create_baseline()
+    store.add_migration(
+        Migration(version="0001", description="", type="CYPHER"),
+        duration=0,
+    )
+
+    with pytest.raises(ValueError):
+        store.squash("0002")
+
+
+def test_repair() -> None:
+    store = SQLiteHistoryStore()
+    store.create_baseline()
+    for version in ("0001", "0002", "0003"):
+        store.add_migration(
+            Migration(version=version, description="old", type="CYPHER", checksum="1"),
+            duration=0,
+        )
+    updated = Migration(version="0001", description="new", type="CYPHER", checksum="2")
+
+    store.repair([updated], ["0002"])
+
+    assert store.get_applied_migrations() == [
+        updated,
+        Migration(version="0003", description="old", type="CYPHER", checksum="1"),
+    ]
@@ -0,0 +1,115 @@
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+from neo4j_python_migrations import linter
+from neo4j_python_migrations.migration import CypherMigration
+
+
+def make_plan(operator_type: str, *children: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "operatorType": f"{operator_type}@neo4j",
+        "args": {},
+        "identifiers": [],
+        "children": list(children),
+    }
+
+
+@pytest.mark.parametrize(
+    "rule, plan, expected",
+    [
+        (
+            "eager-write",
+            make_plan("EmptyResult", make_plan("Create", make_plan("Eager"))),
+            True,
+        ),
+        ("eager-write", make_plan("ProduceResults", make_plan("Eager")), False),
+        ("label-scan", make_plan("Filter", make_plan("NodeByLabelScan")), True),
+        ("label-scan", make_plan("Filter", make_plan("AllNodesScan")), True),
+        ("label-scan", make_plan("NodeIndexSeek"), False),
+        (
+            "cartesian-product",
+            make_plan(
+                "CartesianProduct",
+                make_plan("NodeIndexSeek"),
+                make_plan("NodeIndexSeek"),
+            ),
+            True,
+        ),
+        ("cartesian-product", make_plan("Expand(All)"), False),
+        ("unbounded-delete", make_plan("DetachDelete", make_plan("Expand")), True),
+        (
+            "unbounded-delete",
+            make_plan("TransactionForeach", make_plan("DetachDelete")),
+            False,
+        ),
+        ("unbounded-delete", make_plan("Delete", make_plan("Limit")), False),
+        (
+            "unindexed-merge",
+            make_plan("Merge", make_plan("Filter", make_plan("NodeByLabelScan"))),
+            True,
+        ),
+        (
+            "unindexed-merge",
+            make_plan("Merge", make_plan("NodeUniqueIndexSeek")),
+            False,
+        ),
+    ],
+)
+def test_default_rules(rule: str, plan: dict[str, Any], expected: bool) -> None:
+    assert bool(linter.DEFAULT_RULES[rule]("STATEMENT", plan)) == expected
+
+
+def test_lint_uses_captured_plans() -> None:
+    migration = CypherMigration(
+        version="0001",
+        description="test",
+        query="MATCH (n:Test) DETACH DELETE n;MATCH (n) RETURN n;",
+    )
+    plans = linter.CapturedPlans(
+        {"MATCH (n:Test) DETACH DELETE n": make_plan("DetachDelete")},
+    )
+
+    assert linter.lint([migration], plans) == [
+        linter.LintIssue(
+            version="0001",
+            statement="MATCH (n:Test) DETACH DELETE n",
+            rule="unbounded-delete",
+            message="Unbounded DELETE, delete in batches with LIMIT or partition.run.",
+        ),
+    ]
+
+
+def test_lint_with_custom_rules() -> None:
+    migration = CypherMigration(
+        version="0001",
+        description="test",
+        query="MATCH (n) RETURN n;",
+    )
+
+    def no_produce_results(statement: str, plan: linter.Plan) -> Optional[str]:
+        if linter.operator_type(plan) == "ProduceResults":
+            return "Migrations should not return results."
+        return None
+
+    issues = linter.lint(
+        [migration],
+        lambda statement: make_plan("ProduceResults"),
+        rules={"no-results": no_produce_results},
+    )
+
+    assert [issue.rule for issue in issues] == ["no-results"]
+
+
+def test_capture_and_load_plans(tmp_path: Path) -> None:
+    plan = make_plan("NodeIndexSeek")
+    captured_plans = linter.CapturedPlans()
+    explainer = captured_plans.capture(lambda statement: plan)
+
+    explainer("MATCH (n) RETURN n")
+    captured_plans.save(tmp_path / "plans.json")
+
+    loaded_plans = linter.CapturedPlans.from_file(tmp_path / "plans.json")
+    assert loaded_plans("MATCH (n) RETURN n") == plan
+    assert loaded_plans("MATCH (m) RETURN m") is None
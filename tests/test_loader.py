@@ -1,13 +1,19 @@
+import sys
 import tempfile
+import zipfile
+from importlib.resources import files
 from pathlib import Path
+from typing import cast
 from unittest.mock import Mock
 
 import pytest
+from _pytest.monkeypatch import MonkeyPatch
 from pyfakefs.fake_filesystem import FakeFilesystem
 
 from neo4j_python_migrations import loader
 from neo4j_python_migrations.migration import (
     CypherMigration,
+    DataMigration,
     Migration,
     PythonMigration,
 )
@@ -148,3 +154,215 @@ def test_no_matching_files(fs: FakeFilesystem) -> None:
         fs.create_file(file_path)
 
     assert not loader.load(migrations_path.parent)
+
+
+def test_load_missing_directory(tmp_path: Path) -> None:
+    assert not loader.load(tmp_path / "migrations")
+
+
+@pytest.mark.parametrize(
+    "filename",
+    [
+        "V0001__initial.cypher.bak",
+        "V0001__add-index.cypher",
+        "V0001__initial.py.orig",
+    ],
+)
+def test_load_misnamed_migration(tmp_path: Path, filename: str) -> None:
+    tmp_path.joinpath(filename).write_text("MATCH (n) RETURN n;")
+
+    with pytest.raises(ValueError, match="Invalid migration file name"):
+        loader.load(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "duration, expected",
+    [
+        (90, 90),
+        ("90", 90),
+        ("1.5m", 90),
+        ("500ms", 0.5),
+        ("2h", 7200),
+    ],
+)
+def test_parse_duration(duration: str, expected: float) -> None:
+    assert loader.parse_duration(duration) == expected
+
+
+def test_parse_duration_with_invalid_format() -> None:
+    with pytest.raises(ValueError):
+        loader.parse_duration("5 minutes")
+
+
+def test_parse_header() -> None:
+    query = (
+        "// Note: seeds the catalog\n//timeout:  5m  \n"
+        "MATCH (n) RETURN n;\n// estimate: 1m"
+    )
+
+    assert loader.parse_header(query) == {"timeout": "5m"}
+
+
+def test_load_migration_with_plain_leading_comments(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__cypher.cypher").write_text(
+        "// Timeout: none, rely on server default\n"
+        "// Estimate: ~5 minutes\n"
+        "MATCH (n) RETURN n;",
+    )
+
+    migrations = loader.load(tmp_path)
+
+    assert (migrations[0].timeout, migrations[0].estimate) == (None, None)
+
+
+def test_load_migrations_with_timeout(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__cypher.cypher").write_text(
+        "// timeout: 5m\nMATCH (n) RETURN n;",
+    )
+    tmp_path.joinpath("V0002__python.py").write_text(
+        "TIMEOUT = '30s'\ndef up(tx): pass",
+    )
+    tmp_path.joinpath("V0003__default.cypher").write_text("MATCH (n) RETURN n;")
+
+    migrations = loader.load(tmp_path)
+
+    assert [migration.timeout for migration in migrations] == [300, 30, None]
+
+
+def _write_archive(path: Path) -> None:
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("zipped_app/__init__.py", "")
+        archive.writestr(
+            "zipped_app/migrations/V0001__cypher.cypher",
+            "// timeout: 1m\nMATCH (n) RETURN n;",
+        )
+        archive.writestr(
+            "zipped_app/migrations/V0002__python.py",
+            "def up(tx):\n    tx.run('RETURN 1')\n",
+        )
+        archive.writestr("zipped_app/migrations/README.md", "")
+
+
+def test_load_from_zip_archive(tmp_path: Path) -> None:
+    archive_path = tmp_path / "app.zip"
+    _write_archive(archive_path)
+
+    migrations = loader.load(zipfile.Path(archive_path, "zipped_app/migrations/"))
+
+    assert [migration.source for migration in migrations] == [
+        "V0001__cypher.cypher",
+        "V0002__python.py",
+    ]
+    assert migrations[0].timeout == 60
+    tx = Mock()
+    migrations[1].apply(tx)
+    tx.run.assert_called_once_with("RETURN 1")
+
+
+def test_load_from_package_resources(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    archive_path = tmp_path / "app.zip"
+    _write_archive(archive_path)
+    monkeypatch.syspath_prepend(str(archive_path))
+    monkeypatch.delitem(sys.modules, "zipped_app", raising=False)
+
+    migrations = loader.load(files("zipped_app") / "migrations")
+
+    assert [migration.version for migration in migrations] == ["0001", "0002"]
+    assert isinstance(migrations[1], PythonMigration)
+
+
+def test_load_data_migrations(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__countries.csv").write_text("code,name\nFR,France\n")
+    tmp_path.joinpath("V0001__countries.csv.cypher").write_text(
+        "// batch_size: 500\n"
+        "// commit_per_batch: true\n"
+        "UNWIND $rows AS row MERGE (:Country {code: row.code})",
+    )
+    tmp_path.joinpath("V0002__cities.jsonl").write_text('{"name": "Paris"}\n')
+    tmp_path.joinpath("V0002__cities.jsonl.cypher").write_text(
+        "UNWIND $rows AS row CREATE (:City {name: row.name})",
+    )
+
+    migrations = loader.load(tmp_path)
+
+    assert [migration.source for migration in migrations] == [
+        "V0001__countries.csv",
+        "V0002__cities.jsonl",
+    ]
+    assert all(isinstance(migration, DataMigration) for migration in migrations)
+    countries, cities = cast(list[DataMigration], migrations)
+    assert (countries.batch_size, countries.commit_per_batch) == (500, True)
+    assert (cities.batch_size, cities.commit_per_batch) == (1000, False)
+    assert list(cities.batches()) == [[{"name": "Paris"}]]
+
+
+def test_load_data_migration_without_template(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__countries.csv").write_text("code\nFR\n")
+
+    with pytest.raises(ValueError, match="has no Cypher template"):
+        loader.load(tmp_path)
+
+
+def test_load_dependencies(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__cypher.cypher").write_text("MATCH (n) RETURN n;")
+    tmp_path.joinpath("V0002__cypher.cypher").write_text(
+        "// depends_on:\nCREATE INDEX a FOR (n:A) ON (n.id);",
+    )
+    tmp_path.joinpath("V0003__python.py").write_text(
+        "DEPENDS_ON = ['V0001']\ndef up(tx):\n    pass\n",
+    )
+
+    migrations = loader.load(tmp_path)
+
+    assert [migration.depends_on for migration in migrations] == [
+        None,
+        (),
+        ("0001",),
+    ]
+
+
+def test_parse_dependencies() -> None:
+    assert loader.parse_dependencies("V0001, 0002_1") == ("0001", "0002.1")
+    assert loader.parse_dependencies(["0001"]) == ("0001",)
+    assert loader.parse_dependencies(None) is None
+
+
+def test_load_migrations_with_estimate(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__cypher.cypher").write_text(
+        "// estimate: 20m\nMATCH (n) RETURN n;",
+    )
+    tmp_path.joinpath("V0002__python.py").write_text(
+        "ESTIMATE = '90s'\ndef up(tx): pass",
+    )
+    tmp_path.joinpath("V0003__default.cypher").write_text("MATCH (n) RETURN n;")
+
+    migrations = loader.load(tmp_path)
+
+    assert [migration.estimate for migration in migrations] == [1200, 90, None]
+
+
+def test_load_migrations_with_bootstrap_mode(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__cypher.cypher").write_text(
+        "// bootstrap: run\nCREATE (:Config);",
+    )
+    tmp_path.joinpath("V0002__python.py").write_text(
+        "BOOTSTRAP = 'collapse'\ndef up(tx): pass",
+    )
+    tmp_path.joinpath("V0003__default.cypher").write_text("MATCH (n) RETURN n;")
+
+    migrations = loader.load(tmp_path)
+
+    assert [migration.run_on_bootstrap for migration in migrations] == [
+        True,
+        False,
+        False,
+    ]
+
+
+def test_load_migration_with_unknown_bootstrap_mode(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__cypher.cypher").write_text(
+        "// bootstrap: skip\nCREATE (:Config);",
+    )
+
+    with pytest.raises(ValueError, match="Unknown bootstrap mode"):
+        loader.load(tmp_path)
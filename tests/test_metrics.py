@@ -0,0 +1,88 @@
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from neo4j_python_migrations.metrics import CONTENT_TYPE, MeteredTransaction, Metrics
+
+
+def test_render_counters_and_labels() -> None:
+    metrics = Metrics(labels={"project": 'a"b'})
+    metrics.increment("migration_queries", 3)
+
+    rendered = metrics.render()
+
+    assert "# TYPE neo4j_migrations_migration_queries_total counter" in rendered
+    assert r'neo4j_migrations_migration_queries_total{project="a\"b"} 3' in rendered
+    assert "neo4j_migrations_last_run_success" not in rendered
+
+
+def test_render_duration_histogram() -> None:
+    metrics = Metrics(buckets=[10, 1])
+    metrics.observe_migration("0001", 0.5)
+    metrics.observe_migration("0002", 5)
+    metrics.success = True
+
+    rendered = metrics.render().splitlines()
+    histogram_start = rendered.index(
+        "# TYPE neo4j_migrations_migration_duration_seconds histogram",
+    )
+
+    assert rendered[histogram_start + 1 : histogram_start + 6] == [
+        'neo4j_migrations_migration_duration_seconds_bucket{le="1"} 1',
+        'neo4j_migrations_migration_duration_seconds_bucket{le="10"} 2',
+        'neo4j_migrations_migration_duration_seconds_bucket{le="+Inf"} 2',
+        "neo4j_migrations_migration_duration_seconds_sum 5.5",
+        "neo4j_migrations_migration_duration_seconds_count 2",
+    ]
+    assert (
+        'neo4j_migrations_migration_last_duration_seconds{version="0002"} 5' in rendered
+    )
+    assert "neo4j_migrations_migrations_applied_total 2" in rendered
+    assert "neo4j_migrations_last_run_success 1" in rendered
+
+
+def test_timer_records_phase() -> None:
+    metrics = Metrics()
+
+    with metrics.timer("analyze"):
+        metrics.increment("migration_queries")
+
+    assert (
+        'neo4j_migrations_phase_duration_seconds{phase="analyze"}' in metrics.render()
+    )
+
+
+def test_write(tmp_path: Path) -> None:
+    metrics = Metrics()
+    path = tmp_path / "migrations.prom"
+
+    metrics.write(path)
+
+    assert "neo4j_migrations_migration_queries_total 0" in path.read_text()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@patch("neo4j_python_migrations.metrics.urlopen")
+def test_push(urlopen_mock: MagicMock) -> None:
+    metrics = Metrics()
+
+    metrics.push("http://localhost:9091/metrics/job/migrations")
+
+    request = urlopen_mock.call_args.args[0]
+    assert request.full_url == "http://localhost:9091/metrics/job/migrations"
+    assert request.get_method() == "PUT"
+    assert request.get_header("Content-type") == CONTENT_TYPE
+    assert b"neo4j_migrations_migration_queries_total 0" in request.data
+
+
+def test_metered_transaction_counts_queries() -> None:
+    tx = Mock()
+    metrics = Metrics()
+    metered_tx = MeteredTransaction(tx, metrics)
+
+    metered_tx.run("RETURN 1")
+    metered_tx.run("RETURN $x", x=2)
+    metered_tx.commit()
+
+    assert metrics.counters["migration_queries"] == 2
+    tx.run.assert_called_with("RETURN $x", x=2)
+    tx.commit.assert_called_once()
@@ -1,9 +1,12 @@
+from pathlib import Path
 from unittest.mock import MagicMock, Mock, call
 
 import pytest
 
+from neo4j_python_migrations import progress
 from neo4j_python_migrations.migration import (
     CypherMigration,
+    DataMigration,
     Migration,
     PythonMigration,
 )
@@ -137,3 +140,85 @@ def test_exception_if_apply_method_is_not_implemented() -> None:
 
     with pytest.raises(NotImplementedError):
         migration.apply(Mock())
+
+
+def test_cypher_migration_reports_updates() -> None:
+    migration = CypherMigration(
+        version="0001",
+        description="1234",
+        query="STATEMENT1;STATEMENT2;",
+    )
+    tx = MagicMock()
+    query_result = tx.run.return_value
+    counters = query_result.consume.return_value.counters
+    counters.nodes_created = 2
+    counters.nodes_deleted = 0
+    counters.relationships_created = 1
+    counters.relationships_deleted = 0
+    counters.properties_set = 4
+
+    with progress.track("0001") as channel:
+        migration.apply(tx)
+
+    assert channel.processed == 14
+
+
+def test_cypher_migration_batches_statements() -> None:
+    query = "CREATE (:X {id: 1});CREATE (:X {id: 2});MATCH (n) DETACH DELETE n;"
+    migration = CypherMigration(
+        version="0001",
+        description="1234",
+        query=query,
+        batch_size=100,
+    )
+    tx = MagicMock()
+
+    migration.apply(tx)
+
+    assert tx.run.call_args_list == [
+        call(
+            "UNWIND $rows AS row\nCREATE (:X {id: row.p0})",
+            {"rows": [{"p0": 1}, {"p0": 2}]},
+        ),
+        call("MATCH (n) DETACH DELETE n"),
+    ]
+    assert migration == CypherMigration(version="0001", description="1234", query=query)
+
+
+def test_data_migration_streams_batches(tmp_path: Path) -> None:
+    data_path = tmp_path / "V0001__countries.csv"
+    data_path.write_text("code,name\nFR,France\nDE,Germany\nIT,Italy\n")
+    template = "UNWIND $rows AS row CREATE (:Country {code: row.code})"
+    migration = DataMigration(
+        version="0001",
+        description="countries",
+        path=data_path,
+        template=template,
+        batch_size=2,
+    )
+    checksum = migration.checksum
+    tx = MagicMock()
+
+    with progress.track("0001") as channel:
+        migration.apply(tx)
+
+    assert tx.run.call_args_list == [
+        call(
+            template,
+            rows=[
+                {"code": "FR", "name": "France"},
+                {"code": "DE", "name": "Germany"},
+            ],
+        ),
+        call(template, rows=[{"code": "IT", "name": "Italy"}]),
+    ]
+    assert channel.processed == 3
+
+    data_path.write_text("code,name\nFR,France\n")
+    changed_migration = DataMigration(
+        version="0001",
+        description="countries",
+        path=data_path,
+        template=template,
+    )
+    assert changed_migration.checksum != checksum
@@ -0,0 +1,106 @@
+from threading import Event, get_ident
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+
+from neo4j_python_migrations import partition, progress
+
+
+def test_id_ranges() -> None:
+    assert list(partition.id_ranges(0, 25, 10)) == [
+        {"start": 0, "end": 10},
+        {"start": 10, "end": 20},
+        {"start": 20, "end": 25},
+    ]
+
+
+def test_by_id_range() -> None:
+    partitions = partition.by_id_range(0, 100, 20, partitions=3)
+
+    assert [found.name for found in partitions] == ["0..34", "34..68", "68..100"]
+    assert list(partitions[2].batches) == [
+        {"start": 68, "end": 88},
+        {"start": 88, "end": 100},
+    ]
+
+
+def test_by_label() -> None:
+    partitions = partition.by_label(["Person", "Company"], 0, 15, 10)
+
+    assert [found.name for found in partitions] == ["Person", "Company"]
+    assert list(partitions[1].batches) == [
+        {"label": "Company", "start": 0, "end": 10},
+        {"label": "Company", "start": 10, "end": 15},
+    ]
+
+
+def test_run_requires_executor() -> None:
+    with pytest.raises(RuntimeError, match="executor"):
+        partition.run("RETURN 1", [])
+
+
+def test_run_applies_batches_concurrently() -> None:
+    threads: set[int] = set()
+
+    def runner(query: str, parameters: dict[str, Any]) -> int:
+        threads.add(get_ident())
+        return parameters["end"] - parameters["start"]
+
+    on_batch = Mock()
+    with partition.bind(runner), progress.track("0001") as channel:
+        results = partition.run(
+            "MATCH (n) WHERE $start <= n.id < $end SET n.done = true",
+            partition.by_id_range(0, 100, 10, partitions=4),
+            sessions=2,
+            on_batch=on_batch,
+        )
+
+    assert len(results) == 4
+    assert {(found.batches, found.updates) for found in results} == {(3, 25)}
+    assert channel.processed == 100
+    assert on_batch.call_count == 12
+    assert len(threads) <= 2
+
+
+def test_run_isolates_failed_partitions() -> None:
+    def runner(query: str, parameters: dict[str, Any]) -> int:
+        if parameters["label"] == "Broken" and parameters["start"] == 10:
+            raise ValueError("broken batch")
+        return 1
+
+    with pytest.raises(partition.PartitionError, match="Broken") as exc_info:
+        with partition.bind(runner):
+            partition.run(
+                "RETURN $label",
+                partition.by_label(["Person", "Broken"], 0, 50, 10),
+                sessions=1,
+                max_in_flight=1,
+            )
+
+    assert [found.batches for found in exc_info.value.results] == [5, 1]
+    assert [str(found.error) for found in exc_info.value.results] == [
+        "None",
+        "broken batch",
+    ]
+
+
+def test_run_stops_when_cancelled() -> None:
+    cancelled = Event()
+
+    def cancel(query: str, parameters: dict[str, Any]) -> int:
+        cancelled.set()
+        return 1
+
+    runner = Mock(side_effect=cancel)
+
+    with partition.bind(runner), progress.track("0001", cancelled=cancelled):
+        with pytest.raises(progress.MigrationCancelledError):
+            partition.run(
+                "RETURN 1",
+                [partition.Partition("all", partition.id_ranges(0, 100, 1))],
+                sessions=1,
+                max_in_flight=1,
+            )
+
+    assert runner.call_count == 1
@@ -0,0 +1,66 @@
+import pstats
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, patch
+
+from neo4j import Transaction
+
+from neo4j_python_migrations.profiling import (
+    ProfileMode,
+    Profiler,
+    ProfileReport,
+    TimedTransaction,
+)
+
+
+def test_profile_writes_files_per_version(tmp_path: Path) -> None:
+    profiler = Profiler([ProfileMode.CPU, ProfileMode.MEMORY], tmp_path)
+
+    with profiler.profile("0001", Mock()) as tx:
+        tx.run("RETURN $numbers", numbers=[str(number) for number in range(1000)])
+
+    report = profiler.reports[0]
+    assert report.paths == (tmp_path / "V0001.prof", tmp_path / "V0001.memory.txt")
+    assert pstats.Stats(str(report.paths[0])).total_calls  # type: ignore
+    assert report.paths[1].read_text().startswith("Peak traced memory:")
+    assert report.peak_memory
+
+
+def test_profile_only_cpu(tmp_path: Path) -> None:
+    profiler = Profiler([ProfileMode.CPU], tmp_path)
+
+    with profiler.profile("0001", Mock()) as tx:
+        tx.run("RETURN 1")
+
+    assert profiler.reports[0].peak_memory is None
+    assert list(tmp_path.iterdir()) == [tmp_path / "V0001.prof"]
+
+
+@patch("neo4j_python_migrations.profiling.time.monotonic")
+def test_timed_transaction_measures_server_calls(monotonic_mock: MagicMock) -> None:
+    monotonic_mock.side_effect = [0, 1, 1, 3, 3, 4, 4, 7]
+    tx = MagicMock()
+    tx.run.return_value.__iter__.return_value = iter(["record"])
+    timed_tx = TimedTransaction(tx)
+
+    query_result = timed_tx.run("MATCH (n) RETURN n")
+    records = list(query_result)
+    query_result.consume()
+
+    assert records == ["record"]
+    assert timed_tx.server_time == 7
+    tx.run.return_value.consume.assert_called_once()
+
+
+def test_report_client_time() -> None:
+    report = ProfileReport(version="0001", wall_time=5, server_time=3, cpu_time=1)
+
+    assert report.client_time == 2
+
+
+def test_timed_transaction_delegates_attributes() -> None:
+    tx = Mock(spec=Transaction)
+    timed_tx = TimedTransaction(tx)
+
+    timed_tx.commit()
+
+    tx.commit.assert_called_once()
@@ -0,0 +1,76 @@
+from threading import Event
+from unittest.mock import Mock, patch
+
+import pytest
+
+from neo4j_python_migrations import progress
+
+
+def test_event_rate_and_eta() -> None:
+    event = progress.ProgressEvent(version="0001", processed=100, total=300, elapsed=10)
+
+    assert event.rate == 10
+    assert event.eta == 20
+
+
+def test_event_without_total() -> None:
+    event = progress.ProgressEvent(version="0001", processed=0, total=None, elapsed=0)
+
+    assert event.rate == 0
+    assert event.eta is None
+
+
+@patch("neo4j_python_migrations.progress.time.monotonic")
+def test_events_are_throttled(monotonic_mock: Mock) -> None:
+    monotonic_mock.side_effect = [0, 0.5, 1, 1.5, 2.5, 3]
+    on_progress = Mock()
+    channel = progress.Progress("0001", on_progress, interval=1)
+    channel.set_total(10)
+
+    for _ in range(4):
+        channel.advance(2)
+    channel.finish()
+
+    assert [call.args[0].processed for call in on_progress.call_args_list] == [
+        4,
+        8,
+        8,
+    ]
+    assert on_progress.call_args.args[0] == progress.ProgressEvent(
+        version="0001",
+        processed=8,
+        total=10,
+        elapsed=3,
+    )
+
+
+def test_no_final_event_for_fast_migrations() -> None:
+    on_progress = Mock()
+    channel = progress.Progress("0001", on_progress, interval=60)
+
+    channel.advance()
+    channel.finish()
+
+    on_progress.assert_not_called()
+
+
+def test_track_makes_channel_current() -> None:
+    on_progress = Mock()
+
+    with progress.track("0001", on_progress, interval=0) as channel:
+        assert progress.current() is channel
+        progress.current().advance(5)
+
+    assert progress.current() is not channel
+    assert on_progress.call_args.args[0].processed == 5
+
+
+def test_advance_raises_when_cancelled() -> None:
+    cancelled = Event()
+    channel = progress.Progress("0001", cancelled=cancelled)
+    channel.advance()
+
+    cancelled.set()
+
+    with pytest.raises(progress.MigrationCancelledError):
+        channel.advance()
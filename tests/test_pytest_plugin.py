@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from neo4j import Driver
+from yarl import URL
+
+from neo4j_python_migrations.migration import CypherMigration
+from neo4j_python_migrations.pytest_plugin import RESET_QUERY, MigratedDatabase
+from tests.conftest import (
+    can_connect_to_neo4j,
+    host,
+    password,
+    port,
+    scheme,
+    username,
+)
+
+
+def _plugin_args(pytestconfig: pytest.Config) -> list[str]:
+    """Load the plugin if it's not installed with the package."""
+    if pytestconfig.pluginmanager.has_plugin("neo4j_migrations"):
+        return []
+    return ["-p", "neo4j_python_migrations.pytest_plugin"]
+
+
+def test_migrate_reapplies_changed_and_applies_pending() -> None:
+    changed = CypherMigration(version="0001", description="", query="RETURN 1;")
+    pending = CypherMigration(version="0002", description="", query="RETURN 2;")
+    executor = Mock()
+    executor.reapply_changed.return_value = [changed]
+    executor.migrate.side_effect = lambda on_apply: on_apply(pending)
+    migrated = MigratedDatabase(executor)
+
+    migrated.migrate()
+
+    assert migrated.reapplied == [changed]
+    assert migrated.applied == [pending]
+
+
+def test_reset_keeps_history_and_schema() -> None:
+    executor = Mock(driver=MagicMock(), database="tests")
+    migrated = MigratedDatabase(executor, reset_batch_size=500)
+
+    migrated.reset()
+
+    session_mock = executor.driver.session
+    session_mock.assert_called_with(database="tests")
+    session = session_mock.return_value.__enter__.return_value
+    session.run.assert_called_with(RESET_QUERY, batch_size=500)
+
+
+def test_path_is_required(
+    pytester: pytest.Pytester,
+    pytestconfig: pytest.Config,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("NEO4J_MIGRATIONS_PATH", raising=False)
+    pytester.makepyfile("def test_data(neo4j_migrated_driver): pass")
+
+    run_result = pytester.runpytest(*_plugin_args(pytestconfig))
+
+    run_result.assert_outcomes(errors=1)
+    run_result.stdout.fnmatch_lines(["*neo4j_migrations_path*"])
+
+
+@pytest.mark.skipif(not can_connect_to_neo4j(), reason="Neo4j is not available")
+def test_migrates_once_and_resets_data(
+    neo4j_driver: Driver,
+    pytester: pytest.Pytester,
+    pytestconfig: pytest.Config,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    migrations = pytester.mkdir("migrations")
+    migrations.joinpath("V0001__index.cypher").write_text(
+        "CREATE INDEX plugin_test IF NOT EXISTS FOR (n:PluginTest) ON (n.id);",
+    )
+    monkeypatch.setenv("NEO4J_MIGRATIONS_PATH", str(migrations))
+    monkeypatch.setenv(
+        "NEO4J_MIGRATIONS_URI",
+        str(URL.build(scheme=scheme, host=host, port=port)),
+    )
+    monkeypatch.setenv("NEO4J_MIGRATIONS_USER", username)
+    monkeypatch.setenv("NEO4J_MIGRATIONS_PASS", password)
+    monkeypatch.setenv("NEO4J_MIGRATIONS_PROJECT", "pytest-plugin")
+    pytester.makepyfile(
+        """
+        import pytest
+
+        @pytest.mark.parametrize("attempt", [1, 2])
+        def test_data(neo4j_migrated_driver, attempt):
+            with neo4j_migrated_driver.session() as session:
+                count = session.run("MATCH (n:PluginTest) RETURN count(n)").single()[0]
+                session.run("CREATE (:PluginTest {id: 1})").consume()
+            assert count == 0
+        """,
+    )
+
+    run_result = pytester.runpytest(*_plugin_args(pytestconfig))
+
+    with neo4j_driver.session() as session:
+        session.run("DROP INDEX plugin_test IF EXISTS").consume()
+    run_result.assert_outcomes(passed=2)
+    run_result.stdout.fnmatch_lines(["neo4j migrations: applied 1 V0001"])
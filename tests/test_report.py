@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Optional
+
+from neo4j_python_migrations.history import HistoryEntry
+from neo4j_python_migrations.migration import Migration
+from neo4j_python_migrations.report import Aggregate, HistoryReport
+
+
+def _entry(
+    version: str,
+    duration: Optional[float],
+    installed_on: datetime,
+    project: Optional[str] = None,
+) -> HistoryEntry:
+    return HistoryEntry(
+        project=project,
+        migration_target=None,
+        migration=Migration(version=version, description="", type="CYPHER"),
+        installed_on=installed_on,
+        duration=duration,
+    )
+
+
+def test_history_report() -> None:
+    entries = [
+        _entry("0001", 5, datetime(2024, 1, 10)),
+        _entry("0002", 1, datetime(2024, 1, 20), project="other"),
+        _entry("0003", 9, datetime(2024, 2, 1)),
+        _entry("0004", 5, datetime(2024, 2, 2)),
+        _entry("0005", None, datetime(2024, 2, 3)),
+    ]
+
+    history_report = HistoryReport.build(entries, top=3)
+
+    assert [entry.migration.version for entry in history_report.slowest] == [
+        "0003",
+        "0001",
+        "0004",
+    ]
+    assert history_report.chains == {
+        (None, None): Aggregate(count=3, total=19),
+        ("other", None): Aggregate(count=1, total=1),
+    }
+    assert history_report.months == {
+        "2024-01": Aggregate(count=2, total=6),
+        "2024-02": Aggregate(count=2, total=14),
+    }
+    assert history_report.months["2024-02"].mean == 7
+
+
+def test_history_report_without_slowest() -> None:
+    history_report = HistoryReport.build(
+        [_entry("0001", 5, datetime(2024, 1, 10))],
+        top=0,
+    )
+
+    assert not history_report.slowest
+    assert Aggregate().mean == 0
@@ -0,0 +1,51 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from neo4j.exceptions import ClientError, ServiceUnavailable, TransientError
+
+from neo4j_python_migrations.retry import RetryPolicy
+
+
+@patch("neo4j_python_migrations.retry.time.sleep")
+def test_retry_transient_errors(sleep_mock: Mock) -> None:
+    work = Mock(side_effect=[TransientError("deadlock"), ServiceUnavailable(), 42])
+    on_retry = Mock()
+
+    assert RetryPolicy().run(work, on_retry=on_retry) == 42
+    attempts = [call.args[0] for call in work.call_args_list]
+    assert attempts == [1, 2, 3]
+    assert on_retry.call_count == 2
+    assert sleep_mock.call_count == 2
+
+
+@patch("neo4j_python_migrations.retry.time.sleep")
+def test_no_retries_for_other_errors(sleep_mock: Mock) -> None:
+    work = Mock(side_effect=ClientError("syntax error"))
+
+    with pytest.raises(ClientError):
+        RetryPolicy().run(work)
+    work.assert_called_once()
+
+
+@patch("neo4j_python_migrations.retry.time.sleep")
+def test_no_retries_after_max_attempts(sleep_mock: Mock) -> None:
+    work = Mock(side_effect=TransientError("deadlock"))
+
+    with pytest.raises(TransientError):
+        RetryPolicy(max_attempts=3).run(work)
+    assert work.call_count == 3
+
+
+@pytest.mark.parametrize(
+    "attempt, min_delay, max_delay",
+    [
+        (1, 0.8, 1.2),
+        (2, 1.6, 2.4),
+        (3, 3.2, 4.8),
+        (10, 8, 12),
+    ],
+)
+def test_delay(attempt: int, min_delay: float, max_delay: float) -> None:
+    policy = RetryPolicy(initial_delay=1, multiplier=2, max_delay=10, jitter=0.2)
+
+    assert min_delay <= policy.delay(attempt) <= max_delay
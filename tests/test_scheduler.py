@@ -0,0 +1,101 @@
+from contextvars import ContextVar
+from threading import Barrier, Event
+from typing import Optional
+
+import pytest
+
+from neo4j_python_migrations.migration import CypherMigration, Migration
+from neo4j_python_migrations.scheduler import Scheduler, UnrecordedMigrationsError
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+_Record = tuple[str, Optional[float]]
+
+
+def _migrations(count: int) -> list[Migration]:
+    return [
+        CypherMigration(version=f"000{number}", description="", query="")
+        for number in range(1, count + 1)
+    ]
+
+
+def test_independent_migrations_run_concurrently() -> None:
+    migrations = _migrations(3)
+    dependencies = {"0001": set(), "0002": set(), "0003": {"0001"}}
+    barrier = Barrier(2, timeout=5)
+    recorded: list[_Record] = []
+    request_id.set("deploy-1")
+
+    def execute(migration: Migration) -> Optional[float]:
+        if migration.version in {"0001", "0002"}:
+            # Both migrations must be running to pass the barrier.
+            barrier.wait()
+        assert request_id.get() == "deploy-1"
+        return float(migration.version)
+
+    Scheduler(migrations, dependencies, workers=2).run(
+        execute,
+        lambda migration, duration: recorded.append((migration.version, duration)),
+    )
+
+    assert recorded == [("0001", 1), ("0002", 2), ("0003", 3)]
+
+
+def test_migrations_are_recorded_in_order_until_failure() -> None:
+    migrations = _migrations(3)
+    dependencies: dict[str, set[str]] = {"0001": set(), "0002": set(), "0003": set()}
+    recorded: list[str] = []
+
+    def execute(migration: Migration) -> Optional[float]:
+        if migration.version == "0002":
+            raise RuntimeError("boom")
+        return 1
+
+    with pytest.raises(RuntimeError, match="boom"):
+        Scheduler(migrations, dependencies, workers=1).run(
+            execute,
+            lambda migration, duration: recorded.append(migration.version),
+        )
+
+    assert recorded == ["0001"]
+
+
+def test_migrations_applied_after_failure_are_reported() -> None:
+    migrations = _migrations(3)
+    dependencies: dict[str, set[str]] = {"0001": set(), "0002": set(), "0003": set()}
+    applied = Event()
+    recorded: list[str] = []
+
+    def execute(migration: Migration) -> Optional[float]:
+        if migration.version == "0002":
+            # The independent later migration commits before the failure.
+            assert applied.wait(timeout=5)
+            raise RuntimeError("boom")
+        if migration.version == "0003":
+            applied.set()
+        return 1
+
+    with pytest.raises(UnrecordedMigrationsError) as exc_info:
+        Scheduler(migrations, dependencies, workers=3).run(
+            execute,
+            lambda migration, duration: recorded.append(migration.version),
+        )
+
+    assert recorded == ["0001"]
+    assert (exc_info.value.failed, exc_info.value.unrecorded) == (
+        migrations[1],
+        [migrations[2]],
+    )
+    assert isinstance(exc_info.value.__cause__, RuntimeError)
+    assert "V0003 were applied but not recorded" in str(exc_info.value)
+
+
+def test_unresolvable_dependencies() -> None:
+    migrations = _migrations(2)
+    dependencies = {"0001": {"0002"}, "0002": {"0001"}}
+
+    with pytest.raises(ValueError, match="can't be resolved"):
+        Scheduler(migrations, dependencies, workers=1).run(
+            lambda migration: 1,
+            lambda migration, duration: None,
+        )
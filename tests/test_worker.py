@@ -0,0 +1,150 @@
+from pathlib import Path
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from neo4j import Driver, Transaction
+from yarl import URL
+
+from neo4j_python_migrations import partition, worker
+from neo4j_python_migrations.migration import PythonMigration
+from tests.conftest import (
+    can_connect_to_neo4j,
+    host,
+    password,
+    port,
+    scheme,
+    username,
+)
+
+
+def _up(tx: Transaction) -> None:
+    """Do nothing."""
+
+
+def _task(migrations_path: Path, source: str) -> worker.WorkerTask:
+    migration = PythonMigration(
+        version="0001",
+        description="",
+        code=_up,
+        source=source,
+    )
+    return worker.WorkerTask(
+        version="0001",
+        filename=source,
+        bytecode=worker.bytecode(migration, migrations_path),
+        database=None,
+        transaction={},
+        progress_interval=0,
+    )
+
+
+def _config() -> worker.WorkerConfig:
+    return worker.WorkerConfig(
+        uri=str(URL.build(scheme=scheme, host=host, port=port)),
+        auth=(username, password),
+    )
+
+
+def test_partitions_run_in_worker_transactions() -> None:
+    def up(tx: Transaction) -> None:
+        partition.run(
+            "MATCH (n) WHERE $start <= n.id < $end SET n.done = true",
+            partition.by_id_range(0, 2, 1, partitions=2),
+        )
+
+    driver = MagicMock()
+    session = driver.session.return_value.__enter__.return_value
+    tx = session.begin_transaction.return_value.__enter__.return_value
+    connection = Mock()
+    connection.recv.return_value = True
+
+    applied = worker._apply_in_transaction(
+        driver,
+        MagicMock(),
+        up,
+        worker.WorkerTask(
+            version="0001",
+            filename="V0001__partitions.py",
+            bytecode=b"",
+            database=None,
+            transaction={},
+            progress_interval=0,
+        ),
+        connection,
+    )
+
+    assert applied is not None
+    assert applied[1] == 2
+    assert session.begin_transaction.call_count == 2
+    starts = [run.args[1]["start"] for run in tx.run.call_args_list]
+    assert sorted(starts) == [0, 1]
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [
+        ("1024", 1024),
+        ("512M", 512 * 1024**2),
+        ("4GiB", 4 * 1024**3),
+        ("2 kb", 2048),
+    ],
+)
+def test_parse_size(size: str, expected: int) -> None:
+    assert worker.parse_size(size) == expected
+
+
+def test_parse_size_rejects_invalid_sizes() -> None:
+    with pytest.raises(ValueError, match="Invalid size"):
+        worker.parse_size("4 bananas")
+
+
+def test_bytecode_requires_source() -> None:
+    migration = PythonMigration(version="0001", description="", code=_up)
+
+    with pytest.raises(ValueError, match="can't be run in a worker process"):
+        worker.bytecode(migration, Path())
+
+
+def test_errors_are_raised_in_parent(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__broken.py").write_text(
+        "raise KeyError('missing')\n",
+    )
+    on_apply = Mock()
+
+    with pytest.raises(KeyError, match="missing"):
+        worker.run(_config(), _task(tmp_path, "V0001__broken.py"), on_apply)
+    on_apply.assert_not_called()
+
+
+def test_worker_exit_is_reported(tmp_path: Path) -> None:
+    tmp_path.joinpath("V0001__exit.py").write_text("import os\nos._exit(3)\n")
+
+    with pytest.raises(worker.WorkerError, match="exited with code 3"):
+        worker.run(_config(), _task(tmp_path, "V0001__exit.py"), Mock())
+
+
+@pytest.mark.skipif(not can_connect_to_neo4j(), reason="Can't connect to Neo4j")
+def test_migration_is_committed_after_on_apply(
+    tmp_path: Path,
+    neo4j_driver: Driver,
+) -> None:
+    tmp_path.joinpath("V0001__create.py").write_text(
+        "from neo4j_python_migrations import progress\n"
+        "def up(tx):\n"
+        "    tx.run('CREATE (:Worker)')\n"
+        "    progress.current().advance()\n",
+    )
+    on_progress = Mock()
+
+    worker_result = worker.run(
+        _config(),
+        _task(tmp_path, "V0001__create.py"),
+        Mock(),
+        on_progress,
+    )
+
+    assert worker_result.queries == 1
+    assert worker_result.bookmarks
+    on_progress.assert_called()
+    with neo4j_driver.session() as session:
+        assert session.run("MATCH (n:Worker) RETURN count(n)").single(strict=True)[0]